@@ -1,27 +1,95 @@
 import os
-import requests
 from dotenv import load_dotenv
+from .http_client import ResilientClient, ServiceUnavailable
 
 load_dotenv()
 
-API_URL = "https://api-inference.huggingface.co/models/unitary/toxic-bert?wait_for_model=true"
-
-
-
-
+API_URL = os.getenv(
+    "TOXICITY_API_URL",
+    "https://api-inference.huggingface.co/models/unitary/toxic-bert?wait_for_model=true",
+)
 
 API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 
+# Identifies the classifier behind API_URL; stored with cached verdicts so a new model invalidates them
+MODEL_VERSION = os.getenv("TOXICITY_MODEL_VERSION", "unitary/toxic-bert")
+
 HEADERS = {
     "Authorization": f"Bearer {API_KEY}"
 }
 
-def detect_toxic_content(text):
+# What to do when the detector can't answer (timeout, 5xx, circuit open):
+# fail open lets the content through unchecked, fail closed rejects the write
+FAIL_OPEN = os.getenv("TOXICITY_FAIL_OPEN", "true").lower() in ("1", "true", "yes")
+
+
+class DetectorUnavailable(Exception):
+    """Raised in fail-closed mode when content can't be checked."""
+
+
+def build_client():
+    return ResilientClient(
+        API_URL,
+        headers=HEADERS,
+        connect_timeout=float(os.getenv("TOXICITY_CONNECT_TIMEOUT", "3.05")),
+        read_timeout=float(os.getenv("TOXICITY_READ_TIMEOUT", "10")),
+        max_retries=int(os.getenv("TOXICITY_MAX_RETRIES", "2")),
+        backoff_factor=float(os.getenv("TOXICITY_RETRY_BACKOFF", "0.5")),
+        failure_threshold=int(os.getenv("TOXICITY_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("TOXICITY_BREAKER_RESET_SECONDS", "30")),
+    )
+
+
+# One pooled client per process, shared by every request thread
+client = build_client()
+
+
+def detector_metrics():
+    """Latency/error counters and breaker state of this process's detector client."""
+    return {**client.metrics.snapshot(), 'circuit': client.breaker.state, 'fail_open': FAIL_OPEN}
+
+
+def detect_toxic_content(text, fail_open=None):
+    """
+    Classify one text. When the detector can't answer, either because it is
+    unreachable or because it rejected the call (e.g. 400/401/403 after a key
+    or model change), fail open returns {"error": ...} and fail closed raises
+    DetectorUnavailable.
+    """
+    fail_open = FAIL_OPEN if fail_open is None else fail_open
     payload = {"inputs": text}
-    response = requests.post(API_URL, headers=HEADERS, json=payload)
+    try:
+        response = client.post_json(payload)
+    except ServiceUnavailable as exc:
+        if not fail_open:
+            raise DetectorUnavailable(str(exc)) from exc
+        return {"error": str(exc)}
 
     if response.status_code != 200:
-        return {"error": f"{response.status_code}: {response.text}"}
+        error = f"{response.status_code}: {response.text}"
+        if not fail_open:
+            raise DetectorUnavailable(error)
+        return {"error": error}
 
     return response.json()
 
+
+def detect_toxic_contents(texts):
+    """
+    Classify several texts in one inference call; returns one response per text.
+
+    Used by the background moderation worker, which can always retry later,
+    so failures raise DetectorUnavailable regardless of the fail-open policy.
+    """
+    try:
+        response = client.post_json({"inputs": list(texts)})
+    except ServiceUnavailable as exc:
+        raise DetectorUnavailable(str(exc)) from exc
+
+    if response.status_code != 200:
+        raise DetectorUnavailable(f"{response.status_code}: {response.text}")
+
+    results = response.json()
+    if not isinstance(results, list) or len(results) != len(texts):
+        raise DetectorUnavailable("Classifier returned an unexpected number of results.")
+    return results
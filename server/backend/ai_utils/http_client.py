@@ -0,0 +1,179 @@
+"""
+Resilient HTTP client for remote inference APIs.
+
+Wraps a persistent keep-alive `requests.Session` with:
+
+- connect and read timeouts on every call, so a slow upstream can't hold a
+  worker indefinitely;
+- bounded retries with exponential backoff for connection errors and
+  429/5xx responses (urllib3 Retry);
+- a circuit breaker that stops calling an upstream after repeated failures
+  and lets a single trial call through once the reset timeout has passed;
+- per-client latency and error counters (`ClientMetrics.snapshot`).
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import TimeoutError as Urllib3Timeout
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def error_kind(exc):
+    """Short counter label for a requests exception."""
+    # Timeouts that exhausted urllib3's retries surface as ConnectionError(MaxRetryError(reason))
+    reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+    if isinstance(exc, requests.Timeout) or isinstance(reason, Urllib3Timeout):
+        return 'timeout'
+    if isinstance(exc, requests.ConnectionError):
+        return 'connection'
+    return type(exc).__name__
+
+
+class ServiceUnavailable(Exception):
+    """Raised when the upstream can't be reached or keeps failing."""
+
+
+class CircuitOpenError(ServiceUnavailable):
+    """Raised without calling the upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open after `reset_timeout` seconds."""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                # Let exactly one trial call through; everyone else keeps failing fast
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+class ClientMetrics:
+    """Thread-safe call, error and latency counters for one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.successes = 0
+            self.rejected = 0     # Calls refused by the open circuit breaker
+            self.errors = {}      # Error kind -> count
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+    def record_call(self, latency, error=None):
+        with self._lock:
+            self.calls += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            if error is None:
+                self.successes += 1
+            else:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'successes': self.successes,
+                'errors': dict(self.errors),
+                'rejected': self.rejected,
+                'latency_avg_ms': round(self.latency_total / self.calls * 1000, 2) if self.calls else 0.0,
+                'latency_max_ms': round(self.latency_max * 1000, 2),
+            }
+
+
+class ResilientClient:
+    """POST JSON to a single endpoint through a pooled session, retries and a circuit breaker."""
+
+    def __init__(self, url, headers=None, connect_timeout=3.05, read_timeout=10.0, max_retries=2,
+                 backoff_factor=0.5, failure_threshold=5, reset_timeout=30.0, pool_maxsize=10):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.metrics = ClientMetrics()
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['POST']),   # Inference calls have no side effects
+            raise_on_status=False,
+            respect_retry_after_header=False,     # Never sleep longer than our own backoff
+        )
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post_json(self, payload):
+        """
+        POST `payload` and return the response.
+
+        Raises CircuitOpenError while the breaker is open and ServiceUnavailable
+        when the call times out, can't connect or still gets 429/5xx after retries.
+        """
+        if not self.breaker.allow_request():
+            self.metrics.record_rejected()
+            raise CircuitOpenError(f"Circuit open for {self.url}")
+
+        started = time.monotonic()
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as exc:
+            kind = error_kind(exc)
+            self._record_failure(started, kind)
+            raise ServiceUnavailable(f"{kind}: {exc}") from exc
+
+        if response.status_code in RETRY_STATUSES:
+            self._record_failure(started, f"http_{response.status_code}")
+            raise ServiceUnavailable(f"{response.status_code}: {response.text[:200]}")
+
+        self.metrics.record_call(time.monotonic() - started)
+        self.breaker.record_success()
+        return response
+
+    def _record_failure(self, started, error):
+        self.metrics.record_call(time.monotonic() - started, error)
+        self.breaker.record_failure()
+
+    def close(self):
+        self.session.close()
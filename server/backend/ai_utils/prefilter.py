@@ -0,0 +1,219 @@
+"""
+Local first-stage toxicity screen.
+
+Runs before the remote classifier and settles the clear-cut cases on CPU:
+
+- a lexicon of abusive terms (matched after folding case, accents, common
+  leetspeak and stretched letters), and
+- a logistic regression over hashed character n-grams and words (a float32
+  numpy weight vector), trained by `python -m ai_utils.train_prefilter`.
+
+`Prefilter.screen` returns BENIGN when the model's toxicity probability is
+below `benign_below` and no lexicon term matched, TOXIC when it is above
+`toxic_above`, and ESCALATE otherwise; only escalated texts need the remote
+model. The screen is off unless a trained model file exists at
+TOXICITY_PREFILTER_MODEL. Thresholds come from TOXICITY_PREFILTER_BENIGN_BELOW
+and TOXICITY_PREFILTER_TOXIC_ABOVE; TOXICITY_PREFILTER_LEXICON can point at a
+file (one term per line) replacing the built-in lexicon.
+"""
+import json
+import math
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+import zlib
+import numpy as np
+
+BENIGN, TOXIC, ESCALATE = 'benign', 'toxic', 'escalate'
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'models', 'prefilter.bin')
+MODEL_PATH = os.getenv("TOXICITY_PREFILTER_MODEL", DEFAULT_MODEL_PATH)
+BENIGN_BELOW = float(os.getenv("TOXICITY_PREFILTER_BENIGN_BELOW", "0.05"))
+TOXIC_ABOVE = float(os.getenv("TOXICITY_PREFILTER_TOXIC_ABOVE", "0.98"))
+LEXICON_PATH = os.getenv("TOXICITY_PREFILTER_LEXICON")
+
+# Longer texts are scored on their first MAX_CHARS characters (the remote model truncates too)
+MAX_CHARS = 2000
+
+# Abusive terms that always keep a text away from the BENIGN fast path
+DEFAULT_LEXICON = (
+    "idiot", "idiots", "moron", "morons", "stupid", "dumbass", "imbecile", "loser", "losers",
+    "shut up", "kill yourself", "kys", "go die", "i hate you", "trash human", "scum",
+    "fuck", "fucking", "fucker", "shit", "bullshit", "bitch", "bastard", "asshole", "dick",
+    "piss off", "screw you", "die in a fire",
+)
+
+_LEET = str.maketrans({'0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a', '$': 's'})
+_STRETCHED = re.compile(r'(.)\1{2,}')
+_WORDS = re.compile(r'\w+')
+_MAGIC = b'TXPF'
+
+
+def normalize_text(text):
+    """Fold case, accents, leetspeak and stretched letters ("stuuupid" -> "stuupid")."""
+    text = unicodedata.normalize('NFKD', text[:MAX_CHARS])
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = _STRETCHED.sub(r'\1\1', text.translate(_LEET))
+    return ' '.join(_WORDS.findall(text))
+
+
+def hashed_features(normalized, n_bits, ngram_range):
+    """Bucket ids of the text's character n-grams and words (each counted once)."""
+    mask = (1 << n_bits) - 1
+    padded = f' {normalized} '
+    buckets = set()
+    low, high = ngram_range
+    for n in range(low, high + 1):
+        for start in range(len(padded) - n + 1):
+            buckets.add(zlib.crc32(padded[start:start + n].encode()) & mask)
+    for word in normalized.split():
+        buckets.add(zlib.crc32(b'w:' + word.encode()) & mask)
+    return buckets
+
+
+def load_lexicon(path=None):
+    if not path:
+        return frozenset(DEFAULT_LEXICON)
+    with open(path, encoding='utf-8') as lexicon_file:
+        return frozenset(normalize_text(line) for line in lexicon_file if line.strip())
+
+
+class ScreenResult:
+    __slots__ = ('decision', 'probability', 'lexicon_hits')
+
+    def __init__(self, decision, probability, lexicon_hits):
+        self.decision = decision
+        self.probability = probability
+        self.lexicon_hits = lexicon_hits
+
+    def as_classifier_response(self):
+        """The result in the remote classifier's [{label, score}] shape."""
+        if self.decision == TOXIC:
+            return [{"label": "toxic", "score": self.probability}]
+        return [{"label": "non-toxic", "score": 1 - self.probability}]
+
+
+class Prefilter:
+    """Hashed n-gram logistic regression plus lexicon, with benign/toxic thresholds."""
+
+    def __init__(self, weights, bias, n_bits=18, ngram_range=(2, 4), lexicon=None,
+                 benign_below=BENIGN_BELOW, toxic_above=TOXIC_ABOVE, version='untrained'):
+        self.weights = weights
+        self.bias = bias
+        self.n_bits = n_bits
+        self.ngram_range = tuple(ngram_range)
+        self.lexicon = frozenset(DEFAULT_LEXICON) if lexicon is None else frozenset(lexicon)
+        self.benign_below = benign_below
+        self.toxic_above = toxic_above
+        self.version = version
+
+    def features(self, text):
+        return hashed_features(normalize_text(text), self.n_bits, self.ngram_range)
+
+    def probability(self, features):
+        if not features:
+            return 1 / (1 + math.exp(-self.bias))
+        buckets = np.fromiter(features, dtype=np.intp, count=len(features))
+        # Features are L2-normalized binary indicators
+        z = self.bias + float(self.weights[buckets].sum(dtype=np.float64)) / math.sqrt(len(features))
+        return 1 / (1 + math.exp(-max(min(z, 35.0), -35.0)))
+
+    def lexicon_hits(self, normalized):
+        padded = f' {normalized} '
+        return [term for term in self.lexicon if f' {term} ' in padded]
+
+    def screen(self, text):
+        normalized = normalize_text(text)
+        probability = self.probability(hashed_features(normalized, self.n_bits, self.ngram_range))
+        hits = self.lexicon_hits(normalized)
+        if probability >= self.toxic_above:
+            decision = TOXIC
+        elif probability < self.benign_below and not hits:
+            decision = BENIGN
+        else:
+            decision = ESCALATE
+        return ScreenResult(decision, probability, hits)
+
+    # ---- persistence: magic, header length, JSON header, float32 weights ----
+    def save(self, path):
+        header = json.dumps({
+            'bias': self.bias, 'n_bits': self.n_bits, 'ngram_range': list(self.ngram_range), 'version': self.version,
+        }).encode()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'wb') as model_file:
+            model_file.write(_MAGIC + struct.pack('<I', len(header)) + header)
+            np.asarray(self.weights, dtype='<f4').tofile(model_file)
+
+    @classmethod
+    def load(cls, path, **options):
+        with open(path, 'rb') as model_file:
+            if model_file.read(4) != _MAGIC:
+                raise ValueError(f"{path} is not a prefilter model.")
+            header = json.loads(model_file.read(struct.unpack('<I', model_file.read(4))[0]))
+            weights = np.fromfile(model_file, dtype='<f4', count=1 << header['n_bits'])
+        if len(weights) != 1 << header['n_bits']:
+            raise ValueError(f"{path} is truncated.")
+        return cls(weights, header['bias'], header['n_bits'], header['ngram_range'], version=header['version'], **options)
+
+
+class PrefilterStats:
+    """Thread-safe decision counters and screening time for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {BENIGN: 0, TOXIC: 0, ESCALATE: 0}
+            self.seconds = 0.0
+
+    def record(self, decision, seconds):
+        with self._lock:
+            self.counts[decision] += 1
+            self.seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            screened = sum(self.counts.values())
+            return {
+                **self.counts,
+                'screened': screened,
+                'escalation_rate': self.counts[ESCALATE] / screened if screened else 0.0,
+                'avg_screen_us': round(self.seconds / screened * 1e6, 1) if screened else 0.0,
+            }
+
+
+stats = PrefilterStats()
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+def get_prefilter():
+    """The process-wide Prefilter, or None when no trained model is installed."""
+    with _load_lock:
+        if 'prefilter' not in _loaded:
+            _loaded['prefilter'] = (
+                Prefilter.load(MODEL_PATH, lexicon=load_lexicon(LEXICON_PATH)) if os.path.exists(MODEL_PATH) else None
+            )
+        return _loaded['prefilter']
+
+
+def set_prefilter(prefilter):
+    """Install (or with None, disable) the process-wide Prefilter."""
+    with _load_lock:
+        _loaded['prefilter'] = prefilter
+
+
+def screen(text):
+    """Screen `text` with the installed Prefilter; None when the screen is off."""
+    prefilter = get_prefilter()
+    if prefilter is None:
+        return None
+    started = time.perf_counter()
+    result = prefilter.screen(text)
+    stats.record(result.decision, time.perf_counter() - started)
+    return result
@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from ai_utils import hf_detector
+from ai_utils.http_client import ResilientClient, CircuitBreaker, CircuitOpenError, ServiceUnavailable
+
+TOXIC_RESPONSE = [[{"label": "toxic", "score": 0.97}, {"label": "insult", "score": 0.4}]]
+
+
+class StubInferenceHandler(BaseHTTPRequestHandler):
+    """Replays the server's scripted (status, delay) responses in order, then keeps the last one."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        with server.lock:
+            server.received.append((body, self.headers.get('Connection'), self.client_address[1]))
+            status, delay = server.script.pop(0) if len(server.script) > 1 else server.script[0]
+        time.sleep(delay)
+        payload = json.dumps(TOXIC_RESPONSE if status == 200 else {"error": "busy"}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubInferenceHandler)
+    server.protocol_version = 'HTTP/1.1'
+    StubInferenceHandler.protocol_version = 'HTTP/1.1'   # keep-alive
+    server.lock = threading.Lock()
+    server.received = []
+    server.script = [(200, 0)]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/models/toxic"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(url, **kwargs):
+    options = dict(connect_timeout=0.5, read_timeout=0.3, max_retries=2, backoff_factor=0, failure_threshold=2, reset_timeout=60)
+    options.update(kwargs)
+    return ResilientClient(url, **options)
+
+
+def test_reuses_one_keep_alive_connection(stub_server):
+    client = make_client(stub_server.url)
+    for _ in range(3):
+        assert client.post_json({"inputs": "hello"}).json() == TOXIC_RESPONSE
+
+    client_ports = {port for _, _, port in stub_server.received}
+    assert len(client_ports) == 1
+    assert client.metrics.snapshot()['successes'] == 3
+
+
+def test_retries_transient_errors_then_succeeds(stub_server):
+    stub_server.script = [(503, 0), (502, 0), (200, 0)]
+    client = make_client(stub_server.url)
+
+    assert client.post_json({"inputs": "hi"}).status_code == 200
+    assert len(stub_server.received) == 3
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_slow_upstream_times_out_and_opens_breaker(stub_server):
+    stub_server.script = [(200, 1.0)]
+    client = make_client(stub_server.url, max_retries=0)
+
+    started = time.monotonic()
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            client.post_json({"inputs": "slow"})
+    assert time.monotonic() - started < 1.5   # Bounded by the read timeout, not the upstream
+
+    calls_before = len(stub_server.received)
+    with pytest.raises(CircuitOpenError):
+        client.post_json({"inputs": "slow"})
+    assert len(stub_server.received) == calls_before   # Open breaker doesn't touch the network
+
+    metrics = client.metrics.snapshot()
+    assert metrics['errors'] == {'timeout': 2}
+    assert metrics['rejected'] == 1
+    assert metrics['latency_max_ms'] >= 300
+
+
+def test_breaker_half_opens_after_reset_timeout():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    now[0] = 10
+    assert breaker.allow_request()        # single trial call
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow_request()
+
+
+def test_detector_fail_open_and_fail_closed_policies(stub_server, monkeypatch):
+    stub_server.script = [(500, 0)]
+    monkeypatch.setattr(hf_detector, 'client', make_client(stub_server.url, max_retries=0))
+
+    assert 'error' in hf_detector.detect_toxic_content("text", fail_open=True)
+    with pytest.raises(hf_detector.DetectorUnavailable):
+        hf_detector.detect_toxic_content("text", fail_open=False)
+    with pytest.raises(hf_detector.DetectorUnavailable):   # breaker now open
+        hf_detector.detect_toxic_content("text", fail_open=False)
+    assert hf_detector.detector_metrics()['circuit'] == CircuitBreaker.OPEN
+
+
+def test_detector_error_responses_follow_the_fail_open_policy(stub_server, monkeypatch):
+    # Non-retryable rejections (bad key, bad request) must not read as "not toxic"
+    stub_server.script = [(401, 0)]
+    monkeypatch.setattr(hf_detector, 'client', make_client(stub_server.url, max_retries=0))
+
+    assert 'error' in hf_detector.detect_toxic_content("text", fail_open=True)
+    with pytest.raises(hf_detector.DetectorUnavailable):
+        hf_detector.detect_toxic_content("text", fail_open=False)
@@ -0,0 +1,89 @@
+import csv
+import random
+import pytest
+from ai_utils import prefilter, train_prefilter
+from ai_utils.prefilter import BENIGN, TOXIC, ESCALATE, Prefilter, normalize_text
+
+BENIGN_TEMPLATES = [
+    "Thanks for the {} tutorial, it helped a lot",
+    "Can someone explain how {} works in practice?",
+    "I finished the {} course today and enjoyed it",
+    "Great question about {}, here is a link to the docs",
+    "Does the {} quiz cover the last chapter too?",
+]
+TOXIC_TEMPLATES = [
+    "you are a worthless clown and your {} post is garbage",
+    "nobody wants your garbage {} answers, clown",
+    "worthless clown, stop posting {} garbage here",
+    "what a pathetic clown, your {} take is garbage",
+]
+TOPICS = ["python", "django", "algebra", "react", "chemistry", "history", "sql", "statistics"]
+
+
+def corpus(seed=3):
+    rng = random.Random(seed)
+    rows = [(template.format(topic), False) for template in BENIGN_TEMPLATES for topic in TOPICS]
+    rows += [(template.format(topic), True) for template in TOXIC_TEMPLATES for topic in TOPICS]
+    rng.shuffle(rows)
+    return rows
+
+
+@pytest.fixture(scope="module")
+def trained():
+    return train_prefilter.train(corpus(), n_bits=14, epochs=8)
+
+
+def test_normalization_folds_case_accents_leetspeak_and_stretching():
+    assert normalize_text("STÜÜÜPID  1d10t!!") == "stuupid idiot"
+
+
+def test_screen_settles_clear_cases_and_escalates_the_rest(trained):
+    assert trained.screen("Thanks for the geometry tutorial, it helped a lot").decision == BENIGN
+    assert trained.screen("you worthless clown, your geometry post is garbage").decision in (TOXIC, ESCALATE)
+    assert trained.screen("you worthless clown, your geometry post is garbage").probability > 0.5
+
+    # A lexicon term keeps otherwise benign-looking text away from the fast path
+    result = trained.screen("Thanks for the geometry tutorial, you 1d10t")
+    assert result.decision == ESCALATE and result.lexicon_hits == ["idiot"]
+
+
+def test_model_round_trips_through_its_file(trained, tmp_path):
+    path = tmp_path / "prefilter.bin"
+    trained.save(path)
+    loaded = Prefilter.load(path)
+    text = "Does the calculus quiz cover the last chapter too?"
+    assert loaded.screen(text).probability == pytest.approx(trained.screen(text).probability, rel=1e-5)
+    assert loaded.version == trained.version
+
+
+def test_training_script_reports_escalation_rate(tmp_path, capsys):
+    csv_path = tmp_path / "labeled.csv"
+    with open(csv_path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["comment_text", "toxic", "insult"])
+        for text, is_toxic in corpus() * 2:
+            writer.writerow([text, int(is_toxic), 0])
+
+    model_path = tmp_path / "model.bin"
+    train_prefilter.main(["train", str(csv_path), "--out", str(model_path), "--bits", "14", "--epochs", "6"])
+    trained = train_prefilter.main(["evaluate", str(csv_path), "--model", str(model_path), "--remote-latency-ms", "300"])
+    output = capsys.readouterr().out
+    assert "Escalated to remote:" in output and "Remote calls saved:" in output
+    assert "(modelled)" in output
+
+    report = train_prefilter.evaluate(trained, corpus(), remote_latency_ms=300)
+    assert report['rows'] == len(corpus())
+    assert report['escalation_rate'] < 0.5
+    assert report['remote_calls_saved'] == pytest.approx(1 - report['escalation_rate'])
+    assert report['modelled_write_p50_ms']['with_prefilter'] < report['modelled_write_p50_ms']['remote_only']
+
+
+def test_screen_is_off_without_a_model(monkeypatch, trained):
+    monkeypatch.setitem(prefilter._loaded, 'prefilter', None)
+    assert prefilter.screen("anything") is None
+
+    monkeypatch.setitem(prefilter._loaded, 'prefilter', trained)
+    prefilter.stats.reset()
+    prefilter.screen("Thanks for the python tutorial, it helped a lot")
+    snapshot = prefilter.stats.snapshot()
+    assert snapshot['screened'] == 1 and snapshot['escalation_rate'] == 0.0
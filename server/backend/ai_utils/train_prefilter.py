@@ -0,0 +1,180 @@
+"""
+Train and evaluate the local toxicity prefilter on a labeled CSV.
+
+    python -m ai_utils.train_prefilter train data.csv --out ai_utils/models/prefilter.bin
+    python -m ai_utils.train_prefilter evaluate data.csv --model ai_utils/models/prefilter.bin
+
+The CSV needs a text column (`comment_text` or `text`, or --text-column) and
+either Jigsaw-style label columns (toxic, severe_toxic, obscene, threat,
+insult, identity_hate; a row is toxic if any is set) or a single `label`
+column. `train` holds out --holdout of the rows and prints the evaluation
+report for them; `evaluate` reports on every row.
+
+The report shows how many texts the prefilter would settle locally (the
+reduction in remote calls), how often those local decisions disagree with
+the labels, and the measured screen latency. The moderated-write p50/p99 it
+prints are modelled, not measured: no remote call is made, every escalated
+text is charged a fixed --remote-latency-ms (e.g. the observed average from
+/forum/moderation/metrics/), and the remote-only figure is that constant.
+"""
+import argparse
+import csv
+import math
+import random
+import sys
+import time
+import numpy as np
+from .prefilter import BENIGN, TOXIC, ESCALATE, Prefilter, hashed_features, normalize_text, load_lexicon
+
+JIGSAW_LABELS = ('toxic', 'severe_toxic', 'obscene', 'threat', 'insult', 'identity_hate')
+
+
+def read_labeled_csv(path, text_column=None, label_columns=None, max_rows=None):
+    """Return [(text, is_toxic)] from a labeled CSV."""
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        reader = csv.DictReader(csv_file)
+        columns = reader.fieldnames or []
+        text_column = text_column or ('comment_text' if 'comment_text' in columns else 'text')
+        label_columns = label_columns or [column for column in JIGSAW_LABELS if column in columns] or ['label']
+        missing = [column for column in [text_column, *label_columns] if column not in columns]
+        if missing:
+            raise SystemExit(f"{path} has no column(s) {', '.join(missing)}.")
+
+        rows = []
+        for row in reader:
+            is_toxic = any(float(row[column] or 0) > 0 for column in label_columns)
+            rows.append((row[text_column], is_toxic))
+            if max_rows and len(rows) >= max_rows:
+                break
+    return rows
+
+
+def train(rows, n_bits=18, ngram_range=(2, 4), epochs=5, learning_rate=2.0, l2=1e-6, seed=13):
+    """Fit the hashed n-gram logistic regression with SGD; returns a Prefilter."""
+    weights = np.zeros(1 << n_bits, dtype=np.float32)
+    samples = [
+        (np.fromiter(hashed_features(normalize_text(text), n_bits, ngram_range), dtype=np.intp), 1.0 if is_toxic else 0.0)
+        for text, is_toxic in rows
+    ]
+    # Balance the classes so a mostly-benign corpus doesn't push every score down
+    positives = sum(label for _, label in samples) or 1
+    negatives = (len(samples) - positives) or 1
+    class_weight = {1.0: len(samples) / (2 * positives), 0.0: len(samples) / (2 * negatives)}
+
+    bias = 0.0
+    rng = random.Random(seed)
+    for epoch in range(epochs):
+        rng.shuffle(samples)
+        rate = learning_rate / (1 + epoch)
+        for buckets, label in samples:
+            scale = 1 / math.sqrt(len(buckets)) if len(buckets) else 0.0
+            z = bias + float(weights[buckets].sum(dtype=np.float64)) * scale
+            prediction = 1 / (1 + math.exp(-max(min(z, 35.0), -35.0)))
+            gradient = (prediction - label) * class_weight[label] * rate
+            bias -= gradient
+            # Buckets are unique per sample, so the fancy-indexed update touches each once
+            weights[buckets] -= gradient * scale + rate * l2 * weights[buckets]
+    return Prefilter(weights, bias, n_bits, ngram_range, version=f"hashed-ngram-{n_bits}b-{int(time.time())}")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    # Nearest-rank: always one of the observed values
+    return float(np.percentile(values, fraction * 100, method='inverted_cdf'))
+
+
+def evaluate(prefilter, rows, remote_latency_ms=400.0):
+    """Escalation rate, local error rates and latency estimates for `rows`."""
+    decisions = {BENIGN: 0, TOXIC: 0, ESCALATE: 0}
+    missed_toxic = false_blocks = 0
+    screen_ms, with_prefilter = [], []
+    for text, is_toxic in rows:
+        started = time.perf_counter()
+        result = prefilter.screen(text)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        screen_ms.append(elapsed_ms)
+        # Modelled write cost: the measured screen, plus a fixed remote latency when escalated
+        with_prefilter.append(elapsed_ms + (remote_latency_ms if result.decision == ESCALATE else 0.0))
+        decisions[result.decision] += 1
+        if result.decision == BENIGN and is_toxic:
+            missed_toxic += 1
+        elif result.decision == TOXIC and not is_toxic:
+            false_blocks += 1
+
+    total = len(rows) or 1
+    return {
+        'rows': len(rows),
+        'decisions': decisions,
+        'escalation_rate': decisions[ESCALATE] / total,
+        'remote_calls_saved': 1 - decisions[ESCALATE] / total,
+        'missed_toxic_rate': missed_toxic / (decisions[BENIGN] or 1),
+        'false_block_rate': false_blocks / (decisions[TOXIC] or 1),
+        'screen_p50_us': percentile(screen_ms, 0.5) * 1000,
+        'screen_p99_us': percentile(screen_ms, 0.99) * 1000,
+        'modelled_write_p50_ms': {'remote_only': remote_latency_ms, 'with_prefilter': percentile(with_prefilter, 0.5)},
+        'modelled_write_p99_ms': {'remote_only': remote_latency_ms, 'with_prefilter': percentile(with_prefilter, 0.99)},
+    }
+
+
+def format_report(report, prefilter):
+    decisions = report['decisions']
+    return "\n".join([
+        f"Prefilter {prefilter.version}: benign < {prefilter.benign_below}, toxic >= {prefilter.toxic_above}",
+        f"Rows evaluated:        {report['rows']}",
+        f"Settled locally:       {decisions[BENIGN]} benign, {decisions[TOXIC]} toxic",
+        f"Escalated to remote:   {decisions[ESCALATE]} ({report['escalation_rate']:.1%})",
+        f"Remote calls saved:    {report['remote_calls_saved']:.1%}",
+        f"Toxic among cleared:   {report['missed_toxic_rate']:.2%}",
+        f"Benign among blocked:  {report['false_block_rate']:.2%}",
+        f"Screen latency:        p50 {report['screen_p50_us']:.0f}us, p99 {report['screen_p99_us']:.0f}us",
+        "Moderated write p50:   {remote_only:.1f}ms remote-only -> {with_prefilter:.1f}ms with prefilter (modelled)".format(**report['modelled_write_p50_ms']),
+        "Moderated write p99:   {remote_only:.1f}ms remote-only -> {with_prefilter:.1f}ms with prefilter (modelled)".format(**report['modelled_write_p99_ms']),
+        f"  (modelled: remote calls assumed to take a constant {report['modelled_write_p50_ms']['remote_only']:.0f}ms, not measured)",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or evaluate the local toxicity prefilter.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    for name in ('train', 'evaluate'):
+        sub = subcommands.add_parser(name)
+        sub.add_argument('csv')
+        sub.add_argument('--text-column')
+        sub.add_argument('--label-columns', nargs='+')
+        sub.add_argument('--max-rows', type=int)
+        sub.add_argument('--benign-below', type=float, default=0.05)
+        sub.add_argument('--toxic-above', type=float, default=0.98)
+        sub.add_argument('--lexicon', help="File with one term per line (default: built-in lexicon).")
+        sub.add_argument('--remote-latency-ms', type=float, default=400.0)
+    train_parser = subcommands.choices['train']
+    train_parser.add_argument('--out', required=True)
+    train_parser.add_argument('--bits', type=int, default=18)
+    train_parser.add_argument('--epochs', type=int, default=5)
+    train_parser.add_argument('--learning-rate', type=float, default=2.0)
+    train_parser.add_argument('--holdout', type=float, default=0.2)
+    train_parser.add_argument('--seed', type=int, default=13)
+    subcommands.choices['evaluate'].add_argument('--model', required=True)
+    args = parser.parse_args(argv)
+
+    rows = read_labeled_csv(args.csv, args.text_column, args.label_columns, args.max_rows)
+    thresholds = {'benign_below': args.benign_below, 'toxic_above': args.toxic_above}
+    lexicon = load_lexicon(args.lexicon)
+
+    if args.command == 'train':
+        random.Random(args.seed).shuffle(rows)
+        split = int(len(rows) * (1 - args.holdout))
+        training, holdout = rows[:split], rows[split:] or rows
+        prefilter = train(training, n_bits=args.bits, epochs=args.epochs, learning_rate=args.learning_rate, seed=args.seed)
+        prefilter.save(args.out)
+        print(f"Trained on {len(training)} rows, saved to {args.out}")
+    else:
+        prefilter, holdout = Prefilter.load(args.model), rows
+
+    prefilter.benign_below, prefilter.toxic_above, prefilter.lexicon = thresholds['benign_below'], thresholds['toxic_above'], lexicon
+    print(format_report(evaluate(prefilter, holdout, args.remote_latency_ms), prefilter))
+    return prefilter
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
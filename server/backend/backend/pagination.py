@@ -0,0 +1,167 @@
+"""
+Project-wide keyset (cursor) pagination.
+
+Pages are addressed by an opaque cursor that encodes the last seen values of
+every ordering column, so fetching page 1000 costs the same index range scan
+as page 1 (no OFFSET), however many rows share a value in the leading column.
+Views pick their ordering columns with `cursor_ordering`.
+"""
+import datetime
+import json
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.response import Response
+
+
+def _encode_value(value):
+    # Full precision: DjangoJSONEncoder would cut datetimes to milliseconds
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on a per-view tuple of indexed columns.
+
+    The cursor position holds one value per ordering column and the next page
+    starts strictly after it, e.g. for `('-enrollment_count', '-id')`:
+
+        WHERE enrollment_count < v OR (enrollment_count = v AND id < id_v)
+
+    Responses are `{"next", "previous", "results"}` envelopes. Clients that
+    still expect a bare list get one when `?envelope=false` is passed (or when
+    settings.PAGINATION_BARE_LIST is on and they don't ask otherwise). During
+    the deprecation period a bare-list request without `cursor` or `page_size`
+    gets the full list, so existing clients keep seeing every row; with either
+    parameter it is a single bounded page and the next/previous cursors move
+    to an RFC 8288 `Link` header.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
+    envelope_query_param = 'envelope'
+
+    def get_ordering(self, request, queryset, view):
+        # Views declare their keyset columns instead of subclassing the paginator
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+
+        # A reverse (previous page) cursor walks the ordering backwards
+        ordering = [self._flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.is_legacy_full_list(request):
+            self.page = list(queryset)
+            self.has_previous = self.has_next = False
+            return self.page
+        if self.cursor and self.cursor.position is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, self.cursor.position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, self.cursor is not None
+        else:
+            self.has_previous, self.has_next = self.cursor is not None, has_more
+        return self.page
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def keyset_filter(ordering, position):
+        """Rows strictly after `position` in `ordering` (one OR branch per column)."""
+        branches = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {ordering_field.lstrip('-'): value for ordering_field, value in zip(ordering[:index], position)}
+            branches.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        return reduce(or_, branches)
+
+    def get_position(self, instance):
+        return [_encode_value(getattr(instance, field.lstrip('-'))) for field in self.ordering]
+
+    def encode_position(self, position):
+        return json.dumps(position, separators=(',', ':'))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _link(self, reverse, position):
+        return self.encode_cursor(Cursor(offset=0, reverse=reverse, position=self.encode_position(position)))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self._link(False, self.get_position(self.page[-1]))
+        # Empty page reached backwards: continue from where that cursor stood
+        return self._link(False, self.cursor.position)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self._link(True, self.get_position(self.page[0]))
+        return self._link(True, self.cursor.position)
+
+    def is_legacy_full_list(self, request):
+        """A bare-list client that doesn't page yet: serve every row (deprecated)."""
+        return (
+            not self.use_envelope(request)
+            and self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        )
+
+    def use_envelope(self, request):
+        envelope = request.query_params.get(self.envelope_query_param)
+        if envelope is None:
+            return not getattr(settings, 'PAGINATION_BARE_LIST', False)
+        return envelope.lower() not in ('0', 'false', 'no')
+
+    def get_link_header(self):
+        links = [
+            f'<{url}>; rel="{rel}"'
+            for rel, url in (('next', self.get_next_link()), ('prev', self.get_previous_link()))
+            if url
+        ]
+        return ', '.join(links)
+
+    def get_paginated_response(self, data):
+        if self.use_envelope(self.request):
+            return super().get_paginated_response(data)
+
+        link = self.get_link_header()
+        return Response(data, headers={'Link': link} if link else None)
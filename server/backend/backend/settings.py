@@ -170,6 +170,53 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# List endpoints use backend.pagination.KeysetCursorPagination. While clients
+# still expect bare lists, serve them by default: the full list unless the client
+# passes cursor/page_size (then one bounded page, cursors in the Link header).
+# Clients opt into the paged envelope with ?envelope=true.
+PAGINATION_BARE_LIST = config('PAGINATION_BARE_LIST', default=True, cast=bool)
+
+# Cache for computed stats and locks. Per-process memory by default; with several
+# workers point it at a shared backend (e.g. DatabaseCache after createcachetable)
+# so they share cached values and the landing stats refresh lock. Quiz answer keys
+# are only cached with such a shared backend (see quiz.answer_keys).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='kuetx'),
+    }
+}
+
+# Admin dashboard (users.services): how long its counts are cached and how many
+# recent users each of its lists shows (the rest page through /dashboard/users/).
+DASHBOARD_STATS_CACHE_SECONDS = config('DASHBOARD_STATS_CACHE_SECONDS', default=60, cast=int)
+DASHBOARD_USER_LIST_LIMIT = config('DASHBOARD_USER_LIST_LIMIT', default=20, cast=int)
+# Public landing page stats: served from the cache, refreshed in the background by
+# one worker once older than the soft TTL; recomputed inline past the hard TTL.
+LANDING_STATS_SOFT_TTL = config('LANDING_STATS_SOFT_TTL', default=60, cast=int)
+LANDING_STATS_HARD_TTL = config('LANDING_STATS_HARD_TTL', default=3600, cast=int)
+LANDING_STATS_LOCK_SECONDS = config('LANDING_STATS_LOCK_SECONDS', default=30, cast=int)
+
+# Forum moderation verdict cache (forum.moderation): how long a stored verdict
+# stays valid and how many verdicts each worker keeps in memory.
+MODERATION_VERDICT_TTL_DAYS = config('MODERATION_VERDICT_TTL_DAYS', default=30, cast=int)
+MODERATION_VERDICT_LRU_SIZE = config('MODERATION_VERDICT_LRU_SIZE', default=2048, cast=int)
+# Save new forum content as pending and let `manage.py moderate_pending` classify
+# it in the background. Off = check synchronously on write (tests, dev setups).
+MODERATION_ASYNC = config('MODERATION_ASYNC', default=False, cast=bool)
+# Delay before the worker retries an item the classifier couldn't judge; doubles per attempt, up to an hour.
+MODERATION_RETRY_SECONDS = config('MODERATION_RETRY_SECONDS', default=60, cast=int)
+
+# Tag autocomplete (forum.tag_index): how many of the most used tags each worker
+# keeps in memory, and how often it reloads them to pick up other workers' changes.
+TAG_INDEX_MAX_TAGS = config('TAG_INDEX_MAX_TAGS', default=50000, cast=int)
+TAG_INDEX_REFRESH_SECONDS = config('TAG_INDEX_REFRESH_SECONDS', default=300, cast=int)
+
+# Cohort enrollment (courses.cohorts): entries resolved and enrolled per query
+# batch, and how many already-enrolled/unknown entries a response lists.
+COHORT_CHUNK_SIZE = config('COHORT_CHUNK_SIZE', default=500, cast=int)
+COHORT_REPORT_LIMIT = config('COHORT_REPORT_LIMIT', default=1000, cast=int)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'KUETx API',
     'DESCRIPTION': 'API of a modern Learning Management System built to revolutionize online education. Our API includes Authentication, Users, Courses, Course Content, Quiz and Forum',
@@ -187,6 +234,10 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+# Users built from access-token claims (users.authentication) load the rest of
+# their row on first use; each worker caches those rows this long.
+JWT_USER_CACHE_SECONDS = config('JWT_USER_CACHE_SECONDS', default=60, cast=int)
+JWT_USER_CACHE_SIZE = config('JWT_USER_CACHE_SIZE', default=1024, cast=int)
 
 CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default="https://localhost").split()
 
@@ -197,4 +248,12 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
-DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
\ No newline at end of file
+DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+# Outbound email queue (users.outbox). With EMAIL_OUTBOX_ASYNC on (the default),
+# requests only queue messages and `manage.py send_queued_email` delivers them;
+# off = also try to send right away (tests, dev setups without a worker). Failed
+# sends are retried with backoff.
+EMAIL_OUTBOX_ASYNC = config('EMAIL_OUTBOX_ASYNC', default=True, cast=bool)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_SECONDS = config('EMAIL_OUTBOX_RETRY_SECONDS', default=60, cast=int)
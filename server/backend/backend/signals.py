@@ -0,0 +1,14 @@
+"""
+Helpers shared by the apps' signal receivers.
+"""
+from django.db.models import QuerySet
+
+
+def deleted_with(origin, model):
+    """
+    Whether a delete started from `model` rows (an instance or a queryset of them).
+
+    post_delete receivers of child rows use it with the signal's `origin` to skip
+    updating counters on a parent that is being deleted in the same cascade.
+    """
+    return isinstance(origin, model) or (isinstance(origin, QuerySet) and origin.model is model)
@@ -16,7 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from users.views import RegisterView, LoginView, LogoutView, CustomTokenObtainPairView, CustomTokenRefreshView, DashboardStatsView, LandingPageStatsView, VerifyEmailAPIView, RequestPasswordResetView, PasswordResetConfirmView
+from users.views import RegisterView, LoginView, LogoutView, CustomTokenObtainPairView, CustomTokenRefreshView, DashboardStatsView, DashboardUsersView, LandingPageStatsView, VerifyEmailAPIView, RequestPasswordResetView, PasswordResetConfirmView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 urlpatterns = [
@@ -36,6 +36,7 @@ urlpatterns = [
 
     # Admin Panel
     path("dashboard/stats/", DashboardStatsView.as_view(), name="dashboard-stats"),
+    path("dashboard/users/", DashboardUsersView.as_view(), name="dashboard-users"),
 
     #Main Features
     path("courses/", include('courses.urls')),
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def sync_outbox(settings):
+    # No worker runs under the test suite: send queued email inside the request
+    settings.EMAIL_OUTBOX_ASYNC = False
@@ -0,0 +1,121 @@
+"""
+Bulk (cohort) enrollment.
+
+Instructors and admins enroll many students at once from a list of usernames
+or emails, or from an uploaded CSV (first column; a "username"/"email" header
+row is skipped). Entries are handled COHORT_CHUNK_SIZE at a time: one IN
+query resolves a chunk to Student rows, one query finds who is already
+enrolled, and one bulk_create writes the rest. The CSV is read line by line,
+so memory stays bounded by the chunk size however large the file is. Each
+chunk commits on its own, so the view checks the whole upload is UTF-8
+(`validate_csv_upload`) before the first chunk is written.
+
+bulk_create skips Enrollment.save, so the course's and students' enrollment
+counters are updated here with one UPDATE each per chunk, counting only the
+rows this chunk actually inserted.
+"""
+import codecs
+import csv
+from itertools import islice
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from users.models import Student
+from .models import Course, Enrollment
+
+_HEADER_CELLS = {'username', 'email'}
+
+
+def validate_csv_upload(upload):
+    """Raise UnicodeDecodeError unless the whole upload decodes as UTF-8, then rewind it."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for data in upload.chunks():
+        decoder.decode(data)
+    decoder.decode(b'', final=True)
+    upload.seek(0)
+
+
+def csv_identifiers(upload):
+    """Usernames/emails from the first column of an uploaded CSV, streamed line by line."""
+    for line_number, row in enumerate(csv.reader(codecs.iterdecode(upload, 'utf-8-sig'))):
+        cell = row[0].strip() if row else ''
+        if not cell or (line_number == 0 and cell.casefold() in _HEADER_CELLS):
+            continue
+        yield cell
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def enrolled_student_ids(course, student_ids):
+    return set(Enrollment.objects.filter(course=course, student_id__in=student_ids).values_list('student_id', flat=True))
+
+
+def enroll_chunk(course, identifiers):
+    """Enroll the students named in one chunk. Returns (created, already_enrolled, unknown) identifier lists."""
+    identifiers = list(dict.fromkeys(identifiers))  # Drop repeats, keep order
+    students = {}
+    for student_id, username, email in Student.objects.filter(
+        Q(user__username__in=identifiers) | Q(user__email__in=identifiers)
+    ).values_list('id', 'user__username', 'user__email'):
+        students[username] = student_id
+        if email:
+            students.setdefault(email, student_id)
+
+    created, already_enrolled, unknown, new_ids = {}, [], [], set()
+    with transaction.atomic():
+        enrolled_ids = enrolled_student_ids(course, set(students.values()))
+        for identifier in identifiers:
+            student_id = students.get(identifier)
+            if student_id is None:
+                unknown.append(identifier)
+            elif student_id in enrolled_ids or student_id in new_ids:
+                already_enrolled.append(identifier)
+            else:
+                new_ids.add(student_id)
+                created[identifier] = student_id
+
+        while new_ids:
+            try:
+                with transaction.atomic():
+                    Enrollment.objects.bulk_create([Enrollment(course=course, student_id=student_id) for student_id in new_ids])
+                break
+            except IntegrityError:
+                # Students enrolled themselves since the check (their own save counted
+                # them): re-query who is enrolled now and insert only the rest
+                taken = enrolled_student_ids(course, new_ids)
+                if not taken:
+                    raise
+                new_ids -= taken
+                for identifier, student_id in list(created.items()):
+                    if student_id in taken:
+                        del created[identifier]
+                        already_enrolled.append(identifier)
+
+        if new_ids:
+            Course.objects.filter(pk=course.pk).update(enrollment_count=F('enrollment_count') + len(new_ids))
+            Student.objects.filter(pk__in=new_ids).update(course_enrolled=F('course_enrolled') + 1)
+    return list(created), already_enrolled, unknown
+
+
+def enroll_cohort(course, identifiers, chunk_size=None):
+    """
+    Enroll every student named in `identifiers` (any iterable) and report
+    {'created', 'already_enrolled', 'unknown'} counts, plus the first
+    COHORT_REPORT_LIMIT already-enrolled and unknown entries.
+    """
+    chunk_size = chunk_size or getattr(settings, 'COHORT_CHUNK_SIZE', 500)
+    report_limit = getattr(settings, 'COHORT_REPORT_LIMIT', 1000)
+    report = {'created': 0, 'already_enrolled': 0, 'unknown': 0,
+              'already_enrolled_entries': [], 'unknown_entries': []}
+    for chunk in chunked(identifiers, chunk_size):
+        created, already_enrolled, unknown = enroll_chunk(course, chunk)
+        report['created'] += len(created)
+        report['already_enrolled'] += len(already_enrolled)
+        report['unknown'] += len(unknown)
+        for key, entries in (('already_enrolled_entries', already_enrolled), ('unknown_entries', unknown)):
+            report[key].extend(entries[:report_limit - len(report[key])])
+    return report
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    """
+    Recompute every course's stored rating sum, count and average from the
+    Rating rows. Use after bulk imports or if the running totals ever drift.
+    """
+    help = "Rebuild stored course rating totals from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Courses written per bulk update.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        courses = Course.objects.annotate(
+            total=Sum('ratings_set__rating'),
+            count=Count('ratings_set'),
+        ).only('id', 'ratings', 'ratings_sum', 'ratings_count')
+
+        fields = ['ratings', 'ratings_sum', 'ratings_count']
+        batch, rebuilt = [], 0
+        for course in courses.iterator(chunk_size=batch_size):
+            course.ratings_sum = course.total or 0
+            course.ratings_count = course.count
+            course.ratings = course.ratings_sum / course.count if course.count else 0.0
+            batch.append(course)
+            if len(batch) >= batch_size:
+                Course.objects.bulk_update(batch, fields)
+                rebuilt += len(batch)
+                batch = []
+
+        if batch:
+            Course.objects.bulk_update(batch, fields)
+            rebuilt += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating totals for {rebuilt} courses."))
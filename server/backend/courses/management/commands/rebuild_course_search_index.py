@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from courses.models import Course
+from courses.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Re-index every course in the full-text search index. Needed after changes
+    that bypass Course.save(), such as queryset.update() or raw imports.
+    """
+    help = "Rebuild the course full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        indexed = 0
+        for course in Course.objects.only('id', 'title', 'subject', 'description').iterator(chunk_size=500):
+            backend.index_course(course)
+            indexed += 1
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} courses."))
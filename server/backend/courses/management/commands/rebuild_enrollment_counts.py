@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from courses.models import Course
+from users.models import Student
+
+
+class Command(BaseCommand):
+    """
+    Recompute every course's enrollment count and every student's enrolled
+    and completed counts from the Enrollment rows. Use after bulk imports or
+    if the stored counters ever drift.
+    """
+    help = "Rebuild stored course and student enrollment counters from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows written per bulk update.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        courses = Course.objects.annotate(n=Count('enrollment')).only('id', 'enrollment_count')
+        repaired_courses = self.repair(
+            Course, courses, ['enrollment_count'], lambda course: (course.n,), batch_size,
+        )
+        students = Student.objects.annotate(
+            enrolled=Count('enrollment'),
+            completed=Count('enrollment', filter=Q(enrollment__completed_at__isnull=False)),
+        ).only('id', 'course_enrolled', 'course_completed')
+        repaired_students = self.repair(
+            Student, students, ['course_enrolled', 'course_completed'],
+            lambda student: (student.enrolled, student.completed), batch_size,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Repaired enrollment counters on {repaired_courses} courses and {repaired_students} students."
+        ))
+
+    def repair(self, model, queryset, fields, actual, batch_size):
+        """Write the `actual(row)` values into `fields` wherever they differ; returns the rows changed."""
+        batch, repaired = [], 0
+        for row in queryset.iterator(chunk_size=batch_size):
+            values = actual(row)
+            if tuple(getattr(row, field) for field in fields) == values:
+                continue
+            for field, value in zip(fields, values):
+                setattr(row, field, value)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, fields)
+                repaired += len(batch)
+                batch = []
+
+        if batch:
+            model.objects.bulk_update(batch, fields)
+            repaired += len(batch)
+        return repaired
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.8 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+def backfill_rating_totals(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    for course in Course.objects.annotate(
+        total=models.Sum('ratings_set__rating'), count=models.Count('ratings_set')
+    ):
+        course.ratings_sum = course.total or 0
+        course.ratings_count = course.count
+        course.ratings = course.ratings_sum / course.count if course.count else 0.0
+        course.save(update_fields=['ratings', 'ratings_sum', 'ratings_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='ratings_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='ratings_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.8 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_ratings_sum_count'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', '-enrolled_at'], name='enrollment_student_recent_idx'),
+        ),
+    ]
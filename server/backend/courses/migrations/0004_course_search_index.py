@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Full-text search index for courses (see courses/search.py). The storage is
+# vendor specific, so the DDL only runs on the matching database.
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE courses_course ADD COLUMN search_vector tsvector",
+    "UPDATE courses_course SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(subject, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+    "CREATE INDEX courses_course_search_vector_gin ON courses_course USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS courses_course_search_vector_gin",
+    "ALTER TABLE courses_course DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE courses_course_fts USING fts5(title, subject, description, tokenize = 'porter unicode61')",
+    "INSERT INTO courses_course_fts(rowid, title, subject, description) "
+    "SELECT id, title, subject, description FROM courses_course",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS courses_course_fts",
+]
+
+
+def run_for_vendor(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_enrollment_enrollment_student_recent_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
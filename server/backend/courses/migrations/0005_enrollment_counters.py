@@ -0,0 +1,51 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:50
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_enrollment_counters(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Student = apps.get_model('users', 'Student')
+    courses = list(Course.objects.annotate(n=Count('enrollment')))
+    for course in courses:
+        course.enrollment_count = course.n
+    Course.objects.bulk_update(courses, ['enrollment_count'], batch_size=500)
+
+    students = list(Student.objects.annotate(
+        enrolled=Count('enrollment'),
+        completed=Count('enrollment', filter=Q(enrollment__completed_at__isnull=False)),
+    ))
+    for student in students:
+        student.course_enrolled, student.course_completed = student.enrolled, student.completed
+    Student.objects.bulk_update(students, ['course_enrolled', 'course_completed'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_search_index'),
+        ('users', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrollment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-enrollment_count', '-id'], name='course_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-ratings', '-id'], name='course_top_rated_idx'),
+        ),
+        migrations.RunPython(backfill_enrollment_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+def backfill_content_slots(apps, schema_editor):
+    # Existing contents take slots in display order; nobody has progress yet
+    Course = apps.get_model('courses', 'Course')
+    CourseContents = apps.get_model('courses', 'CourseContents')
+    slots = {}
+    for course_id, content_id in CourseContents.objects.order_by('order', 'id').values_list('course_id', 'id'):
+        slots.setdefault(course_id, []).append(content_id)
+    courses = list(Course.objects.filter(id__in=slots).only('id'))
+    for course in courses:
+        course.content_slots = slots[course.id]
+    Course.objects.bulk_update(courses, ['content_slots'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_enrollment_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='content_slots',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='progress',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(backfill_content_slots, migrations.RunPython.noop),
+    ]
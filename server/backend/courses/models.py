@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Coalesce, NullIf
 from users.models import User, Instructor, Student
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
@@ -19,21 +21,53 @@ class Course(models.Model):
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_LEVELS)     # Difficulty level
     subject = models.CharField(max_length=255)       # Course subject/category
     ratings = models.FloatField(default=0.0)     # Average rating
+    ratings_sum = models.PositiveIntegerField(default=0)    # Running sum of all ratings
+    ratings_count = models.PositiveIntegerField(default=0)  # Running number of ratings
     image = models.URLField(blank=True, null=True)        # Optional course image
+    enrollment_count = models.PositiveIntegerField(default=0)   # Enrolled students (kept up to date by Enrollment)
+    content_slots = models.JSONField(default=list, blank=True)  # Content ids by progress bit position (see courses.progress)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-enrollment_count', '-id'], name='course_popular_idx'),     # ?ordering=popular
+            models.Index(fields=['-ratings', '-id'], name='course_top_rated_idx'),     # ?ordering=top_rated
+        ]
+
+    # Columns written only by their own atomic UPDATEs (ratings, enrollments, progress slots)
+    MAINTAINED_FIELDS = frozenset({'ratings', 'ratings_sum', 'ratings_count', 'enrollment_count', 'content_slots'})
 
     def __str__(self):
         return self.title
 
-    # Update course's average rating from all user ratings
+    # Ordinary saves of an existing course leave the maintained columns alone, so an
+    # instance loaded before a concurrent rating/enrollment/content change can't write
+    # back stale values. Pass update_fields explicitly to write them.
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    # Atomically shift the running rating sum/count and recompute the average in one UPDATE
+    @classmethod
+    def apply_rating_delta(cls, course_id, sum_delta, count_delta):
+        new_sum = F('ratings_sum') + sum_delta
+        new_count = F('ratings_count') + count_delta
+        cls.objects.filter(pk=course_id).update(
+            ratings_sum=new_sum,
+            ratings_count=new_count,
+            ratings=Coalesce(Cast(new_sum, FloatField()) / NullIf(new_count, 0), 0.0),
+        )
+
+    # Rebuild course's stored rating sum, count and average from all user ratings
     def update_avg_rating(self):
-        avg_rating = self.ratings_set.aggregate(models.Avg('rating'))['rating__avg']
-        self.ratings = avg_rating if avg_rating else 0.0
-        self.save(update_fields=['ratings'])
-    
-    # Return total number of ratings for the course
-    @property
-    def ratings_count(self):
-        return self.ratings_set.count()
+        totals = self.ratings_set.aggregate(total=models.Sum('rating'), count=models.Count('id'))
+        self.ratings_sum = totals['total'] or 0
+        self.ratings_count = totals['count']
+        self.ratings = self.ratings_sum / self.ratings_count if self.ratings_count else 0.0
+        self.save(update_fields=['ratings', 'ratings_sum', 'ratings_count'])
 
 # Model representing course contents like videos, PDFs, and articles
 class CourseContents(models.Model):
@@ -55,6 +89,15 @@ class CourseContents(models.Model):
     class Meta:
         ordering = ['order']    # Contents sorted by display order
 
+    _stored_course_id = None    # Course as last read from / written to the database
+
+    # Remember the stored course so moving content between courses can update both progress layouts
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_course_id = instance.__dict__.get('course_id')
+        return instance
+
     def __str__(self):
         return f"{self.title}/{self.content_type}"
 
@@ -78,13 +121,49 @@ class Enrollment(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)    # Enrolled course
     student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True)   # Enrolled student
     enrolled_at = models.DateTimeField(auto_now_add=True)   # Timestamp of enrollment
+    completed_at = models.DateTimeField(null=True, blank=True)  # When the student completed the course
+    progress = models.BinaryField(default=b'')    # Completed contents as a bitset over course.content_slots (see courses.progress)
+
+    _stored_completed = False   # Whether the enrollment was completed as last read from / written to the database
 
     class Meta:
         unique_together = ('course', 'student')   # Ensure unique enrollment per student/course
+        indexes = [
+            models.Index(fields=['student', '-enrolled_at'], name='enrollment_student_recent_idx'),   # Keyset pagination of a student's courses
+        ]
 
     def __str__(self):
         return self.course.title
 
+    # Atomically shift the course's enrollment count and the student's enrolled/completed counts (None skips a side)
+    @staticmethod
+    def apply_counter_deltas(course_id, student_id, enrolled=0, completed=0):
+        if course_id is not None and enrolled:
+            Course.objects.filter(pk=course_id).update(enrollment_count=F('enrollment_count') + enrolled)
+        if student_id is not None and (enrolled or completed):
+            Student.objects.filter(pk=student_id).update(
+                course_enrolled=F('course_enrolled') + enrolled,
+                course_completed=F('course_completed') + completed,
+            )
+
+    # Remember the stored completion so a save only counts a change
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_completed = instance.__dict__.get('completed_at') is not None
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        completed = self.completed_at is not None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                self.apply_counter_deltas(self.course_id, self.student_id, enrolled=1, completed=int(completed))
+            elif completed != self._stored_completed:
+                self.apply_counter_deltas(self.course_id, self.student_id, completed=1 if completed else -1)
+        self._stored_completed = completed
+
 # Model representing a student's rating for a course  
 class Rating(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='ratings_set')    # Rated course
@@ -96,17 +175,35 @@ class Rating(models.Model):
     ]
     )
 
+    _stored_rating = None   # Rating value as last read from / written to the database
+
     class Meta:
         unique_together = ('course', 'user')    # One rating per course per user
 
+    # Remember the stored rating so an update only applies the difference
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_rating = instance.__dict__.get('rating')
+        return instance
+
     # Override save method to validate and trigger rating updates
     def save(self, *args, **kwargs):
         # Ensure only enrolled students can rate
         if not Enrollment.objects.filter(course=self.course, student__user=self.user).exists():
             raise ValidationError("You must be enrolled in the course to rate it.")
-        
-        super().save(*args, **kwargs)
-        self.course.update_avg_rating()   # Update course rating after saving   
+
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Update the course's running rating totals after saving
+            if adding:
+                Course.apply_rating_delta(self.course_id, self.rating, 1)
+            elif self._stored_rating is None:
+                self.course.update_avg_rating()   # Previous value unknown, rebuild from scratch
+            elif self.rating != self._stored_rating:
+                Course.apply_rating_delta(self.course_id, self.rating - self._stored_rating, 0)
+        self._stored_rating = self.rating
 
     def __str__(self):
         return f"{self.user.username} - {self.course.title} - {self.rating}"
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Per-content progress, stored as one bitset per enrollment.
+
+Each course keeps `content_slots`, the ids of its contents in the order
+they were added. Bit i of `Enrollment.progress` (little-endian bytes) is set
+when the student has completed the content in slot i. Slots don't follow
+the display order, so reordering contents leaves every bitset valid. Adding
+content appends a slot. Deleting content (or moving it to another course)
+drops its slot and shifts the higher bits of every enrollment in the course
+down by one, so the bitsets stay compact and `len(content_slots)` is always
+the number of contents.
+
+A course counts as completed (Enrollment.completed_at) once every slot's
+bit is set. Once recorded, completion isn't revoked by unmarking items or by
+contents added later.
+"""
+from django.db import transaction
+from django.utils import timezone
+from .models import Course, Enrollment
+
+
+def decode(progress):
+    return int.from_bytes(bytes(progress or b''), 'little')
+
+
+def encode(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def completed_count(progress):
+    return decode(progress).bit_count()
+
+
+def percent_complete(progress, total):
+    """Whole-number percentage of `total` slots completed."""
+    if not total:
+        return 0
+    return min(100, completed_count(progress) * 100 // total)
+
+
+def without_slot(progress, slot):
+    """The bitset with bit `slot` removed and every higher bit shifted down one."""
+    bits = decode(progress)
+    low = bits & ((1 << slot) - 1)
+    return encode(low | ((bits >> (slot + 1)) << slot))
+
+
+def add_content_slot(course_id, content_id):
+    with transaction.atomic():
+        course = Course.objects.select_for_update().only('id', 'content_slots').get(pk=course_id)
+        if content_id not in course.content_slots:
+            course.content_slots.append(content_id)
+            course.save(update_fields=['content_slots'])
+
+
+def remove_content_slot(course_id, content_id, batch_size=500):
+    """Drop the content's slot and compact the progress bitset of every enrollment in the course."""
+    with transaction.atomic():
+        course = Course.objects.select_for_update().only('id', 'content_slots').filter(pk=course_id).first()
+        if course is None or content_id not in course.content_slots:
+            return
+        slot = course.content_slots.index(content_id)
+        course.content_slots.pop(slot)
+        course.save(update_fields=['content_slots'])
+
+        total, changed, newly_completed = len(course.content_slots), [], []
+        enrollments = Enrollment.objects.filter(course_id=course_id).exclude(progress=b'').only('id', 'progress', 'completed_at')
+        for enrollment in enrollments.iterator(chunk_size=batch_size):
+            enrollment.progress = without_slot(enrollment.progress, slot)
+            changed.append(enrollment)
+            # Removing the only outstanding content completes the course
+            if enrollment.completed_at is None and total and completed_count(enrollment.progress) == total:
+                newly_completed.append(enrollment)
+        Enrollment.objects.bulk_update(changed, ['progress'], batch_size=batch_size)
+
+        for enrollment in newly_completed:
+            enrollment.completed_at = timezone.now()
+            enrollment.save(update_fields=['completed_at'])    # Updates the student's completed count
+
+
+def mark_content(enrollment_id, content_id, completed=True):
+    """
+    Set or clear the student's completion of one content item. Returns the
+    updated Enrollment, or None when the content isn't part of the course.
+    """
+    with transaction.atomic():
+        enrollment = Enrollment.objects.select_for_update().select_related('course').get(pk=enrollment_id)
+        slots = enrollment.course.content_slots
+        if content_id not in slots:
+            return None
+
+        bit = 1 << slots.index(content_id)
+        bits = decode(enrollment.progress)
+        enrollment.progress = encode(bits | bit if completed else bits & ~bit)
+        fields = ['progress']
+        if enrollment.completed_at is None and completed_count(enrollment.progress) == len(slots):
+            enrollment.completed_at = timezone.now()
+            fields.append('completed_at')
+        enrollment.save(update_fields=fields)
+        return enrollment
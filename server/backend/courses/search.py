@@ -0,0 +1,147 @@
+"""
+Ranked full-text search over courses.
+
+The search index covers title, subject and description with per-field weights
+(title > subject > description) and lives next to the course table:
+
+- PostgreSQL: a `search_vector` tsvector column on courses_course with a GIN index.
+- SQLite: an FTS5 virtual table `courses_course_fts` whose rowid is the course id.
+
+Both are created by migration 0004 and kept current by the Course save/delete
+signals. Each backend returns course ids ordered by relevance; `search_courses`
+turns them into a queryset annotated with `search_rank` and `search_position`.
+"""
+import re
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, FloatField, Q
+
+# Upper bound on ranked hits fetched per query (keeps the CASE ordering small)
+MAX_SEARCH_RESULTS = 500
+
+SQLITE_FTS_TABLE = 'courses_course_fts'
+
+
+class PostgresCourseSearch:
+    """tsvector/GIN search ranked with ts_rank over weighted fields."""
+
+    def index_course(self, course):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE courses_course SET search_vector = "
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(subject, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'C') "
+                "WHERE id = %s",
+                [course.pk],
+            )
+
+    def remove_course(self, course_id):
+        # The vector lives on the course row and is deleted along with it
+        pass
+
+    def ranked_ids(self, query, limit):
+        tsquery = self.to_tsquery_expression(query)
+        if not tsquery:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, ts_rank(search_vector, q) AS rank "
+                "FROM courses_course, to_tsquery('english', %s) AS q "
+                "WHERE search_vector @@ q ORDER BY rank DESC, id LIMIT %s",
+                [tsquery, limit],
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def to_tsquery_expression(query):
+        # Same terms as SQLite: quoted so user input can't inject tsquery syntax, each prefix-matched, all required
+        terms = re.findall(r'\w+', query)
+        return ' & '.join(f"'{term}':*" for term in terms)
+
+
+class SqliteCourseSearch:
+    """FTS5 search ranked with bm25 over weighted columns."""
+
+    # bm25 column weights: title, subject, description
+    WEIGHTS = (10.0, 4.0, 1.0)
+
+    def index_course(self, course):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {SQLITE_FTS_TABLE}(rowid, title, subject, description) VALUES (%s, %s, %s, %s)",
+                [course.pk, course.title, course.subject, course.description],
+            )
+
+    def remove_course(self, course_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s", [course_id])
+
+    def ranked_ids(self, query, limit):
+        match = self.to_match_expression(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, -bm25({SQLITE_FTS_TABLE}, %s, %s, %s) AS rank FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s ORDER BY rank DESC, rowid LIMIT %s",
+                [*self.WEIGHTS, match, limit],
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def to_match_expression(query):
+        # Quote every word so user input can't inject FTS5 syntax; prefix-match each term
+        terms = re.findall(r'\w+', query)
+        return ' '.join(f'"{term}"*' for term in terms)
+
+
+class FallbackCourseSearch:
+    """Unindexed substring search for databases without a full-text backend."""
+
+    def index_course(self, course):
+        pass
+
+    def remove_course(self, course_id):
+        pass
+
+    def ranked_ids(self, query, limit):
+        from .models import Course
+
+        matches = Course.objects.filter(
+            Q(title__icontains=query) | Q(subject__icontains=query) | Q(description__icontains=query)
+        ).order_by('id').values_list('id', flat=True)[:limit]
+        return [(course_id, 0.0) for course_id in matches]
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresCourseSearch,
+    'sqlite': SqliteCourseSearch,
+}
+
+
+def get_search_backend():
+    return SEARCH_BACKENDS.get(connection.vendor, FallbackCourseSearch)()
+
+
+def search_courses(queryset, query, limit=MAX_SEARCH_RESULTS):
+    """
+    Restrict `queryset` to courses matching `query`, ordered by relevance.
+
+    Annotates `search_rank` (higher is better) and `search_position` (0-based
+    rank order, usable as a keyset pagination column).
+    """
+    hits = get_search_backend().ranked_ids(query, limit)
+    if not hits:
+        return queryset.none()
+
+    course_ids = [course_id for course_id, _ in hits]
+    return queryset.filter(pk__in=course_ids).annotate(
+        search_rank=Case(
+            *[When(pk=course_id, then=Value(float(rank))) for course_id, rank in hits],
+            output_field=FloatField(),
+        ),
+        search_position=Case(
+            *[When(pk=course_id, then=Value(position)) for position, course_id in enumerate(course_ids)],
+            output_field=IntegerField(),
+        ),
+    ).order_by('search_position')
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import Course, CourseContents, Enrollment, Rating
 from users.serializers import InstructorSerializer
 from users.models import Instructor
+from .progress import percent_complete
 
 # Serializer for individual course content (video, pdf, article)
 class CourseContentsSerializer(serializers.ModelSerializer):
@@ -27,26 +28,49 @@ class CourseSerializer(serializers.ModelSerializer):
      # Nested representation of instructor details, read-only
     created_by_details = InstructorSerializer(source='created_by', read_only=True)
     ratings = serializers.FloatField(read_only=True)     # Average course rating
-    ratings_count = serializers.SerializerMethodField()     # Total number of ratings
+    ratings_count = serializers.IntegerField(read_only=True)     # Total number of ratings
+    enrollment_count = serializers.IntegerField(read_only=True)  # Enrolled students
     contents = CourseContentsSerializer(many=True, read_only=True)  # Nested course contents
 
     class Meta:
         model = Course
-        fields = ['id', 'title', 'description', 'created_by', 'created_by_details', 'duration', 'difficulty', 'subject', 'ratings', 'contents', 'ratings_count', "image"]
+        fields = ['id', 'title', 'description', 'created_by', 'created_by_details', 'duration', 'difficulty', 'subject', 'ratings', 'contents', 'ratings_count', 'enrollment_count', "image"]
 
      # Optional custom getter (not used currently due to read_only=True in 'contents')
     def get_contents(self, obj):
         return CourseContentsSerializer(obj.contents.all(), many=True).data
 
-    # Returns total number of ratings for the course
-    def get_ratings_count(self, obj):
-        return obj.ratings_count
+# Course as seen by an enrolled student, with their progress.
+# Expects `progress` and `completed_at` annotated from the student's enrollment
+# (see EnrolledCoursesView.get_queryset).
+class EnrolledCourseSerializer(CourseSerializer):
+    progress_percent = serializers.SerializerMethodField()
+    completed_at = serializers.DateTimeField(read_only=True)    # When the student completed the course
+
+    class Meta(CourseSerializer.Meta):
+        fields = CourseSerializer.Meta.fields + ['progress_percent', 'completed_at']
+
+    def get_progress_percent(self, obj):
+        return percent_complete(obj.progress, len(obj.content_slots))
+
+# Slim serializer for the public course catalog listing.
+# Leaves out nested contents and expects the queryset to join the instructor
+# (see CourseViewSet.get_queryset).
+class CourseListSerializer(serializers.ModelSerializer):
+    created_by_details = InstructorSerializer(source='created_by', read_only=True)
+    ratings = serializers.FloatField(read_only=True)     # Average course rating
+    ratings_count = serializers.IntegerField(read_only=True)    # Total number of ratings
+    enrollment_count = serializers.IntegerField(read_only=True)  # Enrolled students
+
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'description', 'created_by_details', 'duration', 'difficulty', 'subject', 'ratings', 'ratings_count', 'enrollment_count', "image"]
 
 # Serializer for enrollments (student enrolled in a course)
 class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
-        fields = ['id', 'course', 'student', 'enrolled_at']       # Include basic enrollment fields
+        fields = ['id', 'course', 'student', 'enrolled_at', 'completed_at']       # Include basic enrollment fields
 
 # Serializer for a user rating a course
 class RatingSerializer(serializers.ModelSerializer):    
@@ -1,6 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Course
+from backend.signals import deleted_with
+from users.models import Student
+from .models import Course, CourseContents, Enrollment, Rating
+from .progress import add_content_slot, remove_content_slot
+from .search import get_search_backend
+
+# Course fields covered by the full-text search index
+SEARCH_INDEXED_FIELDS = {'title', 'subject', 'description'}
 
 # Signal receiver function to run after a Course instance is saved
 @receiver(post_save, sender=Course)
@@ -15,4 +22,75 @@ def initialize_ratings(sender, instance, created, **kwargs):
     if created and instance.ratings == 0:
          # Update ratings to 0.0 (float) for consistency
         instance.ratings = 0.0
-        instance.save()
\ No newline at end of file
+        instance.save(update_fields=['ratings'])
+
+# Signal receiver function to run after a Rating instance is deleted
+@receiver(post_delete, sender=Rating)
+def remove_rating_from_course(sender, instance, origin=None, **kwargs):
+    """
+    Take a deleted rating out of its course's running sum and count.
+
+    Also fires for cascaded deletes (e.g. a user being removed), which never
+    go through Rating.delete(); a course deleted along with its ratings is
+    left alone.
+    """
+    if deleted_with(origin, Course):
+        return
+    Course.apply_rating_delta(instance.course_id, -instance.rating, -1)
+
+
+# Signal receiver function to run after an Enrollment instance is deleted
+@receiver(post_delete, sender=Enrollment)
+def remove_enrollment_from_counters(sender, instance, origin=None, **kwargs):
+    """
+    Take a deleted enrollment out of its course's enrollment count and its
+    student's enrolled/completed counts, including cascaded deletes. A course
+    or student being deleted along with its enrollments is left alone.
+    """
+    Enrollment.apply_counter_deltas(
+        None if deleted_with(origin, Course) else instance.course_id,
+        None if deleted_with(origin, Student) else instance.student_id,
+        enrolled=-1, completed=-int(instance.completed_at is not None),
+    )
+
+
+# Signal receiver function to keep course progress layouts in step with their contents
+@receiver(post_save, sender=CourseContents)
+def assign_progress_slot(sender, instance, created, **kwargs):
+    """
+    Give new content a progress slot in its course. Content moved to another
+    course leaves its old course's layout and joins the new one.
+    """
+    moved = not created and instance._stored_course_id not in (None, instance.course_id)
+    if moved:
+        remove_content_slot(instance._stored_course_id, instance.pk)
+    if created or moved:
+        add_content_slot(instance.course_id, instance.pk)
+    instance._stored_course_id = instance.course_id
+
+
+@receiver(post_delete, sender=CourseContents)
+def release_progress_slot(sender, instance, origin=None, **kwargs):
+    # Compacts every enrollment's progress bitset for the course (unless the course goes too)
+    if deleted_with(origin, Course):
+        return
+    remove_content_slot(instance.course_id, instance.pk)
+
+
+# Signal receiver function to keep the search index in sync with saved courses
+@receiver(post_save, sender=Course)
+def index_course_for_search(sender, instance, update_fields=None, **kwargs):
+    """
+    Write the course's title, subject and description into the full-text index.
+
+    Saves limited to other fields (e.g. rating totals) leave the index alone.
+    """
+    if update_fields is not None and not SEARCH_INDEXED_FIELDS & set(update_fields):
+        return
+    get_search_backend().index_course(instance)
+
+
+# Signal receiver function to drop deleted courses from the search index
+@receiver(post_delete, sender=Course)
+def remove_course_from_search(sender, instance, **kwargs):
+    get_search_backend().remove_course(instance.pk)
@@ -0,0 +1,120 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from courses import cohorts
+from courses.cohorts import enroll_cohort, enrolled_student_ids
+from courses.models import Course, Enrollment
+from users.models import User, Student, Instructor
+from decouple import config
+
+
+@pytest.mark.django_db
+class TestCohortEnrollment:
+
+    def setup_course(self, students=5):
+        admin_user = User.objects.create_superuser(username="cohort_admin", password=config("TEST_PASSWORD"))
+        instructor_user = User.objects.create_user(username="cohort_instructor", password=config("TEST_PASSWORD"))
+        instructor = Instructor.objects.create(user=instructor_user)
+        course = Course.objects.create(
+            title="Cohort Course", description="Test", created_by=instructor,
+            duration=10, difficulty="beginner", subject="Math",
+        )
+        for i in range(students):
+            user = User.objects.create_user(username=f"cohort_{i}", email=f"cohort_{i}@example.com",
+                                            password=config("TEST_PASSWORD"))
+            Student.objects.create(user=user)
+        return admin_user, instructor_user, course
+
+    def test_enrolls_by_username_and_email_and_reports(self):
+        admin_user, _, course = self.setup_course()
+        Enrollment.objects.create(course=course, student=Student.objects.get(user__username="cohort_0"))
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+
+        response = client.post(f'/courses/enroll/{course.id}/cohort/', {
+            'students': ["cohort_0", "cohort_1", "cohort_2@example.com", "cohort_2", "nobody"],
+        }, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data['created'], response.data['already_enrolled'], response.data['unknown']) == (2, 2, 1)
+        assert response.data['already_enrolled_entries'] == ["cohort_0", "cohort_2"]
+        assert response.data['unknown_entries'] == ["nobody"]
+
+        # bulk_create bypasses Enrollment.save, so the counters are kept here
+        course.refresh_from_db()
+        assert course.enrollment_count == 3
+        assert Student.objects.get(user__username="cohort_1").course_enrolled == 1
+
+    def test_csv_upload_in_chunks(self):
+        _, instructor_user, course = self.setup_course()
+        client = APIClient()
+        client.force_authenticate(user=instructor_user)
+
+        csv_file = SimpleUploadedFile(
+            "cohort.csv", b"username\ncohort_0\ncohort_1@example.com,extra\n\ncohort_2\nghost\n", content_type="text/csv",
+        )
+        response = client.post(f'/courses/enroll/{course.id}/cohort/', {'file': csv_file}, format='multipart')
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data['created'], response.data['unknown']) == (3, 1)
+        assert Enrollment.objects.filter(course=course).count() == 3
+
+    def test_query_count_is_per_chunk(self):
+        _, _, course = self.setup_course(students=6)
+        with CaptureQueriesContext(connection) as queries:
+            report = enroll_cohort(course, (f"cohort_{i}" for i in range(6)), chunk_size=3)
+        assert report['created'] == 6
+        # Per chunk: resolve, existing enrollments, insert, two counter updates (plus savepoints)
+        data_queries = [q for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]
+        assert len(data_queries) == 2 * 5
+
+    def test_rejects_other_instructors_and_bad_input(self):
+        admin_user, _, course = self.setup_course(students=1)
+        other = User.objects.create_user(username="other_instructor", password=config("TEST_PASSWORD"))
+        Instructor.objects.create(user=other)
+        client = APIClient()
+
+        client.force_authenticate(user=other)
+        response = client.post(f'/courses/enroll/{course.id}/cohort/', {'students': ["cohort_0"]}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        client.force_authenticate(user=admin_user)
+        response = client.post(f'/courses/enroll/{course.id}/cohort/', {'students': "cohort_0"}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        csv_file = SimpleUploadedFile("cohort.csv", b"\xff\xfe\x00bad", content_type="text/csv")
+        response = client.post(f'/courses/enroll/{course.id}/cohort/', {'file': csv_file}, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_utf8_late_in_the_file_enrolls_nobody(self, settings):
+        settings.COHORT_CHUNK_SIZE = 1
+        admin_user, _, course = self.setup_course(students=3)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+
+        csv_file = SimpleUploadedFile("cohort.csv", b"cohort_0\ncohort_1\ncohort_2\xff\n", content_type="text/csv")
+        response = client.post(f'/courses/enroll/{course.id}/cohort/', {'file': csv_file}, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Enrollment.objects.exists()
+
+    def test_concurrent_self_enrollment_is_not_counted_twice(self, monkeypatch):
+        _, _, course = self.setup_course(students=3)
+        racer = Student.objects.get(user__username="cohort_1")
+        Enrollment.objects.create(course=course, student=racer)
+        checks = []
+
+        def stale_first_check(course, student_ids):
+            # The first check runs before the student's own enrollment committed
+            checks.append(student_ids)
+            return set() if len(checks) == 1 else enrolled_student_ids(course, student_ids)
+
+        monkeypatch.setattr(cohorts, 'enrolled_student_ids', stale_first_check)
+        report = enroll_cohort(course, ["cohort_0", "cohort_1", "cohort_2"])
+
+        assert (report['created'], report['already_enrolled']) == (2, 1)
+        assert report['already_enrolled_entries'] == ["cohort_1"]
+        course.refresh_from_db()
+        assert course.enrollment_count == Enrollment.objects.filter(course=course).count() == 3
+        racer.refresh_from_db()
+        assert racer.course_enrolled == 1
@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+from courses.models import Course, Enrollment, Rating
+from users.models import User, Instructor, Student
+from decouple import config
+
+
+@pytest.mark.django_db
+class TestRebuildCourseRatingsCommand:
+
+    def test_rebuilds_drifted_totals(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="inst1", password=config("TEST_PASSWORD")))
+        course = Course.objects.create(
+            title="Drifted Course",
+            description="Desc",
+            created_by=instructor,
+            duration=4,
+            difficulty="beginner",
+            subject="Math"
+        )
+        empty_course = Course.objects.create(
+            title="Unrated Course",
+            description="Desc",
+            created_by=instructor,
+            duration=4,
+            difficulty="beginner",
+            subject="Math"
+        )
+        for username, value in [("student1", 3), ("student2", 4)]:
+            user = User.objects.create_user(username=username, password=config("TEST_PASSWORD"))
+            Enrollment.objects.create(course=course, student=Student.objects.create(user=user))
+            Rating.objects.create(course=course, user=user, rating=value)
+
+        Course.objects.update(ratings=1.0, ratings_sum=99, ratings_count=42)
+
+        call_command('rebuild_course_ratings', batch_size=1)
+
+        course.refresh_from_db()
+        empty_course.refresh_from_db()
+        assert (course.ratings_sum, course.ratings_count, course.ratings) == (7, 2, 3.5)
+        assert (empty_course.ratings_sum, empty_course.ratings_count, empty_course.ratings) == (0, 0, 0.0)
+
+
+@pytest.mark.django_db
+def test_rebuild_enrollment_counts_repairs_drifted_counters(capsys):
+    instructor = Instructor.objects.create(user=User.objects.create_user(username="inst1", password=config("TEST_PASSWORD")))
+    course = Course.objects.create(title="Course", description="Desc", created_by=instructor, duration=4, difficulty="beginner", subject="Math")
+    student = Student.objects.create(user=User.objects.create_user(username="student1", password=config("TEST_PASSWORD")))
+    Enrollment.objects.create(course=course, student=student)
+    Course.objects.update(enrollment_count=40)
+    Student.objects.update(course_enrolled=7, course_completed=3)
+
+    call_command('rebuild_enrollment_counts', batch_size=1)
+
+    course.refresh_from_db()
+    student.refresh_from_db()
+    assert course.enrollment_count == 1
+    assert (student.course_enrolled, student.course_completed) == (1, 0)
+    assert "1 courses and 1 students" in capsys.readouterr().out
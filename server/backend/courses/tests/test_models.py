@@ -87,6 +87,65 @@ class TestCourseModel:
 
         course.refresh_from_db()
         assert course.ratings == 4
+        assert course.ratings_count == 2
+        assert course.ratings_sum == 8
+
+    def test_rating_update_and_delete_adjust_running_totals(self):
+        user1 = User.objects.create_user(username="student5", password=config("TEST_PASSWORD"))
+        user2 = User.objects.create_user(username="student6", password=config("TEST_PASSWORD"))
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="inst6", password=config("TEST_PASSWORD")))
+        course = Course.objects.create(
+            title="Running Course",
+            description="Running Desc",
+            created_by=instructor,
+            duration=6,
+            difficulty="beginner",
+            subject="English"
+        )
+        Enrollment.objects.create(course=course, student=Student.objects.create(user=user1))
+        Enrollment.objects.create(course=course, student=Student.objects.create(user=user2))
+        Rating.objects.create(course=course, user=user1, rating=2)
+        Rating.objects.create(course=course, user=user2, rating=4)
+
+        # Update goes through a freshly loaded instance, as update_or_create does
+        rating = Rating.objects.get(course=course, user=user1)
+        rating.rating = 5
+        rating.save()
+        course.refresh_from_db()
+        assert (course.ratings_sum, course.ratings_count, course.ratings) == (9, 2, 4.5)
+
+        Rating.objects.get(course=course, user=user2).delete()
+        course.refresh_from_db()
+        assert (course.ratings_sum, course.ratings_count, course.ratings) == (5, 1, 5.0)
+
+        # Cascaded delete of the user also removes their rating from the totals
+        user1.delete()
+        course.refresh_from_db()
+        assert (course.ratings_sum, course.ratings_count, course.ratings) == (0, 0, 0.0)
+
+    def test_saving_a_stale_course_keeps_maintained_columns(self):
+        from courses.serializers import CourseSerializer
+        user = User.objects.create_user(username="student7", password=config("TEST_PASSWORD"))
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="inst7", password=config("TEST_PASSWORD")))
+        course = Course.objects.create(
+            title="Stale Course", description="Desc", created_by=instructor,
+            duration=6, difficulty="beginner", subject="English"
+        )
+        stale = Course.objects.get(pk=course.pk)
+
+        # Enrollment, rating and new content land while the edit is in flight
+        Enrollment.objects.create(course=course, student=Student.objects.create(user=user))
+        Rating.objects.create(course=course, user=user, rating=4)
+        content = CourseContents.objects.create(course=course, content_type="article", title="Intro", text_content="Text")
+
+        serializer = CourseSerializer(stale, data={'title': "Edited"}, partial=True)
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+
+        course.refresh_from_db()
+        assert course.title == "Edited"
+        assert (course.enrollment_count, course.ratings_sum, course.ratings_count, course.ratings) == (1, 4, 1, 4.0)
+        assert course.content_slots == [content.id]
 
 
 @pytest.mark.django_db
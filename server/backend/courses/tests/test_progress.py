@@ -0,0 +1,153 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework import status
+from courses.models import Course, CourseContents, Enrollment
+from courses.progress import decode, encode, percent_complete, without_slot, mark_content
+from users.models import User, Student, Instructor
+from decouple import config
+
+
+# ---- Bitset helpers ----
+
+def test_encode_decode_round_trip():
+    assert encode(0) == b''
+    assert decode(b'') == 0
+    assert decode(None) == 0
+    assert decode(encode(0b1_0000_0001)) == 0b1_0000_0001
+
+
+def test_without_slot_shifts_higher_bits_down():
+    # Slots 0, 2 and 3 done; dropping slot 2 leaves slots 0 and 2 (was 3)
+    assert decode(without_slot(encode(0b1101), 2)) == 0b101
+    assert decode(without_slot(encode(0b1101), 0)) == 0b110
+
+
+def test_percent_complete():
+    assert percent_complete(encode(0b011), 3) == 66
+    assert percent_complete(encode(0b111), 3) == 100
+    assert percent_complete(b'', 0) == 0
+
+
+# ---- Slots, marking and completion ----
+
+@pytest.mark.django_db
+class TestContentProgress:
+
+    def setup_course(self, contents=3):
+        instructor_user = User.objects.create_user(username="progress_instructor", password=config("TEST_PASSWORD"))
+        student_user = User.objects.create_user(username="progress_student", password=config("TEST_PASSWORD"))
+        instructor = Instructor.objects.create(user=instructor_user)
+        student = Student.objects.create(user=student_user)
+        course = Course.objects.create(
+            title="Progress Course", description="Test", created_by=instructor,
+            duration=10, difficulty="beginner", subject="Math",
+        )
+        items = [
+            CourseContents.objects.create(course=course, title=f"Item {i}", content_type="article",
+                                          text_content="Text", order=i)
+            for i in range(contents)
+        ]
+        enrollment = Enrollment.objects.create(course=course, student=student)
+        return student_user, student, course, items, enrollment
+
+    def test_contents_get_slots_in_creation_order(self):
+        _, _, course, items, _ = self.setup_course()
+        course.refresh_from_db()
+        assert course.content_slots == [item.id for item in items]
+
+    def test_marking_every_content_completes_the_course(self):
+        _, student, _, items, enrollment = self.setup_course()
+        for item in items[:2]:
+            mark_content(enrollment.id, item.id)
+        enrollment.refresh_from_db()
+        assert decode(enrollment.progress) == 0b011
+        assert enrollment.completed_at is None
+
+        mark_content(enrollment.id, items[2].id)
+        enrollment.refresh_from_db()
+        student.refresh_from_db()
+        assert enrollment.completed_at is not None
+        assert student.course_completed == 1
+
+    def test_reordering_keeps_progress(self):
+        _, _, course, items, enrollment = self.setup_course()
+        mark_content(enrollment.id, items[0].id)
+        items[0].order = 99
+        items[0].save()
+        course.refresh_from_db()
+        enrollment.refresh_from_db()
+        assert course.content_slots == [item.id for item in items]
+        assert decode(enrollment.progress) == 0b001
+
+    def test_deleting_content_compacts_progress(self):
+        _, _, course, items, enrollment = self.setup_course()
+        mark_content(enrollment.id, items[0].id)
+        mark_content(enrollment.id, items[2].id)
+
+        items[1].delete()
+        course.refresh_from_db()
+        enrollment.refresh_from_db()
+        assert course.content_slots == [items[0].id, items[2].id]
+        assert decode(enrollment.progress) == 0b11
+        # The only unfinished content is gone, so the course is now complete
+        assert enrollment.completed_at is not None
+
+    def test_moving_content_to_another_course(self):
+        _, _, course, items, enrollment = self.setup_course()
+        other = Course.objects.create(
+            title="Other", description="Test", created_by=course.created_by,
+            duration=1, difficulty="beginner", subject="Math",
+        )
+        mark_content(enrollment.id, items[1].id)
+        moved = CourseContents.objects.get(id=items[0].id)
+        moved.course = other
+        moved.save()
+
+        course.refresh_from_db()
+        other.refresh_from_db()
+        enrollment.refresh_from_db()
+        assert course.content_slots == [items[1].id, items[2].id]
+        assert other.content_slots == [items[0].id]
+        assert decode(enrollment.progress) == 0b01
+
+    # ---- API ----
+
+    def test_complete_endpoint_and_enrolled_list_percent(self):
+        student_user, _, course, items, _ = self.setup_course()
+        client = APIClient()
+        client.force_authenticate(user=student_user)
+
+        response = client.post(f'/courses/content/{items[0].id}/complete/', {'completed': True}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data['completed_contents'], response.data['total_contents']) == (1, 3)
+        assert response.data['progress_percent'] == 33
+
+        response = client.get('/courses/enrolled/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['progress_percent'] == 33
+        assert response.data[0]['completed_at'] is None
+
+        response = client.post(f'/courses/content/{items[0].id}/complete/', {'completed': False}, format='json')
+        assert response.data['progress_percent'] == 0
+
+    def test_complete_endpoint_accepts_form_booleans(self):
+        student_user, _, course, items, _ = self.setup_course()
+        client = APIClient()
+        client.force_authenticate(user=student_user)
+
+        response = client.post(f'/courses/content/{items[0].id}/complete/', {'completed': 'true'}, format='multipart')
+        assert (response.status_code, response.data['completed'], response.data['completed_contents']) == (200, True, 1)
+        response = client.post(f'/courses/content/{items[0].id}/complete/', {'completed': 'false'})
+        assert (response.data['completed'], response.data['completed_contents']) == (False, 0)
+
+    def test_complete_endpoint_rejects_unenrolled_and_bad_input(self):
+        student_user, student, course, items, enrollment = self.setup_course()
+        client = APIClient()
+        client.force_authenticate(user=student_user)
+
+        response = client.post(f'/courses/content/{items[0].id}/complete/', {'completed': 'maybe'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        enrollment.delete()
+        response = client.post(f'/courses/content/{items[0].id}/complete/')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,106 @@
+import importlib
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APIClient
+from courses.models import Course
+from courses.search import search_courses, PostgresCourseSearch, SqliteCourseSearch
+
+
+def make_course(title, subject="General", description="Plain description"):
+    return Course.objects.create(
+        title=title,
+        description=description,
+        duration=5,
+        difficulty="beginner",
+        subject=subject
+    )
+
+
+@pytest.mark.django_db
+class TestCourseSearch:
+
+    def test_matches_title_subject_and_description(self):
+        by_title = make_course("Organic Chemistry")
+        by_subject = make_course("Reactions 101", subject="Chemistry")
+        by_description = make_course("Lab Safety", description="Basics before any chemistry lab work")
+        make_course("Linear Algebra", subject="Math")
+
+        results = list(search_courses(Course.objects.all(), "chemistry"))
+        assert [course.id for course in results] == [by_title.id, by_subject.id, by_description.id]
+        assert results[0].search_rank >= results[1].search_rank >= results[2].search_rank
+
+    def test_index_follows_save_and_delete(self):
+        course = make_course("Intro to Python")
+        assert search_courses(Course.objects.all(), "python").count() == 1
+
+        course.title = "Intro to Rust"
+        course.save()
+        assert search_courses(Course.objects.all(), "python").count() == 0
+        assert search_courses(Course.objects.all(), "rust").count() == 1
+
+        course.delete()
+        assert search_courses(Course.objects.all(), "rust").count() == 0
+
+    def test_rebuild_command_picks_up_bulk_updates(self):
+        course = make_course("Old Title")
+        Course.objects.filter(pk=course.pk).update(title="Astronomy Basics")
+        assert search_courses(Course.objects.all(), "astronomy").count() == 0
+
+        call_command('rebuild_course_search_index')
+        assert search_courses(Course.objects.all(), "astronomy").count() == 1
+
+    def test_endpoint_returns_ranked_pages(self):
+        make_course("Data Science", description="Statistics")
+        best = make_course("Statistics", subject="Statistics")
+        middle = make_course("Probability", subject="Statistics")
+        client = APIClient()
+
+        first = client.get('/courses/?search=statistics&envelope=true&page_size=2')
+        assert [c['id'] for c in first.data['results']][:2] == [best.id, middle.id]
+        second = client.get(first.data['next'])
+        assert len(second.data['results']) == 1
+
+    def test_sqlite_match_expression_is_quoted(self):
+        assert SqliteCourseSearch.to_match_expression('c++ "OR" x*') == '"c"* "OR"* "x"*'
+
+    def test_postgres_tsquery_is_quoted_and_prefix_matched(self):
+        assert PostgresCourseSearch.to_tsquery_expression("c++ 'OR' x:*") == "'c':* & 'OR':* & 'x':*"
+        assert PostgresCourseSearch.to_tsquery_expression("!&|") == ""
+
+    def test_partial_words_match_on_every_backend(self):
+        course = make_course("Organic Chemistry")
+        make_course("Linear Algebra")
+
+        assert [c.id for c in search_courses(Course.objects.all(), "organ chem")] == [course.id]
+        assert search_courses(Course.objects.all(), "organ xyz").count() == 0
+
+
+postgres_only = pytest.mark.skipif(connection.vendor != 'postgresql', reason="PostgreSQL search index")
+
+
+@postgres_only
+@pytest.mark.django_db
+class TestPostgresSearchIndex:
+
+    def test_migration_adds_gin_indexed_vector_and_backfills_it(self):
+        migration = importlib.import_module('courses.migrations.0004_course_search_index')
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'courses_course')
+        assert constraints['courses_course_search_vector_gin']['type'] == 'gin'
+
+        course = make_course("Thermodynamics")
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE courses_course SET search_vector = NULL WHERE id = %s", [course.pk])
+            assert search_courses(Course.objects.all(), "thermo").count() == 0
+            cursor.execute(migration.POSTGRES_FORWARD[1])   # The backfill run over existing rows
+        assert [c.id for c in search_courses(Course.objects.all(), "thermo")] == [course.id]
+
+    def test_ranking_weights_title_over_subject_over_description(self):
+        by_description = make_course("Lab Safety", description="Geology field trips")
+        by_title = make_course("Geology")
+        by_subject = make_course("Rocks 101", subject="Geology")
+
+        results = list(search_courses(Course.objects.all(), "geolog"))
+        assert [c.id for c in results] == [by_title.id, by_subject.id, by_description.id]
+        assert results[0].search_rank > results[1].search_rank > results[2].search_rank
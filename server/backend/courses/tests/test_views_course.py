@@ -1,9 +1,11 @@
 import pytest
 from rest_framework.test import APIClient
-from courses.models import Course
+from courses.models import Course, CourseContents, Enrollment, Rating
 from users.models import User, Instructor, Student
 from rest_framework import status
 from decouple import config
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 @pytest.mark.django_db
 class TestCourseView:
@@ -23,6 +25,135 @@ class TestCourseView:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) > 0  # Ensure there is at least one course
 
+    def _create_courses(self, instructor, count):
+        for i in range(count):
+            course = Course.objects.create(
+                title=f"Course {i}",
+                description="Description",
+                created_by=instructor,
+                duration=10,
+                difficulty="beginner",
+                subject="Math"
+            )
+            CourseContents.objects.create(course=course, content_type="article", title="Intro", text_content="Long article")
+
+    def test_list_omits_contents_and_counts_ratings(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        self._create_courses(instructor, 1)
+        course = Course.objects.get()
+        student_user = User.objects.create_user(username="student1", password=config("TEST_PASSWORD"))
+        Enrollment.objects.create(course=course, student=Student.objects.create(user=student_user))
+        Rating.objects.create(course=course, user=student_user, rating=4)
+
+        response = APIClient().get('/courses/')
+        assert response.status_code == status.HTTP_200_OK
+        listed = response.data[0]
+        assert "contents" not in listed
+        assert listed['ratings_count'] == 1
+        assert listed['created_by_details']['name'] == 'instructor1'
+
+    def test_list_query_count_is_constant(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        client = APIClient()
+        self._create_courses(instructor, 2)
+        with CaptureQueriesContext(connection) as small:
+            client.get('/courses/')
+        self._create_courses(instructor, 20)
+        with CaptureQueriesContext(connection) as large:
+            response = client.get('/courses/')
+        assert len(response.data) == 22
+        assert len(large) == len(small)
+
+    def test_list_walks_cursor_pages(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        self._create_courses(instructor, 5)
+        client = APIClient()
+
+        seen = []
+        url = '/courses/?envelope=true&page_size=2'
+        while url:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) <= 2
+            seen.extend(course['id'] for course in response.data['results'])
+            url = response.data['next']
+        assert seen == sorted(Course.objects.values_list('id', flat=True))
+
+    def test_list_orders_by_popularity_and_rating(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        self._create_courses(instructor, 3)
+        quiet, busy, rated = Course.objects.order_by('id')
+        for number in range(2):
+            student = Student.objects.create(user=User.objects.create_user(username=f"student{number}", password=config("TEST_PASSWORD")))
+            Enrollment.objects.create(course=busy, student=student)
+        Enrollment.objects.create(course=rated, student=student)
+        Course.objects.filter(pk=rated.pk).update(ratings=4.5)
+        client = APIClient()
+
+        popular = client.get('/courses/?ordering=popular&envelope=true&page_size=2')
+        rest = client.get(popular.data['next'])
+        assert [course['id'] for course in popular.data['results'] + rest.data['results']] == [busy.id, rated.id, quiet.id]
+        assert popular.data['results'][0]['enrollment_count'] == 2
+
+        top_rated = client.get('/courses/?ordering=top_rated')
+        assert [course['id'] for course in top_rated.data] == [rated.id, busy.id, quiet.id]   # Ties: newest first
+
+    def test_popular_pages_through_more_than_a_thousand_ties(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        Course.objects.bulk_create(
+            Course(title=f"Course {i}", description="Description", created_by=instructor, duration=10, difficulty="beginner", subject="Math")
+            for i in range(1205)
+        )
+        busy = Course.objects.order_by('id').first()
+        Course.objects.filter(pk=busy.pk).update(enrollment_count=3)
+        client = APIClient()
+
+        seen = []
+        url = '/courses/?ordering=popular&envelope=true&page_size=100'
+        while url:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend(course['id'] for course in response.data['results'])
+            url = response.data['next']
+        tied = sorted(Course.objects.exclude(pk=busy.pk).values_list('id', flat=True), reverse=True)
+        assert seen == [busy.id] + tied
+
+    def test_popular_cursor_survives_counter_changes(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        self._create_courses(instructor, 4)
+        first, second, third, fourth = Course.objects.order_by('-id')
+        client = APIClient()
+
+        page = client.get('/courses/?ordering=popular&envelope=true&page_size=2')
+        assert [course['id'] for course in page.data['results']] == [first.id, second.id]
+        # A course already served gains enrollments while the client pages on
+        Course.objects.filter(pk=first.pk).update(enrollment_count=5)
+        rest = client.get(page.data['next'])
+        assert [course['id'] for course in rest.data['results']] == [third.id, fourth.id]
+        back = client.get(rest.data['previous'])
+        assert [course['id'] for course in back.data['results']] == [first.id, second.id]
+
+    def test_bare_list_mode_links_next_page(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        self._create_courses(instructor, 3)
+
+        response = APIClient().get('/courses/?envelope=false&page_size=2')
+        assert isinstance(response.data, list)
+        assert len(response.data) == 2
+        assert 'rel="next"' in response['Link']
+        assert 'cursor=' in response['Link']
+
+    def test_bare_list_without_paging_params_returns_every_course(self):
+        instructor = Instructor.objects.create(user=User.objects.create_user(username="instructor1", password=config("TEST_PASSWORD")))
+        Course.objects.bulk_create(
+            Course(title=f"Course {i}", description="Description", created_by=instructor, duration=10, difficulty="beginner", subject="Math")
+            for i in range(75)
+        )
+
+        response = APIClient().get('/courses/')
+        assert [course['id'] for course in response.data] == sorted(Course.objects.values_list('id', flat=True))
+        assert not response.has_header('Link')
+
 @pytest.mark.django_db
 class TestCourseDetailView:
 
@@ -1,9 +1,12 @@
 import pytest
 from rest_framework.test import APIClient
 from rest_framework import status
-from courses.models import Course, Enrollment, Rating
+from courses.models import Course, CourseContents, Enrollment, Rating
 from users.models import User, Student, Instructor
 from decouple import config
+from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 @pytest.mark.django_db
 class TestCourseViews:
@@ -40,6 +43,43 @@ class TestCourseViews:
         assert "Successfully enrolled" in response.data['message']
 
 
+    def test_enrollment_counters_follow_enroll_complete_and_delete(self):
+        _, student_user, _, _, student, course = self.setup_user_and_course()
+        client = APIClient()
+        client.force_authenticate(user=student_user)
+
+        client.post(f'/courses/enroll/{course.id}/')
+        client.post(f'/courses/enroll/{course.id}/')    # Already enrolled: no double count
+        course.refresh_from_db()
+        student.refresh_from_db()
+        assert (course.enrollment_count, student.course_enrolled, student.course_completed) == (1, 1, 0)
+
+        enrollment = Enrollment.objects.get(course=course, student=student)
+        enrollment.completed_at = timezone.now()
+        enrollment.save()
+        enrollment.save()   # Unchanged completion isn't counted again
+        student.refresh_from_db()
+        assert student.course_completed == 1
+
+        enrollment.delete()
+        course.refresh_from_db()
+        student.refresh_from_db()
+        assert (course.enrollment_count, student.course_enrolled, student.course_completed) == (0, 0, 0)
+
+    def test_deleting_a_course_only_updates_its_students(self):
+        _, _, _, _, student, course = self.setup_user_and_course()
+        others = [Student.objects.create(user=User.objects.create_user(username=f"other{i}", password=config("TEST_PASSWORD"))) for i in range(3)]
+        for enrolled in [student, *others]:
+            Enrollment.objects.create(course=course, student=enrolled)
+            Rating.objects.create(course=course, user=enrolled.user, rating=4)
+        CourseContents.objects.create(course=course, content_type="article", title="Intro", text_content="Text")
+
+        with CaptureQueriesContext(connection) as queries:
+            course.delete()
+        assert not [q for q in queries.captured_queries if q['sql'].startswith(('UPDATE "courses_course"', 'UPDATE "courses_enrollment"'))]
+        student.refresh_from_db()
+        assert student.course_enrolled == 0
+
     def test_enroll_in_course_already_enrolled(self):
         _, student_user, _, _, student, course = self.setup_user_and_course()
 
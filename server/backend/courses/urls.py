@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CourseViewSet, CourseDetailView, AddCourseView, UpdateContentView, UpdateDeleteCourseView, EnrollCourseView, EnrolledCoursesView, CourseContentsView, InstructorCoursesView, RateCourseView, AddContentAPIView, DeleteContentView, InvoiceDownloadView
+from .views import CourseViewSet, CourseDetailView, AddCourseView, UpdateContentView, UpdateDeleteCourseView, EnrollCourseView, CohortEnrollView, EnrolledCoursesView, CourseContentsView, InstructorCoursesView, RateCourseView, AddContentAPIView, DeleteContentView, MarkContentCompletedView, InvoiceDownloadView
 
 urlpatterns = [
     path('', CourseViewSet.as_view({'get': 'list'}), name='all_courses'),
@@ -9,10 +9,12 @@ urlpatterns = [
     path('content/update/<int:id>/', UpdateContentView.as_view(), name='update_content'),
     path('content/delete/<int:id>/', DeleteContentView.as_view(), name='delete_content'),
     path('enroll/<int:course_id>/', EnrollCourseView.as_view(), name='enroll_course'),
+    path('enroll/<int:course_id>/cohort/', CohortEnrollView.as_view(), name='enroll_cohort'),
     path('enrolled/', EnrolledCoursesView.as_view(), name='get_enrolled_courses'),
     path('content/<int:course_id>/', CourseContentsView.as_view(), name='get_course_content'),
     path("by-instructor/", InstructorCoursesView.as_view(), name="instructor-courses"),
     path('<int:course_id>/rate/', RateCourseView.as_view(), name='course-rating'),
     path('content/add/', AddContentAPIView.as_view(), name='add-content'),
+    path('content/<int:content_id>/complete/', MarkContentCompletedView.as_view(), name='complete-content'),
     path('invoice/<int:course_id>/', InvoiceDownloadView.as_view(), name='generate_invoice')
 ]
\ No newline at end of file
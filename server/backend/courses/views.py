@@ -1,12 +1,23 @@
-from rest_framework import generics, viewsets, filters, status
+from rest_framework import generics, viewsets, status, serializers
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny, BasePermission
 from rest_framework.views import APIView
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import F
+from backend.pagination import KeysetCursorPagination
+from users.authentication import CLAIMS_AUTHENTICATION_CLASSES
 from .models import Course, CourseContents, Enrollment, Rating
-from .serializers import CourseSerializer, CourseContentsSerializer
+from .serializers import CourseSerializer, CourseListSerializer, CourseContentsSerializer, EnrolledCourseSerializer
+from .progress import completed_count, mark_content, percent_complete
+from .cohorts import csv_identifiers, enroll_cohort, validate_csv_upload
+from .search import search_courses
+
+# Catalog sorts served from indexed columns (id breaks ties)
+CATALOG_ORDERINGS = {
+    'popular': ('-enrollment_count', '-id'),
+    'top_rated': ('-ratings', '-id'),
+}
 
 class AdminOnlyAPIView(APIView):
     """Base class for admin-only operations."""
@@ -66,17 +77,43 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Public viewset to list and search courses.
     Only supports read operations.
+    The list uses a slim representation (no nested contents) built from a
+    single joined query; retrieve keeps the full course shape.
+    `?search=` runs a ranked full-text search over title, subject and
+    description (see courses.search) and returns the best matches first.
+    `?ordering=popular` (most enrolled) and `?ordering=top_rated` sort by the
+    stored, indexed counters instead.
     """
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
     permission_classes = [AllowAny]
     serializer_class = CourseSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title']   # Fields to search against
-    
+    pagination_class = KeysetCursorPagination
+
+    @property
+    def cursor_ordering(self):
+        ordering = CATALOG_ORDERINGS.get(self.request.query_params.get('ordering'))
+        if ordering:
+            return ordering
+        # Search results page through their relevance order instead of by id
+        return 'search_position' if self.get_search_query() else 'id'
+
+    def get_search_query(self):
+        return self.request.query_params.get('search', '').strip()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CourseListSerializer
+        return CourseSerializer
+
     def get_queryset(self):
-        queryset = Course.objects.all()
-        search_query = self.request.query_params.get('search')
+        if self.action == 'list':
+            # Join instructor/user in the same query
+            queryset = Course.objects.select_related('created_by__user')
+        else:
+            queryset = Course.objects.all()
+        search_query = self.get_search_query()
         if search_query:
-            queryset = queryset.filter(Q(title__icontains=search_query))
+            queryset = search_courses(queryset, search_query)
         return queryset
 
 
@@ -85,6 +122,7 @@ class CourseDetailView(generics.RetrieveAPIView):
     View to retrieve a single course's details.
     Requires authentication.
     """
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
     permission_classes = [IsAuthenticated]  # Only authenticated users can view course details
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
@@ -149,12 +187,42 @@ class EnrollCourseView(APIView):
         return Response({"message": message}, status=status_code)
 
 
+class CohortEnrollView(InstructorOrAdminAPIView):
+    """
+    Endpoint for admins and the course's instructor to enroll many students
+    at once: {"students": [username or email, ...]} or a CSV upload ("file").
+    """
+    def post(self, request, course_id):
+        course = self.get_course_or_404(course_id)
+        self.check_object_permissions(request, course)
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            # Chunks commit as they go, so reject a bad file before the first one
+            try:
+                validate_csv_upload(upload)
+            except UnicodeDecodeError:
+                return Response({"error": "The CSV file must be UTF-8 encoded"}, status=status.HTTP_400_BAD_REQUEST)
+            identifiers = csv_identifiers(upload)
+        else:
+            students = request.data.get('students')
+            if not isinstance(students, list) or not all(isinstance(entry, str) for entry in students):
+                return Response({"error": "Provide a list of usernames or emails in 'students', or a CSV 'file'"}, status=status.HTTP_400_BAD_REQUEST)
+            identifiers = (entry.strip() for entry in students if entry.strip())
+
+        report = enroll_cohort(course, identifiers)
+        return Response(report, status=status.HTTP_200_OK)
+
+
 class EnrolledCoursesView(generics.ListAPIView):
     """
     List courses a student is enrolled in.
     """
-    serializer_class = CourseSerializer
+    serializer_class = EnrolledCourseSerializer
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-enrolled_at', '-id')   # Most recent enrollment first
 
     def get_queryset(self):
          # Get the list of courses the student is enrolled in
@@ -162,7 +230,12 @@ class EnrolledCoursesView(generics.ListAPIView):
         if not hasattr(user, 'student'):
             return Course.objects.none()
         
-        return Course.objects.filter(enrollment__student=user.student)
+        # The student's progress comes from the enrollment row the filter already joins
+        return Course.objects.filter(enrollment__student=user.student).annotate(
+            enrolled_at=F('enrollment__enrolled_at'),
+            progress=F('enrollment__progress'),
+            completed_at=F('enrollment__completed_at'),
+        )
 
 # ------------------------------- COURSE CONTENTS ----------------------------------
 
@@ -186,6 +259,44 @@ class CourseContentsView(UserEnrollmentMixin, generics.ListAPIView):
         return CourseContents.objects.filter(course=course)
 
 
+class MarkContentCompletedView(APIView):
+    """
+    Endpoint for enrolled students to mark a content item as completed
+    (or not, with {"completed": false}).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, content_id):
+        user = request.user
+        if not hasattr(user, 'student'):
+            return Response({"error": "Only students can track progress"}, status=status.HTTP_403_FORBIDDEN)
+
+        content = get_object_or_404(CourseContents.objects.only('id', 'course_id'), id=content_id)
+        enrollment = Enrollment.objects.filter(course_id=content.course_id, student=user.student).only('id').first()
+        if enrollment is None:
+            return Response({"error": "You must be enrolled in the course to track progress"}, status=status.HTTP_403_FORBIDDEN)
+
+        # Form/multipart posts send "true"/"false" strings; parse like any DRF boolean field
+        try:
+            completed = serializers.BooleanField().to_internal_value(request.data.get('completed', True))
+        except ValidationError:
+            return Response({"error": "completed must be true or false"}, status=status.HTTP_400_BAD_REQUEST)
+
+        enrollment = mark_content(enrollment.id, content.id, completed)
+        if enrollment is None:
+            return Response({"error": "Content not found in course"}, status=status.HTTP_404_NOT_FOUND)
+
+        total = len(enrollment.course.content_slots)
+        return Response({
+            "content": content.id,
+            "completed": completed,
+            "completed_contents": completed_count(enrollment.progress),
+            "total_contents": total,
+            "progress_percent": percent_complete(enrollment.progress, total),
+            "course_completed_at": enrollment.completed_at,
+        }, status=status.HTTP_200_OK)
+
+
 class AddContentAPIView(InstructorOrAdminAPIView):
     """
     Admin can add content to a course.
@@ -225,6 +336,8 @@ class InstructorCoursesView(generics.ListAPIView):
     """
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = 'id'
 
     def get(self, request, *args, **kwargs):
          # Ensure only instructors can access their courses
@@ -235,10 +348,15 @@ class InstructorCoursesView(generics.ListAPIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        courses = Course.objects.filter(created_by=user.instructor)
+        courses = self.paginate_queryset(Course.objects.filter(created_by=user.instructor))
         serialized_courses = CourseSerializer(courses, many=True).data
-        
-        return Response({"courses": serialized_courses}, status=status.HTTP_200_OK)
+
+        # Keeps the legacy {"courses": [...]} shape, with the page cursors alongside
+        return Response({
+            "courses": serialized_courses,
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
+        }, status=status.HTTP_200_OK)
 
 
 #  ------------------------ RATING ------------------------------------
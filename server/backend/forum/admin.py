@@ -3,7 +3,7 @@ from mptt.admin import MPTTModelAdmin
 
 # Register your models here.
 
-from .models import Post, Comment, Vote,Tag
+from .models import Post, Comment, Vote,Tag, ModerationVerdict
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'created_at')
     filter_horizontal = ('tags',)  # Enables a multi-select widget
@@ -16,4 +16,11 @@ class CommentAdmin(MPTTModelAdmin):
     search_fields = ("content", "user__username")
     list_filter = ("created_at",)
 admin.site.register(Vote)
-admin.site.register(Tag)
\ No newline at end of file
+admin.site.register(Tag)
+
+
+class ModerationVerdictAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "model_version", "label", "score", "checked_at")
+    list_filter = ("model_version", "label")
+
+admin.site.register(ModerationVerdict, ModerationVerdictAdmin)
@@ -4,4 +4,6 @@ from django.apps import AppConfig
 class ForumConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "forum"
-#test
\ No newline at end of file
+
+    def ready(self):
+        import forum.signals
@@ -0,0 +1,39 @@
+import time
+from django.core.management.base import BaseCommand
+from ai_utils.hf_detector import detect_toxic_contents
+from forum.moderation import moderate_pending
+
+
+class Command(BaseCommand):
+    """
+    Background moderation worker (used when MODERATION_ASYNC is on).
+
+    Polls the database for pending posts and comments, classifies them in
+    batches with one inference call per batch and publishes or hides them.
+    Needs no broker: run one or more copies under a process supervisor, or
+    with --once from cron.
+    """
+    help = "Classify pending forum content in batches and publish or hide it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=32, help="Items sent to the classifier per call.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        totals = {'published': 0, 'hidden': 0, 'deferred': 0}
+        while True:
+            counts = moderate_pending(detect_toxic_contents, batch_size=options['batch_size'])
+            for key, value in counts.items():
+                totals[key] += value
+
+            classified = counts['published'] + counts['hidden']
+            if options['once'] and not classified:
+                break
+            if not classified:
+                # Empty queue, or the classifier is down and everything was deferred
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {totals['published']}, hid {totals['hidden']}, deferred {totals['deferred']} items."
+        ))
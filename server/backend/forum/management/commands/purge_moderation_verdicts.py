@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from ai_utils.hf_detector import MODEL_VERSION
+from forum.models import ModerationVerdict
+from forum.moderation import verdict_ttl
+
+
+class Command(BaseCommand):
+    """
+    Delete cached moderation verdicts that can no longer be served: those
+    older than MODERATION_VERDICT_TTL_DAYS and those from other classifier
+    versions. Lookups already ignore them; this just keeps the table small.
+    """
+    help = "Delete expired and superseded moderation verdicts."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - verdict_ttl()
+        deleted, _ = ModerationVerdict.objects.filter(
+            Q(checked_at__lte=cutoff) | ~Q(model_version=MODEL_VERSION)
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} stale moderation verdicts."))
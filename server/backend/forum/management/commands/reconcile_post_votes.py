@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from forum.models import Post
+from forum.ranking import hot_score
+
+
+class Command(BaseCommand):
+    """
+    Recompute every post's stored score, upvotes and downvotes from the Vote
+    rows. Use after bulk imports or if the stored counters ever drift.
+    """
+    help = "Rebuild stored post vote counters from the Vote table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Posts written per bulk update.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.annotate(
+            up=Count('votes', filter=Q(votes__value=1)),
+            down=Count('votes', filter=Q(votes__value=-1)),
+        ).only('id', 'created_at', 'score', 'upvotes', 'downvotes', 'hot_score')
+
+        fields = ['score', 'upvotes', 'downvotes', 'hot_score']
+        batch, repaired, checked = [], 0, 0
+        for post in posts.iterator(chunk_size=batch_size):
+            checked += 1
+            if (post.upvotes, post.downvotes, post.score) == (post.up, post.down, post.up - post.down):
+                continue
+            post.upvotes, post.downvotes = post.up, post.down
+            post.score = post.up - post.down
+            post.hot_score = hot_score(post.score, post.created_at)
+            batch.append(post)
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, fields)
+                repaired += len(batch)
+                batch = []
+
+        if batch:
+            Post.objects.bulk_update(batch, fields)
+            repaired += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} posts, repaired vote counters on {repaired}."))
@@ -0,0 +1,40 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from forum.models import Post
+from forum.ranking import hot_score
+
+
+class Command(BaseCommand):
+    """
+    Recompute the stored hot ranking of posts from their stored score and age.
+
+    Vote changes keep hot_score current incrementally; run this periodically
+    (e.g. nightly) to wash out floating-point drift from those increments, and
+    without --days after changing the constants in forum.ranking.
+    """
+    help = "Recompute stored hot ranking values for forum posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Only rescore posts created in the last N days.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Posts written per bulk update.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('id', 'created_at', 'score', 'hot_score').order_by('id')
+        if options['days'] is not None:
+            posts = posts.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+
+        batch, rescored = [], 0
+        for post in posts.iterator(chunk_size=batch_size):
+            post.hot_score = hot_score(post.score, post.created_at)
+            batch.append(post)
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, ['hot_score'])
+                rescored += len(batch)
+                batch = []
+
+        if batch:
+            Post.objects.bulk_update(batch, ['hot_score'])
+            rescored += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rescored {rescored} posts."))
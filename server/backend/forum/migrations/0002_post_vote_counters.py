@@ -0,0 +1,46 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_vote_counters(apps, schema_editor):
+    Post = apps.get_model('forum', 'Post')
+    for post in Post.objects.annotate(
+        up=models.Count('votes', filter=models.Q(votes__value=1)),
+        down=models.Count('votes', filter=models.Q(votes__value=-1)),
+    ):
+        post.upvotes, post.downvotes = post.up, post.down
+        post.score = post.up - post.down
+        post.save(update_fields=['score', 'upvotes', 'downvotes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='downvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-score'], name='post_score_idx'),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:16
+
+from django.conf import settings
+from django.db import migrations, models
+from forum.ranking import hot_score
+
+
+def backfill_hot_scores(apps, schema_editor):
+    Post = apps.get_model('forum', 'Post')
+    posts = list(Post.objects.only('id', 'created_at', 'score'))
+    for post in posts:
+        post.hot_score = hot_score(post.score, post.created_at)
+    Post.objects.bulk_update(posts, ['hot_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_post_vote_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score'], name='post_hot_idx'),
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+    ]
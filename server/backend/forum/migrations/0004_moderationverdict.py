@@ -0,0 +1,27 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0003_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationVerdict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('model_version', models.CharField(max_length=100)),
+                ('label', models.CharField(max_length=50)),
+                ('score', models.FloatField()),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('content_hash', 'model_version')},
+            },
+        ),
+    ]
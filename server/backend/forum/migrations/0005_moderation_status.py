@@ -0,0 +1,23 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0004_moderationverdict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='moderation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('published', 'Published'), ('hidden', 'Hidden')], db_index=True, default='published', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='moderation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('published', 'Published'), ('hidden', 'Hidden')], db_index=True, default='published', max_length=10),
+        ),
+    ]
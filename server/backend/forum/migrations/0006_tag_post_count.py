@@ -0,0 +1,32 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_post_counts(apps, schema_editor):
+    Tag = apps.get_model('forum', 'Tag')
+    tags = list(Tag.objects.annotate(n=Count('posts')))
+    for tag in tags:
+        tag.post_count = tag.n
+    Tag.objects.bulk_update(tags, ['post_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0005_moderation_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-post_count'], name='tag_post_count_idx'),
+        ),
+        migrations.RunPython(backfill_post_counts, migrations.RunPython.noop),
+    ]
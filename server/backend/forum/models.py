@@ -1,10 +1,44 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Lower
 from django.conf import settings
+from django.utils import timezone
 from mptt.models import MPTTModel, TreeForeignKey
+from .ranking import hot_score, vote_weight_expression
+
+# Moderation states shared by posts and comments
+PENDING, PUBLISHED, HIDDEN = 'pending', 'published', 'hidden'
+MODERATION_STATUSES = ((PENDING, 'Pending'), (PUBLISHED, 'Published'), (HIDDEN, 'Hidden'))
+
+class TagQuerySet(models.QuerySet):
+    def named(self, name):
+        # Case-insensitive name match that can use tag_name_lower_idx (name__iexact compiles to LIKE/UPPER and can't)
+        return self.alias(name_lower=Lower('name')).filter(name_lower=Lower(models.Value(name)))
+
 
 # Model representing a Tag for categorizing posts.
 class Tag(models.Model):
     name=models.CharField( max_length=50,unique=True)   # Unique tag name (e.g., 'Python', 'Django')
+    post_count = models.PositiveIntegerField(default=0)    # Posts using this tag (kept up to date by forum.signals)
+
+    objects = TagQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-post_count'], name='tag_post_count_idx'),
+            models.Index(Lower('name'), name='tag_name_lower_idx'),     # Tag.objects.named()
+        ]
+
+    # Recount post_count for the given tags from the Post.tags rows; returns {tag_id: post_count}
+    @classmethod
+    def refresh_post_counts(cls, tag_ids):
+        tag_ids = list(tag_ids)
+        if not tag_ids:
+            return {}
+        usage = cls.posts.through.objects.filter(tag_id=models.OuterRef('pk')).values('tag_id').annotate(n=models.Count('*')).values('n')
+        cls.objects.filter(pk__in=tag_ids).update(post_count=Coalesce(models.Subquery(usage), 0))
+        return dict(cls.objects.filter(pk__in=tag_ids).values_list('pk', 'post_count'))
+
     def __str__(self):
         return self.name
     
@@ -17,11 +51,56 @@ class Post(models.Model):
     content = models.TextField()    # Body/content of the post
     created_at = models.DateTimeField(auto_now_add=True)    # Timestamp when post was created
     updated_at = models.DateTimeField(auto_now=True)
+    score = models.IntegerField(default=0)  # Stored upvotes - downvotes
+    upvotes = models.PositiveIntegerField(default=0)    # Stored number of upvotes
+    downvotes = models.PositiveIntegerField(default=0)  # Stored number of downvotes
+    hot_score = models.FloatField(default=0.0)  # Time-decayed ranking value (see forum.ranking)
+    moderation_status = models.CharField(max_length=10, choices=MODERATION_STATUSES, default=PUBLISHED, db_index=True)   # Only published posts are shown to others
+    moderation_attempts = models.PositiveSmallIntegerField(default=0)  # Classifier runs claimed by the moderate_pending worker
+    moderation_next_attempt_at = models.DateTimeField(null=True, blank=True)  # Claim expiry or retry time while pending
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='post_score_idx'),    # "Highest voted" feed
+            models.Index(fields=['-hot_score'], name='post_hot_idx'),  # "Hot" feed
+            models.Index(fields=['-created_at'], name='post_recent_idx'),  # "Recent" feed
+        ]
+
+    # Give new posts their starting hot ranking
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.hot_score = hot_score(self.score, self.created_at or timezone.now())
+        super().save(*args, **kwargs)
 
     def total_votes(self):
-        # Returns the total vote score (upvotes - downvotes)
+        # Recounts the vote score (upvotes - downvotes) from the Vote rows
         return self.votes.filter(value=1).count() - self.votes.filter(value=-1).count()
 
+    # Atomically shift the stored vote counters by the change from one vote value to another (0 = no vote)
+    @classmethod
+    def apply_vote_delta(cls, post_id, old_value, new_value):
+        if old_value == new_value:
+            return
+        new_score = F('score') + (new_value - old_value)
+        cls.objects.filter(pk=post_id).update(
+            score=new_score,
+            # Swap the old score's weight for the new one; the age part of hot_score is unchanged
+            hot_score=F('hot_score') - vote_weight_expression(F('score')) + vote_weight_expression(new_score),
+            upvotes=F('upvotes') + (int(new_value == 1) - int(old_value == 1)),
+            downvotes=F('downvotes') + (int(new_value == -1) - int(old_value == -1)),
+        )
+
+    # Rebuild the post's stored score and vote counts from its Vote rows
+    def update_vote_counts(self):
+        counts = self.votes.aggregate(
+            upvotes=models.Count('id', filter=models.Q(value=1)),
+            downvotes=models.Count('id', filter=models.Q(value=-1)),
+        )
+        self.upvotes, self.downvotes = counts['upvotes'], counts['downvotes']
+        self.score = self.upvotes - self.downvotes
+        self.hot_score = hot_score(self.score, self.created_at)
+        self.save(update_fields=['score', 'upvotes', 'downvotes', 'hot_score'])
+
     def __str__(self):
         return self.title
 
@@ -34,10 +113,17 @@ class Comment(MPTTModel):
     content = models.TextField()    # The comment text
     created_at = models.DateTimeField(auto_now_add=True)    # Timestamp when comment was made
     updated_at = models.DateTimeField(auto_now=True)    # Timestamp when comment was last edited
-    
+    moderation_status = models.CharField(max_length=10, choices=MODERATION_STATUSES, default=PUBLISHED, db_index=True)   # Only published comments are shown to others
+    moderation_attempts = models.PositiveSmallIntegerField(default=0)  # Classifier runs claimed by the moderate_pending worker
+    moderation_next_attempt_at = models.DateTimeField(null=True, blank=True)  # Claim expiry or retry time while pending
+
     class MPTTMeta:
         order_insertion_by = ['created_at']   # Order comments by creation time
 
+    # Authors always see their own comments, whatever their moderation state
+    def is_visible_to(self, user):
+        return self.moderation_status == PUBLISHED or (user is not None and self.user_id == user.id)
+
     def __str__(self):
         return f"Comment by {self.user} on {self.post}"
 
@@ -48,5 +134,44 @@ class Vote(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="votes")  # Post being voted on
     value = models.SmallIntegerField(choices=VOTE_CHOICES)  # Vote value (1 for upvote, -1 for downvote)
 
+    _stored_value = None    # Vote value as last read from / written to the database
+
     class Meta:
         unique_together = ('user', 'post')  # Ensure a user can only vote once per post
+        indexes = [
+            models.Index(fields=['post', 'value'], name='vote_post_value_idx'),    # Up/downvote counts per post
+        ]
+
+    # Remember the stored value so an update only applies the difference
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_value = instance.__dict__.get('value')
+        return instance
+
+    # Keep the post's stored score and vote counts in step with every saved vote
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Post.apply_vote_delta(self.post_id, 0, self.value)
+            elif self._stored_value is None:
+                Post.objects.get(pk=self.post_id).update_vote_counts()   # Previous value unknown, recount
+            else:
+                Post.apply_vote_delta(self.post_id, self._stored_value, self.value)
+        self._stored_value = self.value
+
+# Model caching the toxicity classifier's verdict for a piece of content.
+class ModerationVerdict(models.Model):
+    content_hash = models.CharField(max_length=64)  # sha256 of the normalized content
+    model_version = models.CharField(max_length=100)    # Classifier that produced the verdict
+    label = models.CharField(max_length=50)     # Most confident label
+    score = models.FloatField()     # Confidence of that label
+    checked_at = models.DateTimeField()     # When the classifier was asked (drives TTL expiry)
+
+    class Meta:
+        unique_together = ('content_hash', 'model_version')  # One verdict per content per model
+
+    def __str__(self):
+        return f"{self.label} ({self.score:.2f}) for {self.content_hash[:12]}"
@@ -0,0 +1,324 @@
+"""
+Cached toxicity verdicts.
+
+The remote classifier is only asked about text it hasn't judged recently.
+Verdicts are keyed by a sha256 of the normalized content (Unicode NFKC,
+case-folded, whitespace collapsed), so re-saving an unchanged body or a bot
+reposting the same spam with different spacing or capitalization costs no
+network call. Lookups go through:
+
+1. a per-process LRU (MODERATION_VERDICT_LRU_SIZE entries),
+2. the ModerationVerdict table, shared by all workers,
+3. the classifier, whose verdict is written back to both.
+
+A verdict expires MODERATION_VERDICT_TTL_DAYS after it was produced and only
+counts for the classifier recorded in its `model_version`, so switching
+models (TOXICITY_MODEL_VERSION) invalidates every older verdict at once.
+Failed classifier calls are never cached. When a trained local prefilter is
+installed (ai_utils.prefilter) it runs before all of this and settles clearly
+benign or clearly toxic text without a lookup; its verdicts aren't stored.
+
+With MODERATION_ASYNC on, new or edited content whose verdict isn't cached is
+saved as pending instead of waiting for the classifier; `moderate_pending`
+(run by the moderate_pending command) classifies pending items in batches and
+publishes or hides them, retrying items it couldn't judge with backoff. Others only see published content; authors always
+see their own.
+"""
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ai_utils import prefilter
+from ai_utils.hf_detector import MODEL_VERSION, DetectorUnavailable
+from .models import ModerationVerdict, Post, Comment, PENDING, PUBLISHED, HIDDEN
+
+# How long a worker's claim on a pending item lasts before another worker may take it
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Toxicity labels considered harmful, and the confidence above which they block
+TOXIC_LABELS = {"toxic", "threat", "insult", "obscene", "severe_toxic", "identity_hate"}
+TOXIC_THRESHOLD = 0.8
+
+
+def normalize_content(text):
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_content(text).encode()).hexdigest()
+
+
+# Extract the most confident label and its score
+def extract_top_label_and_score(response):
+    if not isinstance(response, list) or not response:
+        return None, 0
+
+    # Check for double nesting (some models wrap the output in another list)
+    first = response[0]
+    if isinstance(first, list):     # Handle nested list format
+        response = first
+
+    top = max(response, key=lambda x: x.get('score', 0))
+    label = top.get('label')
+    score = top.get('score', 0)
+    return label, score
+
+
+def verdict_ttl():
+    return timedelta(days=getattr(settings, 'MODERATION_VERDICT_TTL_DAYS', 30))
+
+
+class VerdictLRU:
+    """Thread-safe LRU of (model_version, content_hash) -> (label, score, expires_at)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_lru = VerdictLRU(getattr(settings, 'MODERATION_VERDICT_LRU_SIZE', 2048))
+_stats_lock = threading.Lock()
+_stats = {'lru_hits': 0, 'db_hits': 0, 'misses': 0}
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def verdict_cache_stats():
+    """Return this process's lookup counters and hit ratio (LRU and table hits both count)."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = sum(stats.values())
+    hits = stats['lru_hits'] + stats['db_hits']
+    return {**stats, 'lru_size': len(_lru), 'hit_ratio': hits / lookups if lookups else 0.0}
+
+
+def clear_verdict_cache():
+    """Empty this process's LRU and reset its counters (the table is left alone)."""
+    _lru.clear()
+    with _stats_lock:
+        _stats.update(lru_hits=0, db_hits=0, misses=0)
+
+
+def lookup_verdict(content, model_version=MODEL_VERSION):
+    """Return the cached (label, score) for `content`, or None if it has to be classified."""
+    digest = content_hash(content)
+    key = (model_version, digest)
+    now = timezone.now()
+
+    entry = _lru.get(key, now)
+    if entry is not None:
+        _count('lru_hits')
+        return entry[0], entry[1]
+
+    stored = ModerationVerdict.objects.filter(
+        content_hash=digest, model_version=model_version, checked_at__gt=now - verdict_ttl()
+    ).values_list('label', 'score', 'checked_at').first()
+    if stored is not None:
+        label, score, checked_at = stored
+        _count('db_hits')
+        _lru.put(key, (label, score, checked_at + verdict_ttl()))
+        return label, score
+
+    _count('misses')
+    return None
+
+
+def store_verdict(content, label, score, model_version=MODEL_VERSION):
+    digest = content_hash(content)
+    now = timezone.now()
+    try:
+        ModerationVerdict.objects.update_or_create(
+            content_hash=digest, model_version=model_version,
+            defaults={'label': label, 'score': score, 'checked_at': now},
+        )
+    except IntegrityError:
+        pass    # Another worker stored the same verdict first
+    _lru.put((model_version, digest), (label, score, now + verdict_ttl()))
+
+
+def local_verdict(content):
+    """(label, score) from the local prefilter, or None when it's off or unsure."""
+    result = prefilter.screen(content)
+    if result is None or result.decision == prefilter.ESCALATE:
+        return None
+    return extract_top_label_and_score(result.as_classifier_response())
+
+
+def known_verdict(content, model_version=MODEL_VERSION):
+    """A verdict available without the remote classifier: local prefilter, then the cache."""
+    return local_verdict(content) or lookup_verdict(content, model_version)
+
+
+def get_verdict(content, detect, model_version=MODEL_VERSION):
+    """
+    Return (label, score) for `content`, asking `detect(content)` only on a cache miss.
+
+    `detect` is the classifier call (returns the raw classifier response);
+    its errors propagate. A response without a label is returned as
+    (None, 0) and not cached.
+    """
+    verdict = known_verdict(content, model_version)
+    if verdict is not None:
+        return verdict
+
+    label, score = extract_top_label_and_score(detect(content))
+    if label is not None:
+        store_verdict(content, label, score, model_version)
+    return label, score
+
+
+def get_verdicts(contents, detect_many, model_version=MODEL_VERSION):
+    """
+    Batch version of get_verdict: one `detect_many(texts)` call classifies every
+    distinct uncached text. Returns a (label, score) or None (no usable verdict)
+    per content, in order.
+    """
+    verdicts = [None] * len(contents)
+    misses = {}     # content hash -> (content, indexes waiting for it)
+    for index, content in enumerate(contents):
+        verdict = known_verdict(content, model_version)
+        if verdict is not None:
+            verdicts[index] = verdict
+        else:
+            misses.setdefault(content_hash(content), (content, []))[1].append(index)
+
+    if misses:
+        responses = detect_many([content for content, _ in misses.values()])
+        for (content, indexes), response in zip(misses.values(), responses):
+            label, score = extract_top_label_and_score(response)
+            if label is None:
+                continue
+            store_verdict(content, label, score, model_version)
+            for index in indexes:
+                verdicts[index] = (label, score)
+    return verdicts
+
+
+def is_toxic(label, score):
+    # Block if any of the concerning labels are found with high confidence
+    return label in TOXIC_LABELS and score > TOXIC_THRESHOLD
+
+
+# ---------------------------------------------
+# Asynchronous moderation (MODERATION_ASYNC on)
+# ---------------------------------------------
+def visible_to(user, author_field):
+    """Filter for content others may see: published, plus everything the user wrote."""
+    visible = Q(moderation_status=PUBLISHED)
+    if user is not None and user.is_authenticated:
+        visible |= Q(**{author_field: user})
+    return visible
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'MODERATION_RETRY_SECONDS', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def due_for_moderation():
+    """Pending items whose claim has lapsed or whose retry is due."""
+    return Q(moderation_status=PENDING) & (Q(moderation_next_attempt_at__isnull=True) | Q(moderation_next_attempt_at__lte=timezone.now()))
+
+
+def claim_pending(batch_size):
+    """
+    Claim up to `batch_size` due posts and comments for this worker.
+
+    Claimed rows get one more attempt and are held for CLAIM_LEASE; the claim
+    commits before anything is classified, so no lock is held during the
+    classifier call and a worker that dies mid-batch only delays its items.
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        for model in (Post, Comment):
+            items = list(model.objects.select_for_update(skip_locked=True).filter(due_for_moderation()).order_by('id')[:batch_size - len(claimed)])
+            for item in items:
+                item.moderation_attempts += 1
+                item.moderation_next_attempt_at = now + CLAIM_LEASE
+            model.objects.bulk_update(items, ['moderation_attempts', 'moderation_next_attempt_at'])
+            claimed += items
+    return claimed
+
+
+def apply_verdicts(items, verdicts):
+    """
+    Publish, hide or reschedule claimed items in one short transaction.
+
+    A verdict only lands if the item is still pending and unedited since it
+    was claimed; an item edited meanwhile is released for the next batch. Items without a verdict
+    retry after retry_delay(attempts).
+    """
+    counts = {PUBLISHED: 0, HIDDEN: 0, 'deferred': 0}
+    now = timezone.now()
+    with transaction.atomic():
+        for item, verdict in zip(items, verdicts):
+            unchanged = type(item).objects.filter(pk=item.pk, moderation_status=PENDING, updated_at=item.updated_at)
+            if verdict is None:
+                unchanged.update(moderation_next_attempt_at=now + retry_delay(item.moderation_attempts))
+                counts['deferred'] += 1
+                continue
+            # A plain UPDATE leaves updated_at alone: moderation isn't an edit
+            status = HIDDEN if is_toxic(*verdict) else PUBLISHED
+            if unchanged.update(moderation_status=status, moderation_next_attempt_at=None):
+                counts[status] += 1
+            else:
+                # Edited meanwhile: release the claim so the new text is picked up next
+                type(item).objects.filter(pk=item.pk, moderation_status=PENDING).update(moderation_next_attempt_at=None)
+    return counts
+
+
+def moderate_pending(detect_many, batch_size=32):
+    """
+    Classify one batch of pending posts and comments and publish or hide them.
+
+    Runs in three steps: claim the batch (committed), classify it with no
+    transaction open, then apply the verdicts. Items the classifier couldn't
+    judge stay pending and back off (MODERATION_RETRY_SECONDS, doubling per
+    attempt), so they don't hold up the rest of the queue.
+    Returns {'published', 'hidden', 'deferred'} counts; all zero when nothing is due.
+    """
+    items = claim_pending(batch_size)
+    if not items:
+        return {PUBLISHED: 0, HIDDEN: 0, 'deferred': 0}
+
+    try:
+        verdicts = get_verdicts([item.content for item in items], detect_many)
+    except DetectorUnavailable:
+        # Still apply verdicts that were already cached
+        verdicts = [known_verdict(item.content) for item in items]
+    return apply_verdicts(items, verdicts)
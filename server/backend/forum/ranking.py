@@ -0,0 +1,38 @@
+"""
+"Hot" ranking for forum posts.
+
+Uses the Reddit-style blend of vote score and age:
+
+    hot = sign(score) * log10(max(|score|, 1)) + (created_at - HOT_EPOCH) / HOT_DECAY_SECONDS
+
+Votes count logarithmically (the first 10 weigh as much as the next 90) and
+every HOT_DECAY_SECONDS of age is worth one order of magnitude of score.
+Because age enters as a constant offset from a fixed epoch rather than as
+"now - created_at", a stored value never goes stale: newer posts simply start
+higher, so the feed is a plain range scan over the indexed `hot_score` column.
+The vote part is shifted inside the same UPDATE that changes the post's
+stored score (see Post.apply_vote_delta).
+"""
+import math
+from datetime import datetime, timezone
+from django.db.models import FloatField
+from django.db.models.functions import Abs, Cast, Greatest, Ln, Sign
+
+HOT_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HOT_DECAY_SECONDS = 45000   # 12.5 hours of age per 10x votes
+
+
+def vote_weight(score):
+    """Logarithmic weight of a vote score, signed."""
+    return math.copysign(math.log10(max(abs(score), 1)), score) if score else 0.0
+
+
+def hot_score(score, created_at):
+    """Hot ranking value of a post with `score` created at `created_at`."""
+    return vote_weight(score) + (created_at - HOT_EPOCH).total_seconds() / HOT_DECAY_SECONDS
+
+
+def vote_weight_expression(score):
+    """Database-side vote_weight() of an integer score expression."""
+    score = Cast(score, FloatField())
+    return Sign(score) * Ln(Greatest(Abs(score), 1.0)) / math.log(10)
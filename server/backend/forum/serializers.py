@@ -6,6 +6,7 @@ class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = '__all__'
+        read_only_fields = ['post_count']
 
 # Serializer for the Comment model
 # Includes support for nested/threaded comments (MPTT) 
@@ -20,8 +21,9 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        fields = ['id', 'user', 'post', 'parent_id','parent', 'content', 'created_at', 'updated_at', 'author', 'depth','children', 'is_owner']
-        
+        fields = ['id', 'user', 'post', 'parent_id','parent', 'content', 'created_at', 'updated_at', 'author', 'depth','children', 'is_owner', 'moderation_status']
+        read_only_fields = ['moderation_status']
+
     def get_depth(self, obj):
         # Returns the comment depth using MPTT's `level`
         return obj.level  # MPTT `level` field
@@ -31,10 +33,33 @@ class CommentSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         return request.user == obj.user if request else False
     def get_children(self, obj):
-        # Recursively serializes child comments
-        children = obj.children.all()
+        # Recursively serializes child comments the viewer may see
+        request = self.context.get("request")
+        viewer = request.user if request else None
+        children = [child for child in obj.children.all() if child.is_visible_to(viewer)]
         return CommentSerializer(children, many=True, context=self.context).data if children else []
 
+# Serializer for comments loaded as a whole thread (see forum.threads)
+# Walks the children cached by get_cached_trees instead of querying per node
+class CommentThreadSerializer(CommentSerializer):
+    reply_count = serializers.SerializerMethodField()   # all replies below this comment, loaded or not
+    has_more_replies = serializers.SerializerMethodField()  # replies cut off by max_depth
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['reply_count', 'has_more_replies']
+
+    def get_children(self, obj):
+        children = getattr(obj, '_cached_children', [])
+        return CommentThreadSerializer(children, many=True, context=self.context).data
+
+    def get_reply_count(self, obj):
+        # MPTT bounds give the descendant count without a query
+        return obj.get_descendant_count()
+
+    def get_has_more_replies(self, obj):
+        max_level = self.context.get('max_level')
+        return max_level is not None and obj.level >= max_level and not obj.is_leaf_node()
+
 # Serializer for the Post model
 # Supports tagging, vote count, and author info
 class PostSerializer(serializers.ModelSerializer):
@@ -47,7 +72,8 @@ class PostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
-        fields = ['id', 'author', 'author_name','role', 'title', 'content', 'created_at', 'updated_at', 'total_votes', 'tags', 'tag_ids']
+        fields = ['id', 'author', 'author_name','role', 'title', 'content', 'created_at', 'updated_at', 'total_votes', 'tags', 'tag_ids', 'moderation_status']
+        read_only_fields = ['moderation_status']
 
     def create(self, validated_data):
         # Handles tag assignment while creating a new post
@@ -62,17 +88,21 @@ class PostSerializer(serializers.ModelSerializer):
 
         instance.title = validated_data.get('title', instance.title)
         instance.content = validated_data.get('content', instance.content)
+        instance.moderation_status = validated_data.get('moderation_status', instance.moderation_status)
 
         if tag_ids is not None:
             instance.tags.set(tag_ids)
 
-        instance.save()
+        # Only the edited columns: the vote counters read at the start of the request
+        # may be stale by now (sync moderation can take a while)
+        instance.save(update_fields=['title', 'content', 'moderation_status', 'updated_at'])
         return instance
 
 
     def get_total_votes(self, obj):
-         # Calculates total score: upvotes - downvotes
-        return obj.votes.filter(value=1).count() - obj.votes.filter(value=-1).count()
+         # Use the stored score PostViewSet annotates when present, otherwise count upvotes - downvotes
+        vote_count = getattr(obj, 'vote_count', None)
+        return vote_count if vote_count is not None else obj.total_votes()
 
     def validate_tag_ids(self, value):
         # Custom validation to restrict number of tags
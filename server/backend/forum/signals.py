@@ -0,0 +1,68 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from backend.signals import deleted_with
+from .models import Post, Tag, Vote
+from .tag_index import loaded_tag_index
+
+
+# Signal receiver function to run after a Vote instance is deleted
+@receiver(post_delete, sender=Vote)
+def remove_vote_from_post(sender, instance, origin=None, **kwargs):
+    """
+    Take a deleted vote out of its post's stored score and vote counts.
+
+    Also fires for cascaded deletes (e.g. a user being removed), which never
+    go through the vote toggle endpoint. Votes cascading from their post's own
+    delete are skipped: every vote there belongs to a post on its way out.
+    """
+    if deleted_with(origin, Post):
+        return
+    Post.apply_vote_delta(instance.post_id, instance.value, 0)
+
+
+# ---- Tag post counts and the autocomplete index ----
+def refresh_tag_counts(tag_ids):
+    counts = Tag.refresh_post_counts(tag_ids)
+    index = loaded_tag_index()
+    if index is not None:
+        index.set_counts(counts)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_post_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recount the tags whose posts changed (post.tags.add/remove/set/clear, or the same from the tag side)."""
+    if action == 'pre_clear':
+        # pk_set is None on clear; remember which tags are about to lose this post
+        instance._cleared_tag_ids = [instance.pk] if reverse else list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_tag_counts(getattr(instance, '_cleared_tag_ids', []))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        refresh_tag_counts([instance.pk] if reverse else pk_set)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_tags(sender, instance, **kwargs):
+    # The post's tag rows are deleted without an m2m_changed signal
+    instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_post_tags(sender, instance, **kwargs):
+    refresh_tag_counts(getattr(instance, '_deleted_tag_ids', []))
+
+
+@receiver(post_save, sender=Tag)
+def index_saved_tag(sender, instance, created, **kwargs):
+    index = loaded_tag_index()
+    if index is None:
+        return
+    if not created:
+        index.remove(instance.pk)   # Re-key it in case it was renamed
+    index.add(instance.pk, instance.name, instance.post_count)
+
+
+@receiver(post_delete, sender=Tag)
+def unindex_deleted_tag(sender, instance, **kwargs):
+    index = loaded_tag_index()
+    if index is not None:
+        index.remove(instance.pk)
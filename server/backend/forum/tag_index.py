@@ -0,0 +1,142 @@
+"""
+In-memory tag autocomplete.
+
+Each worker keeps a sorted list of search keys (the case-folded tag name and
+every word suffix of it, so "Machine Learning" is found by "mac" and by
+"lea") and answers prefix lookups with a binary search, ranking the matches
+by how many posts use each tag (Tag.post_count). Lookups never query the
+database once the index is loaded.
+
+The index holds at most TAG_INDEX_MAX_TAGS tags (the most used ones) and is
+reloaded from the database every TAG_INDEX_REFRESH_SECONDS. In between, tags
+created and post counts changed in this process are applied to it directly
+(forum.signals); changes made by other workers show up at the next reload.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from heapq import nsmallest
+from django.conf import settings
+
+_WORD_BREAKS = re.compile(r'[\s\-_/]+')
+
+
+def normalize_tag(text):
+    return ' '.join(text.casefold().split())
+
+
+def search_keys(name):
+    """The full name and each later word onwards: "machine learning" -> ["machine learning", "learning"]."""
+    normalized = normalize_tag(name)
+    keys = [normalized]
+    for match in _WORD_BREAKS.finditer(normalized):
+        if match.end() < len(normalized):
+            keys.append(normalized[match.end():])
+    return keys
+
+
+class TagIndex:
+    """Sorted (key, tag_id) list plus tag_id -> [name, post_count]; safe to share between threads."""
+
+    def __init__(self, max_tags):
+        self.max_tags = max_tags
+        self._keys = []
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.loaded_at = None
+
+    def load(self, rows):
+        """Replace the contents with (id, name, post_count) rows, most used first."""
+        tags = {}
+        for tag_id, name, post_count in rows:
+            if len(tags) >= self.max_tags:
+                break
+            tags[tag_id] = [name, post_count]
+        keys = sorted((key, tag_id) for tag_id, (name, _) in tags.items() for key in search_keys(name))
+        with self._lock:
+            self._tags, self._keys = tags, keys
+            self.loaded_at = time.monotonic()
+
+    def add(self, tag_id, name, post_count=0):
+        with self._lock:
+            if tag_id in self._tags:
+                return
+            if len(self._tags) >= self.max_tags:
+                # Full: make room only by dropping a less used tag
+                least_used = min(self._tags, key=lambda existing: self._tags[existing][1])
+                if self._tags[least_used][1] >= post_count:
+                    return
+                self._discard(least_used)
+            self._tags[tag_id] = [name, post_count]
+            for key in search_keys(name):
+                insort(self._keys, (key, tag_id))
+
+    def remove(self, tag_id):
+        with self._lock:
+            self._discard(tag_id)
+
+    def set_counts(self, counts):
+        """Apply {tag_id: post_count}; tags outside the index wait for the next reload."""
+        with self._lock:
+            for tag_id, post_count in counts.items():
+                if tag_id in self._tags:
+                    self._tags[tag_id][1] = post_count
+
+    def search(self, prefix, limit=10):
+        """Up to `limit` {'id', 'name', 'post_count'} dicts whose name or a word in it starts with `prefix`."""
+        prefix = normalize_tag(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            keys, tags = self._keys, self._tags
+            matches = set()
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and keys[position][0].startswith(prefix):
+                matches.add(keys[position][1])
+                position += 1
+            # Most used first, then alphabetical
+            best = nsmallest(limit, matches, key=lambda tag_id: (-tags[tag_id][1], tags[tag_id][0].casefold()))
+            return [{'id': tag_id, 'name': tags[tag_id][0], 'post_count': tags[tag_id][1]} for tag_id in best]
+
+    def _discard(self, tag_id):
+        entry = self._tags.pop(tag_id, None)
+        if entry is None:
+            return
+        for key in search_keys(entry[0]):
+            position = bisect_left(self._keys, (key, tag_id))
+            if position < len(self._keys) and self._keys[position] == (key, tag_id):
+                del self._keys[position]
+
+    def __len__(self):
+        return len(self._tags)
+
+
+_index = TagIndex(getattr(settings, 'TAG_INDEX_MAX_TAGS', 50000))
+_reload_lock = threading.Lock()
+
+
+def get_tag_index():
+    """This process's TagIndex, (re)loaded from the database when missing or older than the refresh interval."""
+    refresh_seconds = getattr(settings, 'TAG_INDEX_REFRESH_SECONDS', 300)
+    if _index.loaded_at is None or time.monotonic() - _index.loaded_at >= refresh_seconds:
+        with _reload_lock:
+            if _index.loaded_at is None or time.monotonic() - _index.loaded_at >= refresh_seconds:
+                reload_tag_index()
+    return _index
+
+
+def reload_tag_index():
+    from .models import Tag
+    _index.load(Tag.objects.order_by('-post_count', 'name').values_list('id', 'name', 'post_count')[:_index.max_tags])
+
+
+def loaded_tag_index():
+    """The index if this process has loaded it, else None (nothing to keep up to date yet)."""
+    return _index if _index.loaded_at is not None else None
+
+
+def reset_tag_index():
+    """Forget the loaded index; the next lookup reloads it."""
+    _index.load([])
+    _index.loaded_at = None
@@ -2,6 +2,9 @@ import pytest
 from forum.models import Tag, Post, Comment, Vote
 from users.models import User
 from decouple import config
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from forum.serializers import PostSerializer
 
 @pytest.mark.django_db
 class TestModels:
@@ -61,3 +64,36 @@ class TestModels:
 
         assert post.total_votes() == 0  # 1 - 1 = 0
 
+
+    def test_post_edit_keeps_votes_cast_meanwhile(self):
+        author = User.objects.create_user(username="author", password=config("TEST_PASSWORD"))
+        voter = User.objects.create_user(username="voter", password=config("TEST_PASSWORD"))
+        tag = Tag.objects.create(name="Python")
+        post = Post.objects.create(author=author, title="Edit me", content="Before")
+        stale = Post.objects.get(pk=post.pk)
+
+        Vote.objects.create(user=voter, post=post, value=1)
+        serializer = PostSerializer(stale, data={'title': "Edited", 'content': "After", 'tag_ids': [tag.id]})
+        assert serializer.is_valid(), serializer.errors
+        serializer.save()
+
+        post.refresh_from_db()
+        assert (post.title, post.score, post.upvotes) == ("Edited", 1, 1)
+
+    def test_deleting_a_post_skips_its_votes_counter_updates(self):
+        author = User.objects.create_user(username="author", password=config("TEST_PASSWORD"))
+        post = Post.objects.create(author=author, title="Doomed", content="Bye")
+        other = Post.objects.create(author=author, title="Stays", content="Hi")
+        for number in range(5):
+            voter = User.objects.create_user(username=f"voter{number}", password=config("TEST_PASSWORD"))
+            Vote.objects.create(user=voter, post=post, value=1)
+            Vote.objects.create(user=voter, post=other, value=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        assert not [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "forum_post"')]
+
+        # A cascade from elsewhere (the voter) still adjusts the surviving post
+        voter.delete()
+        other.refresh_from_db()
+        assert (other.score, other.upvotes) == (4, 4)
@@ -0,0 +1,255 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock, patch
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from decouple import config
+from ai_utils import prefilter
+from ai_utils.hf_detector import DetectorUnavailable
+from ai_utils.prefilter import ScreenResult
+from forum.models import Post, Comment, Tag, ModerationVerdict
+from forum.moderation import get_verdict, verdict_cache_stats, clear_verdict_cache, content_hash, moderate_pending
+from users.models import User
+
+TOXIC = [[{"label": "toxic", "score": 0.95}, {"label": "insult", "score": 0.3}]]
+
+
+@pytest.fixture(autouse=True)
+def empty_verdict_cache():
+    clear_verdict_cache()
+    yield
+    clear_verdict_cache()
+
+
+@pytest.mark.django_db
+class TestVerdictCache:
+
+    def test_normalized_repeats_skip_the_classifier(self):
+        detect = Mock(return_value=TOXIC)
+
+        assert get_verdict("Buy   CHEAP pills\n", detect) == ("toxic", 0.95)
+        assert get_verdict("buy cheap pills", detect) == ("toxic", 0.95)   # LRU
+        clear_verdict_cache()
+        assert get_verdict("BUY cheap PILLS", detect) == ("toxic", 0.95)   # table
+
+        assert detect.call_count == 1
+        assert ModerationVerdict.objects.count() == 1
+        stats = verdict_cache_stats()
+        assert (stats['lru_hits'], stats['db_hits'], stats['misses']) == (0, 1, 0)
+        assert stats['hit_ratio'] == 1.0
+
+    def test_expired_and_other_model_verdicts_are_ignored(self):
+        detect = Mock(return_value=TOXIC)
+        get_verdict("spam", detect)
+        clear_verdict_cache()
+
+        get_verdict("spam", detect, model_version="toxic-bert-v2")
+        assert detect.call_count == 2
+        assert ModerationVerdict.objects.count() == 2
+
+        ModerationVerdict.objects.update(checked_at=timezone.now() - timedelta(days=31))
+        clear_verdict_cache()
+        get_verdict("spam", detect)
+        assert detect.call_count == 3
+
+    def test_failed_classifier_calls_are_not_cached(self):
+        detect = Mock(return_value={"error": "503: loading"})
+        assert get_verdict("hello", detect) == (None, 0)
+        assert get_verdict("hello", detect) == (None, 0)
+        assert detect.call_count == 2
+        assert not ModerationVerdict.objects.exists()
+
+    def test_purge_command_drops_stale_verdicts(self):
+        now = timezone.now()
+        ModerationVerdict.objects.create(content_hash=content_hash("fresh"), model_version="unitary/toxic-bert", label="non-toxic", score=0.9, checked_at=now)
+        ModerationVerdict.objects.create(content_hash=content_hash("old"), model_version="unitary/toxic-bert", label="toxic", score=0.9, checked_at=now - timedelta(days=60))
+        ModerationVerdict.objects.create(content_hash=content_hash("fresh"), model_version="retired-model", label="toxic", score=0.9, checked_at=now)
+
+        call_command('purge_moderation_verdicts')
+        assert list(ModerationVerdict.objects.values_list('model_version', 'content_hash')) == [("unitary/toxic-bert", content_hash("fresh"))]
+
+
+@pytest.mark.django_db
+def test_editing_title_does_not_reclassify_unchanged_body():
+    user = User.objects.create_user(username="editor", password=config("TEST_PASSWORD"))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    tag = Tag.objects.create(name="Django")
+
+    with patch("forum.views.detect_toxic_content", return_value=[{"label": "non-toxic", "score": 0.9}]) as detect:
+        response = client.post(reverse("post-list"), {"title": "First", "content": "Same body", "tag_ids": [tag.id]}, format="json")
+        post_id = response.data['id']
+        for title in ("Second", "Third"):
+            response = client.put(reverse("post-detail", args=[post_id]), {"title": title, "content": "Same body", "tag_ids": [tag.id]}, format="json")
+            assert response.status_code == 200
+
+    assert detect.call_count == 1
+    assert Post.objects.get(id=post_id).title == "Third"
+
+
+# =======================
+# Asynchronous moderation
+# =======================
+def classify_by_keyword(texts):
+    # Stands in for the batched inference call: "idiot" is an insult, anything else is fine
+    return [[{"label": "insult", "score": 0.93}] if "idiot" in text else [{"label": "non-toxic", "score": 0.97}] for text in texts]
+
+
+@pytest.fixture
+def async_moderation(settings):
+    settings.MODERATION_ASYNC = True
+
+
+@pytest.fixture
+def forum_users():
+    author = User.objects.create_user(username="author", password=config("TEST_PASSWORD"))
+    reader = User.objects.create_user(username="reader", password=config("TEST_PASSWORD"))
+    clients = {}
+    for user in (author, reader):
+        clients[user.username] = APIClient()
+        clients[user.username].force_authenticate(user=user)
+    return author, clients
+
+
+def feed_titles(client):
+    return [post['title'] for post in client.get(reverse("post-list")).data]
+
+
+@pytest.mark.django_db
+def test_async_posts_stay_pending_until_the_worker_publishes_or_hides_them(async_moderation, forum_users):
+    author, clients = forum_users
+    tag = Tag.objects.create(name="Python")
+
+    with patch("forum.views.detect_toxic_content") as detect:
+        for title, content in (("Kind", "Thanks for the help"), ("Rude", "you idiot")):
+            response = clients["author"].post(reverse("post-list"), {"title": title, "content": content, "tag_ids": [tag.id]}, format="json")
+            assert response.status_code == 201
+            assert response.data["moderation_status"] == "pending"
+    detect.assert_not_called()
+
+    assert sorted(feed_titles(clients["author"])) == ["Kind", "Rude"]   # authors see their own pending posts
+    assert feed_titles(clients["reader"]) == []
+    assert feed_titles(APIClient()) == []
+
+    post = Post.objects.get(title="Kind")
+    Comment.objects.create(post=post, user=author, content="idiot reply", moderation_status="pending")
+    detect_many = Mock(side_effect=classify_by_keyword)
+    counts = moderate_pending(detect_many, batch_size=10)
+
+    assert counts == {"published": 1, "hidden": 2, "deferred": 0}
+    counts = moderate_pending(detect_many, batch_size=10)
+    assert counts == {"published": 0, "hidden": 0, "deferred": 0}
+    assert detect_many.call_count == 1
+    assert sorted(detect_many.call_args.args[0]) == ["Thanks for the help", "idiot reply", "you idiot"]
+    assert feed_titles(clients["reader"]) == ["Kind"]
+    assert sorted(feed_titles(clients["author"])) == ["Kind", "Rude"]
+    assert Comment.objects.get().moderation_status == "hidden"
+
+
+@pytest.mark.django_db
+def test_async_write_uses_cached_verdicts_immediately(async_moderation, forum_users):
+    author, clients = forum_users
+    tag = Tag.objects.create(name="Spam")
+    for text in ("buy pills now", "hello world"):
+        Post.objects.create(author=author, title=text, content=text, moderation_status="pending")
+    moderate_pending(classify_by_keyword)
+
+    # Known-good text is published at once; known-toxic text is rejected like in synchronous mode
+    response = clients["reader"].post(reverse("post-list"), {"title": "Hi", "content": "Hello   World", "tag_ids": [tag.id]}, format="json")
+    assert response.data["moderation_status"] == "published"
+
+    Post.objects.create(author=author, title="x", content="idiot", moderation_status="pending")
+    moderate_pending(classify_by_keyword)
+    response = clients["reader"].post(reverse("post-list"), {"title": "Again", "content": "IDIOT", "tag_ids": [tag.id]}, format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_worker_defers_items_while_the_classifier_is_down(forum_users):
+    author, _ = forum_users
+    post = Post.objects.create(author=author, title="Waiting", content="please check me", moderation_status="pending")
+
+    counts = moderate_pending(Mock(side_effect=DetectorUnavailable("circuit open")))
+    assert counts == {"published": 0, "hidden": 0, "deferred": 1}
+    post.refresh_from_db()
+    assert post.moderation_status == "pending" and post.moderation_attempts == 1
+    assert post.moderation_next_attempt_at > timezone.now()
+
+    # Not retried before its backoff runs out
+    detect_many = Mock(side_effect=classify_by_keyword)
+    assert moderate_pending(detect_many) == {"published": 0, "hidden": 0, "deferred": 0}
+    assert detect_many.call_count == 0
+
+    Post.objects.filter(pk=post.pk).update(moderation_next_attempt_at=timezone.now())
+    with patch("forum.management.commands.moderate_pending.detect_toxic_contents", side_effect=classify_by_keyword):
+        call_command("moderate_pending", once=True, batch_size=1)
+    post.refresh_from_db()
+    assert post.moderation_status == "published"
+
+
+@pytest.mark.django_db
+def test_worker_classifies_outside_the_claim_and_skips_edited_items(forum_users):
+    author, _ = forum_users
+    post = Post.objects.create(author=author, title="Edited", content="you idiot", moderation_status="pending")
+
+    def edit_while_classifying(texts):
+        claimed = Post.objects.get(pk=post.pk)
+        assert claimed.moderation_attempts == 1 and claimed.moderation_next_attempt_at > timezone.now()
+        claimed.content = "thanks, sorry"
+        claimed.save()
+        return classify_by_keyword(texts)
+
+    counts = moderate_pending(edit_while_classifying)
+    assert counts == {"published": 0, "hidden": 0, "deferred": 0}
+    post.refresh_from_db()
+    assert post.moderation_status == "pending"   # The insult verdict was for the old text
+
+    # The edit is due at once and judged on its own
+    assert moderate_pending(classify_by_keyword) == {"published": 1, "hidden": 0, "deferred": 0}
+
+
+@pytest.mark.django_db
+def test_thread_hides_unpublished_comments_and_their_replies_from_others(forum_users):
+    author, clients = forum_users
+    reader = User.objects.get(username="reader")
+    post = Post.objects.create(author=author, title="Thread", content="body")
+    hidden = Comment.objects.create(post=post, user=author, content="removed", moderation_status="hidden")
+    Comment.objects.create(post=post, user=reader, parent=hidden, content="reply to removed")
+    Comment.objects.create(post=post, user=reader, content="visible")
+
+    url = reverse("comment-thread") + f"?post={post.id}"
+    assert [c['content'] for c in clients["reader"].get(url).data['comments']] == ["visible"]
+    author_view = clients["author"].get(url).data['comments']
+    assert [c['content'] for c in author_view] == ["removed", "visible"]
+    assert author_view[0]['moderation_status'] == "hidden"
+
+
+# =======================
+# Local prefilter stage
+# =======================
+class KeywordPrefilter:
+    # Clears "thanks", blocks "garbage", is unsure about anything else
+    def screen(self, text):
+        if "thanks" in text.lower():
+            return ScreenResult(prefilter.BENIGN, 0.01, [])
+        if "garbage" in text.lower():
+            return ScreenResult(prefilter.TOXIC, 0.99, [])
+        return ScreenResult(prefilter.ESCALATE, 0.5, [])
+
+
+@pytest.mark.django_db
+def test_prefilter_settles_clear_cases_without_the_remote_model(forum_users, monkeypatch):
+    monkeypatch.setitem(prefilter._loaded, 'prefilter', KeywordPrefilter())
+    author, clients = forum_users
+    tag = Tag.objects.create(name="Help")
+
+    with patch("forum.views.detect_toxic_content", return_value=[{"label": "non-toxic", "score": 0.9}]) as detect:
+        benign = clients["author"].post(reverse("post-list"), {"title": "A", "content": "Thanks a lot", "tag_ids": [tag.id]}, format="json")
+        toxic = clients["author"].post(reverse("post-list"), {"title": "B", "content": "this is garbage", "tag_ids": [tag.id]}, format="json")
+        unsure = clients["author"].post(reverse("post-list"), {"title": "C", "content": "hmm, maybe", "tag_ids": [tag.id]}, format="json")
+
+    assert (benign.status_code, toxic.status_code, unsure.status_code) == (201, 400, 201)
+    detect.assert_called_once_with("hmm, maybe")
+    assert not ModerationVerdict.objects.exclude(content_hash=content_hash("hmm, maybe")).exists()
@@ -155,4 +155,126 @@ def test_delete_comment_denied_for_non_author():
 
     # Assert that the response status is 403 Forbidden
     assert response.status_code == 403
-    assert response.data["detail"] == "You do not have permission to perform this action."
\ No newline at end of file
+    assert response.data["detail"] == "You do not have permission to perform this action."
+
+# =======================
+# Whole-thread loading
+# =======================
+def build_thread(user, post, depth, siblings=1):
+    # A chain `depth` levels deep, with `siblings` top-level comments
+    roots = []
+    for _ in range(siblings):
+        parent = Comment.objects.create(post=post, user=user, content="root")
+        roots.append(parent)
+        for level in range(1, depth):
+            parent = Comment.objects.create(post=post, user=user, parent=parent, content=f"level {level}")
+    return roots
+
+
+def thread_depth(node):
+    return 1 + max((thread_depth(child) for child in node['children']), default=0)
+
+
+@pytest.mark.django_db
+def test_thread_loads_deep_discussion_in_constant_queries(django_user_model):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    user = django_user_model.objects.create_user(username="writer", password="password")
+    post = Post.objects.create(title="Deep", content="Thread", author=user)
+    client = APIClient()
+    url = reverse("comment-thread") + f"?post={post.id}"
+
+    build_thread(user, post, depth=2)
+    with CaptureQueriesContext(connection) as shallow:
+        client.get(url)
+
+    build_thread(user, post, depth=12)
+    with CaptureQueriesContext(connection) as deep:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(deep) == len(shallow) == 1
+    assert [thread_depth(root) for root in response.data['comments']] == [2, 12]
+    assert response.data['comments'][1]['reply_count'] == 11
+    assert response.data['next'] is None
+
+
+@pytest.mark.django_db
+def test_thread_max_depth_and_reply_expansion(django_user_model):
+    user = django_user_model.objects.create_user(username="writer", password="password")
+    post = Post.objects.create(title="Deep", content="Thread", author=user)
+    root = build_thread(user, post, depth=5)[0]
+    client = APIClient()
+
+    response = client.get(reverse("comment-thread") + f"?post={post.id}&max_depth=2")
+    top = response.data['comments'][0]
+    reply = top['children'][0]
+    assert thread_depth(top) == 2
+    assert reply['has_more_replies'] is True and reply['children'] == []
+
+    expanded = client.get(reverse("comment-thread") + f"?post={post.id}&parent={reply['id']}")
+    assert thread_depth(expanded.data['comments'][0]) == 3
+    assert expanded.data['comments'][0]['parent'] == reply['id']
+    assert root.id == top['id']
+
+
+@pytest.mark.django_db
+def test_thread_continuation_tokens_cover_every_comment(django_user_model):
+    user = django_user_model.objects.create_user(username="writer", password="password")
+    post = Post.objects.create(title="Busy", content="Thread", author=user)
+    build_thread(user, post, depth=3, siblings=3)
+    client = APIClient()
+
+    seen, cursor = [], None
+    while True:
+        url = reverse("comment-thread") + f"?post={post.id}&limit=4" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        stack = list(response.data['comments'])
+        while stack:
+            node = stack.pop()
+            seen.append(node['id'])
+            stack.extend(node['children'])
+        cursor = response.data['next']
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(Comment.objects.filter(post=post).values_list('id', flat=True))
+
+    assert client.get(reverse("comment-thread") + f"?post={post.id}&cursor=garbage").status_code == 400
+    assert client.get(reverse("comment-thread")).status_code == 400
+
+
+def thread_ids(client, post, limit):
+    seen, cursor = [], None
+    while True:
+        url = reverse("comment-thread") + f"?post={post.id}&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        stack = list(response.data['comments'])
+        while stack:
+            node = stack.pop()
+            seen.append(node['id'])
+            stack.extend(node['children'])
+        cursor = response.data['next']
+        if not cursor:
+            return seen
+
+
+@pytest.mark.django_db
+def test_thread_hides_replies_under_hidden_comments_on_every_page(django_user_model):
+    from forum.models import HIDDEN
+
+    author = django_user_model.objects.create_user(username="writer", password="password")
+    troll = django_user_model.objects.create_user(username="troll", password="password")
+    post = Post.objects.create(title="Busy", content="Thread", author=author)
+    root = Comment.objects.create(post=post, user=author, content="root")
+    hidden = Comment.objects.create(post=post, user=troll, parent=root, content="rude", moderation_status=HIDDEN)
+    replies = [Comment.objects.create(post=post, user=author, parent=hidden, content=f"reply {n}") for n in range(3)]
+    sibling = Comment.objects.create(post=post, user=author, parent=root, content="sibling")
+
+    # With one comment per page, later pages start right under the hidden comment
+    for limit in (1, 2, 10):
+        assert sorted(thread_ids(APIClient(), post, limit)) == sorted([root.id, sibling.id])
+
+    client = APIClient()
+    client.force_authenticate(user=troll)
+    assert sorted(thread_ids(client, post, 2)) == sorted([root.id, hidden.id, sibling.id] + [reply.id for reply in replies])
@@ -1,10 +1,16 @@
 import pytest
+from datetime import timedelta
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from forum.models import Post, Tag
+from forum.ranking import HOT_DECAY_SECONDS, hot_score
 from users.models import User
 from unittest.mock import patch
+from ai_utils.hf_detector import DetectorUnavailable
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 # =======================
 # Fixture for authentication
@@ -124,6 +130,16 @@ class TestPostViews:
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "toxic" in str(response.data[0])  # or check exact string if needed
+
+    def test_post_rejected_when_detector_unavailable_and_failing_closed(self, authenticated_client, test_tag):
+        client, user = authenticated_client
+        data = {"title": "Unchecked", "content": "cannot be checked", "tag_ids": [test_tag.id]}
+
+        with patch("forum.views.detect_toxic_content", side_effect=DetectorUnavailable("circuit open")):
+            response = client.post(reverse("post-list"), data, format="json")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert not Post.objects.filter(title="Unchecked").exists()
     
 
 @pytest.mark.django_db
@@ -174,4 +190,65 @@ class TestPostQuerySetFiltering:
         response = client.get(reverse('post-list') + '?tag=python')
         assert response.status_code == 200
         assert len(response.data) == 1
-        assert response.data[0]['title'] == "Tagged Post"
\ No newline at end of file
+        assert response.data[0]['title'] == "Tagged Post"
+
+    def test_filter_hot_blends_votes_and_age(self, authenticated_client):
+        client, user = authenticated_client
+        voters = [User.objects.create_user(username=f"voter{i}", password="test123") for i in range(10)]
+        old_popular = Post.objects.create(title="Old Popular", content="a", author=user)
+        fresh = Post.objects.create(title="Fresh", content="b", author=user)
+        buried = Post.objects.create(title="Buried", content="c", author=user)
+        for voter in voters[:2]:
+            buried.votes.create(user=voter, value=-1)
+        for voter in voters:
+            old_popular.votes.create(user=voter, value=1)
+
+        # Ten votes are worth one HOT_DECAY_SECONDS of age
+        Post.objects.filter(pk=old_popular.pk).update(created_at=fresh.created_at - timedelta(seconds=HOT_DECAY_SECONDS / 2))
+        call_command('rescore_hot_posts')
+        response = client.get(reverse('post-list') + '?filter=hot')
+        assert [post['title'] for post in response.data] == ["Old Popular", "Fresh", "Buried"]
+
+        Post.objects.filter(pk=old_popular.pk).update(created_at=fresh.created_at - timedelta(seconds=HOT_DECAY_SECONDS * 1.2))
+        call_command('rescore_hot_posts')
+        response = client.get(reverse('post-list') + '?filter=hot')
+        assert [post['title'] for post in response.data] == ["Fresh", "Old Popular", "Buried"]
+
+    def test_votes_keep_hot_score_current(self, authenticated_client):
+        client, user = authenticated_client
+        post = Post.objects.create(title="Voted", content="v", author=user)
+        voters = [User.objects.create_user(username=f"hot{i}", password="test123") for i in range(3)]
+        for voter in voters:
+            post.votes.create(user=voter, value=1)
+        post.votes.filter(user=voters[0]).delete()
+
+        post.refresh_from_db()
+        assert post.score == 2
+        assert post.hot_score == pytest.approx(hot_score(2, post.created_at))
+
+@pytest.mark.django_db
+class TestPostFeedQueries:
+
+    def _create_posts(self, user, tag, count):
+        for i in range(count):
+            post = Post.objects.create(title=f"Post {i}", content="body", author=user)
+            post.tags.add(tag)
+            post.votes.create(user=user, value=1)
+
+    def test_feed_query_count_is_constant(self, authenticated_client, test_tag):
+        client, user = authenticated_client
+
+        self._create_posts(user, test_tag, 2)
+        with CaptureQueriesContext(connection) as small:
+            client.get(reverse('post-list'))
+
+        self._create_posts(user, test_tag, 48)
+        with CaptureQueriesContext(connection) as large:
+            response = client.get(reverse('post-list'))
+
+        assert len(response.data) == 50
+        assert len(large) == len(small)
+        assert len(large) <= 3     # posts with author join + prefetched tags (+ auth)
+        assert response.data[0]['total_votes'] == 1
+        assert response.data[0]['author_name'] == user.username
+        assert response.data[0]['tags'][0]['name'] == test_tag.name
@@ -1,8 +1,19 @@
 import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from users.models import User 
-from forum.models import Tag
+from forum.models import Post, Tag
+from forum.tag_index import get_tag_index, reset_tag_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_tag_index():
+    # The index lives in process memory and would otherwise outlive each test's rollback
+    reset_tag_index()
+    yield
+    reset_tag_index()
 
 
 @pytest.fixture
@@ -71,3 +82,69 @@ def test_search_empty_query(authenticated_client):
 
     assert response.status_code == status.HTTP_200_OK
     assert len(response.data) == 0  # Should return empty list when no query is provided
+
+
+def make_post(user, *tags):
+    post = Post.objects.create(author=user, title="Post", content="Body")
+    post.tags.add(*tags)
+    return post
+
+@pytest.mark.django_db
+def test_search_ranks_prefix_matches_by_post_count(authenticated_client):
+    client, user = authenticated_client
+    python, pytest_tag, pyramid = (Tag.objects.create(name=name) for name in ("Python", "Pytest", "Pyramid"))
+    for _ in range(3):
+        make_post(user, pytest_tag)
+    make_post(user, python)
+    Tag.objects.create(name="Numpy")   # Contains "py" but doesn't start with it
+
+    response = client.get("/forum/tags/search/?q=py")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [tag['name'] for tag in response.data] == ["Pytest", "Python", "Pyramid"]
+    assert [tag['post_count'] for tag in response.data] == [3, 1, 0]
+
+@pytest.mark.django_db
+def test_search_matches_later_words_and_respects_limit(authenticated_client):
+    client, user = authenticated_client
+    Tag.objects.create(name="Machine Learning")
+    Tag.objects.create(name="Deep-Learning")
+    Tag.objects.create(name="Lean")
+
+    response = client.get("/forum/tags/search/?q=lea&limit=2")
+
+    assert len(response.data) == 2
+    assert {tag['name'] for tag in client.get("/forum/tags/search/?q=learn").data} == {"Machine Learning", "Deep-Learning"}
+
+@pytest.mark.django_db
+def test_search_is_served_from_memory_and_sees_new_tags(authenticated_client):
+    client, user = authenticated_client
+    Tag.objects.create(name="Django")
+    client.get("/forum/tags/search/?q=dj")     # Loads the index
+
+    created = client.post("/forum/tags/", {"name": "Django REST"})
+    assert created.status_code == status.HTTP_201_CREATED
+
+    with CaptureQueriesContext(connection) as queries:
+        response = get_tag_index().search("dja")
+    assert len(queries) == 0
+    assert {tag['name'] for tag in response} == {"Django", "Django REST"}
+
+@pytest.mark.django_db
+def test_post_counts_follow_tag_changes(authenticated_client):
+    client, user = authenticated_client
+    django, python = Tag.objects.create(name="Django"), Tag.objects.create(name="Python")
+    get_tag_index()
+    post = make_post(user, django, python)
+    other = make_post(user, django)
+
+    post.tags.remove(python)
+    other.tags.clear()
+    django.refresh_from_db()
+    python.refresh_from_db()
+    assert (django.post_count, python.post_count) == (1, 0)
+
+    post.delete()
+    django.refresh_from_db()
+    assert django.post_count == 0
+    assert get_tag_index().search("django")[0]['post_count'] == 0
@@ -165,3 +165,54 @@ def test_remove_vote(authenticated_client):
     # Check that the vote is deleted from the database
     with pytest.raises(Vote.DoesNotExist):
         Vote.objects.get(id=initial_vote.id)  # Should raise an error because the vote is deleted
+
+@pytest.mark.django_db
+def test_vote_toggle_keeps_stored_counters(authenticated_client):
+    user, client = authenticated_client
+    other = User.objects.create_user(username="other", email="other@example.com", password="strongpassword123")
+    post = Post.objects.create(title="Counters", content="Counter content", author=user)
+    Vote.objects.create(user=other, post=post, value=1)
+
+    steps = [(1, 2, (2, 0)), (-1, 0, (1, 1)), (-1, 1, (1, 0))]
+    for value, score, (upvotes, downvotes) in steps:
+        response = client.post("/forum/votes/", {"post": post.id, "value": value})
+        post.refresh_from_db()
+        assert response.data["total_votes"] == post.score == score
+        assert (post.upvotes, post.downvotes) == (upvotes, downvotes)
+
+    # Cascaded vote deletes come off the counters too
+    other.delete()
+    post.refresh_from_db()
+    assert (post.score, post.upvotes, post.downvotes) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_vote_toggle_never_counts_votes(authenticated_client):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    user, client = authenticated_client
+    post = Post.objects.create(title="Queries", content="Query content", author=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post("/forum/votes/", {"post": post.id, "value": 1})
+    assert response.data["total_votes"] == 1
+    assert not any("COUNT(" in query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_reconcile_post_votes_command(authenticated_client):
+    from django.core.management import call_command
+
+    user, client = authenticated_client
+    post = Post.objects.create(title="Drifted", content="Drifted content", author=user)
+    quiet = Post.objects.create(title="Quiet", content="No votes", author=user)
+    Vote.objects.create(user=user, post=post, value=-1)
+    Post.objects.update(score=40, upvotes=41, downvotes=1)
+
+    call_command('reconcile_post_votes', batch_size=1)
+
+    post.refresh_from_db()
+    quiet.refresh_from_db()
+    assert (post.score, post.upvotes, post.downvotes) == (-1, 0, 1)
+    assert (quiet.score, quiet.upvotes, quiet.downvotes) == (0, 0, 0)
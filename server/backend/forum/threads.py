@@ -0,0 +1,106 @@
+"""
+Whole-thread comment loading.
+
+A post's comments are fetched in one query ordered by the MPTT (tree_id, lft)
+columns, i.e. depth-first thread order, and assembled into trees in memory
+(each comment's children cached as get_cached_trees would) so serialization
+never goes back to the database.
+
+Very large threads are cut into pages of `limit` comments; the continuation
+token is the (tree_id, lft) of the last comment sent, so the next page picks
+up the depth-first walk where the previous one stopped. Comments whose replies
+lie below `max_depth` report `has_more_replies` and can be expanded by loading
+the thread again with `parent=<comment id>`.
+
+Comments the viewer may not see (someone else's pending or hidden comments)
+are excluded in the query together with everything below them, i.e. every
+comment inside a hidden comment's (tree_id, lft, rght) range. Whichever page
+a reply lands on, it is never shown without its ancestors.
+"""
+import base64
+import binascii
+import json
+from django.db.models import Exists, OuterRef, Q
+from .models import Comment
+from .moderation import visible_to
+
+DEFAULT_THREAD_LIMIT = 200
+MAX_THREAD_LIMIT = 500
+
+
+class InvalidThreadCursor(ValueError):
+    """Raised when a continuation token can't be decoded."""
+
+
+def encode_thread_cursor(comment):
+    payload = json.dumps([comment.tree_id, comment.lft]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_thread_cursor(token):
+    try:
+        tree_id, lft = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return int(tree_id), int(lft)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidThreadCursor("Invalid continuation token.")
+
+
+def load_thread(post_id, parent=None, max_depth=None, limit=DEFAULT_THREAD_LIMIT, cursor=None, viewer=None):
+    """
+    Load one page of a comment thread as cached trees.
+
+    Returns (root comments, deepest level loaded or None, next continuation token or None).
+    `parent` restricts the thread to that comment's replies; `max_depth`
+    limits how many reply levels below the starting level are included;
+    `viewer` decides which unpublished comments are shown (see Comment.is_visible_to).
+    """
+    comments = Comment.objects.filter(post_id=post_id).select_related('user')
+    comments = comments.exclude(Exists(hidden_ancestors(viewer)))
+    base_level = 0
+    if parent is not None:
+        comments = comments.filter(tree_id=parent.tree_id, lft__gt=parent.lft, rght__lt=parent.rght)
+        base_level = parent.level + 1
+
+    max_level = None
+    if max_depth is not None:
+        max_level = base_level + max_depth - 1
+        comments = comments.filter(level__lte=max_level)
+
+    if cursor:
+        tree_id, lft = decode_thread_cursor(cursor)
+        comments = comments.filter(Q(tree_id__gt=tree_id) | Q(tree_id=tree_id, lft__gt=lft))
+
+    comments = comments.order_by('tree_id', 'lft')
+    nodes = list(comments[:limit + 1])
+    next_cursor = encode_thread_cursor(nodes[limit - 1]) if len(nodes) > limit else None
+    nodes = nodes[:limit]
+
+    return build_trees(nodes), max_level, next_cursor
+
+
+def hidden_ancestors(viewer):
+    """Comments `viewer` may not see that are the outer comment itself or one of its ancestors."""
+    return Comment.objects.filter(
+        tree_id=OuterRef('tree_id'), lft__lte=OuterRef('lft'), rght__gte=OuterRef('rght'),
+    ).exclude(visible_to(viewer, 'user'))
+
+
+def build_trees(nodes):
+    """
+    Link depth-first ordered comments into trees, caching each one's children.
+
+    Comments whose parent isn't among `nodes` (it was on an earlier page, or
+    above `parent`) come back as roots.
+    """
+    roots = []
+    by_id = {}
+    for node in nodes:
+        node._cached_children = []
+        by_id[node.id] = node
+        parent = by_id.get(node.parent_id)
+        if parent is None:
+            roots.append(node)
+        else:
+            node.parent = parent
+            parent._cached_children.append(node)
+    return roots
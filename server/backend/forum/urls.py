@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CommentViewSet, VoteViewSet, TagViewSet
+from .views import PostViewSet, CommentViewSet, VoteViewSet, TagViewSet, ModerationMetricsView
 
 # Use a router to auto-generate URL patterns for viewsets
 router = DefaultRouter()
@@ -12,4 +12,5 @@ router.register(r'tags', TagViewSet)
 urlpatterns = [
     path('', include(router.urls)),  # Automatically include all viewset routes
     path('votes/<int:post_id>/user-vote/', VoteViewSet.as_view({'get': 'get_user_vote'})),  # Keep custom endpoint
+    path('moderation/metrics/', ModerationMetricsView.as_view(), name='moderation-metrics'),
 ]
@@ -1,51 +1,71 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
 from rest_framework.decorators import action
 
-from .models import Post, Comment, Vote,Tag
-from .serializers import PostSerializer, CommentSerializer, VoteSerializer,TagSerializer
+from .models import Post, Comment, Vote,Tag, PENDING, PUBLISHED
+from .serializers import PostSerializer, CommentSerializer, CommentThreadSerializer, VoteSerializer,TagSerializer
+from .voting import toggle_vote
+from .moderation import get_verdict, known_verdict, is_toxic, visible_to, verdict_cache_stats
+from .tag_index import get_tag_index
+from .threads import load_thread, InvalidThreadCursor, DEFAULT_THREAD_LIMIT, MAX_THREAD_LIMIT
 from .permissions import IsAuthorOrReadOnly
-from django.db.models import Count, Sum, Case, When, IntegerField, F,Q
-from ai_utils.hf_detector import detect_toxic_content
+from django.conf import settings
+from django.db.models import F
+from ai_utils.hf_detector import detect_toxic_content, detector_metrics, DetectorUnavailable
+from ai_utils.prefilter import stats as prefilter_stats
+from users.authentication import CLAIMS_AUTHENTICATION_CLASSES
 
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import ValidationError, APIException
 
+PERMISSION_DENIED_MESSAGE = "Permission Denied"
+TAG_SEARCH_LIMIT, MAX_TAG_SEARCH_LIMIT = 10, 25
 
-from rest_framework.exceptions import ValidationError
-
-# Toxicity labels considered harmful
-TOXIC_LABELS = {"toxic", "threat", "insult", "obscene", "severe_toxic", "identity_hate"}
 
-PERMISSION_DENIED_MESSAGE = "Permission Denied"
+class ModerationUnavailable(APIException):
+    status_code = 503
+    default_detail = "Content moderation is temporarily unavailable. Please try again shortly."
+    default_code = "moderation_unavailable"
 
 # Utility function to block toxic content
 def block_if_toxic(content):
     if not content:
         return
 
-    toxic_response = detect_toxic_content(content)
-
-    label, score = extract_top_label_and_score(toxic_response)
+    try:
+        # Unchanged or repeated text is answered from the verdict cache without a network call
+        label, score = get_verdict(content, detect_toxic_content)
+    except DetectorUnavailable:
+        # Fail-closed policy: reject the write rather than publish unchecked content
+        raise ModerationUnavailable()
 
     # Block if any of the concerning labels are found with high confidence
-    if label in TOXIC_LABELS and score > 0.8:
+    if is_toxic(label, score):
         raise ValidationError(f"Your content was flagged as '{label}'  Please revise it.")
 
-# Extract the most confident label and its score
-def extract_top_label_and_score(response):
-    if not isinstance(response, list) or not response:
-        return None, 0
+# Decide the moderation state new or edited content is saved with
+def moderation_status_for(content):
+    if not settings.MODERATION_ASYNC:
+        block_if_toxic(content)  # Synchronous mode: wait for the classifier
+        return PUBLISHED
 
-    # Check for double nesting (some models wrap the output in another list)
-    first = response[0]
-    if isinstance(first, list):     # Handle nested list format
-        response = first
+    if not content:
+        return PUBLISHED
+    verdict = known_verdict(content)
+    if verdict is None:
+        return PENDING  # The moderate_pending worker will publish or hide it
+    if is_toxic(*verdict):
+        raise ValidationError(f"Your content was flagged as '{verdict[0]}'  Please revise it.")
+    return PUBLISHED
 
-    top = max(response, key=lambda x: x.get('score', 0))
-    label = top.get('label')
-    score = top.get('score', 0)
-    return label, score
+# Save an edit, re-moderating only when the body actually changed
+def save_moderated_update(serializer):
+    content = serializer.validated_data.get('content')
+    if content is None or content == serializer.instance.content:
+        serializer.save()
+    else:
+        serializer.save(moderation_status=moderation_status_for(content))
 
 
 
@@ -53,42 +73,38 @@ def extract_top_label_and_score(response):
 # Post CRUD + filtering logic
 # --------------------------
 class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all().order_by('-created_at').prefetch_related('tags')
+    queryset = Post.objects.all().order_by('-created_at').select_related('author').prefetch_related('tags')
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
 
     def get_queryset(self):
-         # Annotate vote counts for filtering/sorting
-        queryset = super().get_queryset().annotate(
-            upvotes=Count('votes', filter=Q(votes__value=1)),  # Count only upvotes
-            downvotes=Count('votes', filter=Q(votes__value=-1)),  # Count only downvotes
-            vote_count=F('upvotes') - F('downvotes')  # Compute total vote score
-        )
+         # Read the stored vote score instead of counting votes per request
+        queryset = super().get_queryset().annotate(vote_count=F('score'))
+        queryset = queryset.filter(visible_to(self.request.user, 'author'))  # Hide others' pending/hidden posts
         filter_type = self.request.query_params.get('filter', 'recent')
         tag_name = self.request.query_params.get('tag')
          # Filter based on query param
         if filter_type == 'highest_voted':
-             queryset = queryset.order_by('-vote_count')
+             queryset = queryset.order_by('-score')
+        elif filter_type == 'hot':
+            queryset = queryset.order_by('-hot_score', '-id')
         elif filter_type == 'user_posts' and self.request.user.is_authenticated:
             
             queryset = queryset.filter(author=self.request.user)
         # Filter by tag
         if tag_name:
-            queryset = queryset.filter(tags__name__iexact=tag_name)
+            queryset = queryset.filter(tags__in=Tag.objects.named(tag_name))
 
         return queryset
 
     def perform_create(self, serializer):
-        # Check for toxicity before saving
+        # Check for toxicity before saving (or queue the post for the moderation worker)
         content = serializer.validated_data.get('content')
-        block_if_toxic(content)  # ✅ Will raise exception if toxic
-        serializer.save(author=self.request.user)
+        serializer.save(author=self.request.user, moderation_status=moderation_status_for(content))
 
-    def update(self, request, *args, **kwargs):
+    def perform_update(self, serializer):
         # Check for toxicity on update
-        content = request.data.get('content')
-        block_if_toxic(content)  # Now raises ValidationError if toxic
-        return super().update(request, *args, **kwargs)
+        save_moderated_update(serializer)
         
     def destroy(self, request, *args, **kwargs):
          # Only allow the author to delete
@@ -109,6 +125,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
          # Include user, post, and children relationships
         queryset = Comment.objects.select_related('user', 'post').prefetch_related('children')
+        queryset = queryset.filter(visible_to(self.request.user, 'user'))  # Hide others' pending/hidden comments
 
         if self.action == 'list':
             queryset = queryset.filter(parent=None)  # ✅ Fetch only top-level comments
@@ -116,10 +133,9 @@ class CommentViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        # Validate comment content before saving
+        # Validate comment content before saving (or queue it for the moderation worker)
         content = serializer.validated_data.get('content')
-        block_if_toxic(content)  # ✅ Will raise exception if toxic
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.request.user, moderation_status=moderation_status_for(content))
 
     def update(self, request, *args, **kwargs):
          # Only allow update by author and check for toxicity
@@ -127,11 +143,12 @@ class CommentViewSet(viewsets.ModelViewSet):
         if instance.user != request.user:
             return Response({"error": PERMISSION_DENIED_MESSAGE}, status=status.HTTP_403_FORBIDDEN)
 
-        content = request.data.get('content')
-        block_if_toxic(content)  # Will raise ValidationError if toxic
-
         return super().update(request, *args, **kwargs)
 
+    def perform_update(self, serializer):
+        # Check for toxicity on update
+        save_moderated_update(serializer)
+
     def destroy(self, request, *args, **kwargs):
          # Only allow delete by author
         instance = self.get_object()
@@ -141,6 +158,46 @@ class CommentViewSet(viewsets.ModelViewSet):
         instance.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['get'])
+    def thread(self, request):
+        """
+        Load a post's comments as nested trees in one query.
+        Params: post (required), parent (expand one comment's replies),
+        max_depth, limit, cursor (continuation token from `next`).
+        """
+        try:
+            post_id = int(request.query_params['post'])
+            max_depth = request.query_params.get('max_depth')
+            max_depth = int(max_depth) if max_depth else None
+            limit = min(int(request.query_params.get('limit', DEFAULT_THREAD_LIMIT)), MAX_THREAD_LIMIT)
+            parent_id = request.query_params.get('parent')
+            parent_id = int(parent_id) if parent_id else None
+        except (KeyError, ValueError):
+            return Response({"error": "A numeric 'post' is required; parent, max_depth and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or (max_depth is not None and max_depth < 1):
+            return Response({"error": "limit and max_depth must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+
+        parent = None
+        if parent_id is not None:
+            parent = Comment.objects.filter(visible_to(request.user, 'user'), id=parent_id, post_id=post_id).first()
+            if parent is None:
+                return Response({"error": "Comment not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            roots, max_level, next_cursor = load_thread(
+                post_id, parent=parent, max_depth=max_depth, limit=limit,
+                cursor=request.query_params.get('cursor'), viewer=request.user,
+            )
+        except InvalidThreadCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        context = {**self.get_serializer_context(), 'max_level': max_level}
+        return Response({
+            "post": post_id,
+            "comments": CommentThreadSerializer(roots, many=True, context=context).data,
+            "next": next_cursor,
+        }, status=status.HTTP_200_OK)
+
 
 
 # -----------------------
@@ -153,39 +210,24 @@ class VoteViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         #Allow authenticated users to vote on posts.
-        user = request.user
         post_id = request.data.get("post")
-        value = int(request.data.get("value"))
+        try:
+            value = int(request.data.get("value"))
+        except (TypeError, ValueError):
+            value = None
 
         if value not in [1, -1]:
             # Validate vote value
             return Response({"error": "Invalid vote value."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            post = Post.objects.get(id=post_id)
-        except Post.DoesNotExist:
+            # Add, switch or remove the vote and adjust the stored score in one transaction
+            user_vote, total_votes = toggle_vote(request.user, int(post_id), value)
+        except (Post.DoesNotExist, TypeError, ValueError):
             return Response({"error": "Post not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        existing_vote = Vote.objects.filter(user=user, post=post).first()
-
-        if existing_vote:
-            if existing_vote.value == value:
-                # Remove vote if clicking the same vote again
-                existing_vote.delete()
-                total_votes = post.votes.filter(value=1).count() - post.votes.filter(value=-1).count()
-                return Response({"message": "Vote removed.", "total_votes": total_votes, "user_vote": 0}, status=status.HTTP_200_OK)
-            else:
-                 # Toggle vote (up ↔ down)
-                existing_vote.value = value
-                existing_vote.save()
-        else:
-                # First-time vote
-            Vote.objects.create(user=user, post=post, value=value)
-
-        total_votes = post.votes.filter(value=1).count() - post.votes.filter(value=-1).count()
-        return Response({"message": "Vote updated.", "total_votes": total_votes, "user_vote": value}, status=status.HTTP_200_OK)
-
-
+        message = "Vote updated." if user_vote else "Vote removed."
+        return Response({"message": message, "total_votes": total_votes, "user_vote": user_vote}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['get'], url_path=r'(?P<post_id>\d+)/user-vote', permission_classes=[IsAuthenticated])
     def get_user_vote(self, request, post_id=None):
@@ -209,7 +251,7 @@ class TagViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Tag name cannot be empty.'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Prevent duplicates (case-insensitive)
-        tag = Tag.objects.filter(name__iexact=name).first()
+        tag = Tag.objects.named(name).first()
         if tag:
             serializer = self.get_serializer(tag)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -222,11 +264,29 @@ class TagViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def search(self, request):
-         # Partial match tag search for autocomplete
+        # Prefix autocomplete from this worker's in-memory index, most used tags first
         query = request.query_params.get('q', '').strip()
         if not query:
             return Response([], status=status.HTTP_200_OK)
-        
-        tags = Tag.objects.filter(name__icontains=query)[:10]  # return top 10 matches
-        serializer = self.get_serializer(tags, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', TAG_SEARCH_LIMIT)), 1), MAX_TAG_SEARCH_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_tag_index().search(query, limit))
+
+
+# ---------------------------
+# Moderation health (admins)
+# ---------------------------
+class ModerationMetricsView(APIView):
+    """Expose this worker's toxicity detector counters, breaker state, verdict cache hit ratio and prefilter escalation rate."""
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "toxicity_detector": detector_metrics(),
+            "verdict_cache": verdict_cache_stats(),
+            "prefilter": prefilter_stats.snapshot(),
+        }, status=status.HTTP_200_OK)
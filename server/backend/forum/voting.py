@@ -0,0 +1,49 @@
+"""
+Atomic vote toggling.
+
+Clicking a vote button either adds the vote, switches it (up <-> down) or
+removes it when the same value is sent again. The user's vote row is locked,
+changed and the post's stored score/upvotes/downvotes are shifted with F()
+expressions (see Post.apply_vote_delta) all inside one transaction, and the
+new score is read back from the same post row before it commits.
+"""
+from django.db import IntegrityError, transaction
+from .models import Post, Vote
+
+
+def toggle_vote(user, post_id, value):
+    """
+    Apply a click of `value` (1 or -1) by `user` on a post.
+
+    Returns (user's vote after the click, 0 if removed; post's new score).
+    Raises Post.DoesNotExist if the post doesn't exist.
+    """
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                return _toggle_vote(user, post_id, value)
+        except IntegrityError:
+            if not Post.objects.filter(pk=post_id).exists():
+                raise Post.DoesNotExist
+            # A concurrent first vote by the same user won the insert; retry against its row
+            if attempt:
+                raise
+
+
+def _toggle_vote(user, post_id, value):
+    vote = Vote.objects.select_for_update().filter(user=user, post_id=post_id).first()
+    if vote is None:
+        Vote.objects.create(user=user, post_id=post_id, value=value)
+        user_vote = value
+    elif vote.value == value:
+        vote.delete()   # post_delete signal takes it out of the post's counters
+        user_vote = 0
+    else:
+        vote.value = value
+        vote.save(update_fields=['value'])
+        user_vote = value
+
+    score = Post.objects.filter(pk=post_id).values_list('score', flat=True).first()
+    if score is None:
+        raise Post.DoesNotExist   # Rolls back the vote written for a missing post
+    return user_vote, score
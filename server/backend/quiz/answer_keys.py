@@ -0,0 +1,161 @@
+"""
+Versioned per-category answer-key cache.
+
+An answer key holds everything grading and history rendering need to know
+about a category's questions, so both become dictionary lookups:
+
+    {
+        'questions': {question_id: {'text', 'correct_option_id', 'correct_answer'}},
+        'options': {option_id: {'question_id', 'text', 'is_correct'}},
+    }
+
+Keys are stored under a per-category version stamp. Writers bump the stamp
+(`bump_answer_key_version`) after changing questions or options, which makes
+every older key unreachable without having to delete it.
+
+Keys are only cached when the cache backend is shared by every worker. With a
+per-process backend (the LocMemCache default) a bump on one worker would never
+reach the others, so they would keep grading against a stale key; in that case
+keys are read from the database on every lookup instead, limited to the
+questions (and selected options) the caller names when it names them.
+"""
+import threading
+import uuid
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Q
+from .models import Question, Option
+
+# Safety net for edits that bypass the model signals (e.g. QuerySet.update())
+ANSWER_KEY_TIMEOUT = 60 * 60
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+# Backends whose contents (and version bumps) are private to one process
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def answer_key_cache_enabled():
+    """Whether answer keys may be cached, i.e. the default cache is shared across workers."""
+    return not isinstance(caches['default'], PROCESS_LOCAL_CACHES)
+
+
+def _version_key(category_id):
+    return f"quiz:answer_key_version:{category_id}"
+
+
+def _answer_key_key(category_id, version):
+    return f"quiz:answer_key:{category_id}:{version}"
+
+
+def answer_key_stats():
+    """Return this process's cache hit/miss counters and hit ratio."""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    lookups = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / lookups if lookups else 0.0}
+
+
+def reset_answer_key_stats():
+    with _stats_lock:
+        _stats.update(hits=0, misses=0)
+
+
+def get_answer_key_versions(category_ids):
+    """Return {category_id: version stamp}, creating stamps for categories without one."""
+    version_keys = {_version_key(category_id): category_id for category_id in category_ids}
+    found = cache.get_many(version_keys)
+    for version_key in version_keys.keys() - found.keys():
+        # add() so concurrent first readers agree on a single stamp
+        cache.add(version_key, uuid.uuid4().hex, None)
+        found[version_key] = cache.get(version_key)
+    return {version_keys[version_key]: version for version_key, version in found.items()}
+
+
+def bump_answer_key_version(*category_ids):
+    """
+    Invalidate the answer keys of the given categories.
+
+    Bumps now and again once the surrounding transaction commits, so a key
+    rebuilt from not-yet-committed rows can't outlive the write.
+    """
+    category_ids = [category_id for category_id in category_ids if category_id is not None]
+
+    def bump():
+        cache.set_many({_version_key(category_id): uuid.uuid4().hex for category_id in category_ids}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def build_answer_keys(category_ids, question_ids=None, option_ids=()):
+    """
+    Load the answer keys of several categories from the database (two queries).
+
+    With `question_ids` the keys are partial: only those questions, their
+    correct options and the `option_ids` belonging to them.
+    """
+    answer_keys = {category_id: {'questions': {}, 'options': {}} for category_id in category_ids}
+    questions = Question.objects.filter(category_id__in=category_ids)
+    if question_ids is not None:
+        questions = questions.filter(id__in=question_ids)
+    question_rows = questions.values_list('id', 'category_id', 'text')
+    category_of = {}
+    for question_id, category_id, text in question_rows:
+        category_of[question_id] = category_id
+        answer_keys[category_id]['questions'][question_id] = {'text': text, 'correct_option_id': None, 'correct_answer': None}
+
+    if question_ids is None:
+        options = Option.objects.filter(question__category_id__in=category_ids)
+    else:
+        # The selected options plus each question's correct option(s)
+        options = Option.objects.filter(Q(id__in=option_ids) | Q(question_id__in=category_of.keys(), is_correct=True))
+    option_rows = options.order_by('id').values_list('id', 'question_id', 'text', 'is_correct')
+    for option_id, question_id, text, is_correct in option_rows:
+        if question_id not in category_of:
+            continue    # Selected option of a question outside the key
+        answer_key = answer_keys[category_of[question_id]]
+        answer_key['options'][option_id] = {'question_id': question_id, 'text': text, 'is_correct': is_correct}
+        question = answer_key['questions'][question_id]
+        if is_correct and question['correct_option_id'] is None:
+            question['correct_option_id'] = option_id
+            question['correct_answer'] = text
+    return answer_keys
+
+
+def get_answer_keys(category_ids, question_ids=None, option_ids=()):
+    """
+    Return {category_id: answer key} for several categories, fetching every
+    cached key in one round trip and building all misses together.
+
+    Without a shared cache the keys come straight from the database; callers
+    that only need some questions pass `question_ids` (and any selected
+    `option_ids`) so that read stays proportional to what they look at.
+    """
+    category_ids = set(category_ids)
+    if not category_ids:
+        return {}
+    if not answer_key_cache_enabled():
+        return build_answer_keys(category_ids, question_ids, option_ids)
+    versions = get_answer_key_versions(category_ids)
+    cache_keys = {_answer_key_key(category_id, versions[category_id]): category_id for category_id in category_ids}
+    answer_keys = {cache_keys[key]: answer_key for key, answer_key in cache.get_many(cache_keys).items()}
+
+    missing = category_ids - answer_keys.keys()
+    with _stats_lock:
+        _stats['hits'] += len(answer_keys)
+        _stats['misses'] += len(missing)
+    if missing:
+        built = build_answer_keys(missing)
+        cache.set_many({_answer_key_key(category_id, versions[category_id]): built[category_id] for category_id in missing}, ANSWER_KEY_TIMEOUT)
+        answer_keys.update(built)
+    return answer_keys
+
+
+def get_answer_key(category_id, question_ids=None, option_ids=()):
+    """Return the current answer key for a category, building it on a miss."""
+    return get_answer_keys([category_id], question_ids, option_ids)[category_id]
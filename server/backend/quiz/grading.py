@@ -0,0 +1,104 @@
+"""
+Batch grading for quiz submissions.
+
+A submission maps question ids to selected option ids. Questions, options
+and correct answers are looked up in the category's answer key (see
+quiz.answer_keys): cached, or just the submitted questions' part of it when
+the cache isn't shared, so grading reads at most two small queries; the
+result is stored with a single attempt INSERT and a single bulk INSERT of
+answers inside one transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+from .answer_keys import get_answer_key
+from .models import QuizAttempt, UserAnswer
+
+
+class InvalidSubmission(Exception):
+    """Raised when a submission references options that don't fit its questions."""
+
+
+def parse_answers(answers):
+    """Normalize {question_id: option_id | None} into ints, rejecting malformed ids."""
+    if not isinstance(answers, dict):
+        raise InvalidSubmission("Answers must be an object mapping question IDs to option IDs.")
+    try:
+        return {
+            int(question_id): int(option_id) if option_id not in (None, '') else None
+            for question_id, option_id in answers.items()
+        }
+    except (TypeError, ValueError):
+        raise InvalidSubmission("Question and option IDs must be integers.")
+
+
+def grade_submission(user, category, answers):
+    """
+    Grade `answers` for `category`, store the attempt and return the result payload.
+
+    Questions outside the category are ignored; a selected option that does
+    not exist or belongs to a different question raises InvalidSubmission.
+    """
+    answers = parse_answers(answers)
+    # Without a shared cache only the submitted questions and options are read
+    answer_key = get_answer_key(category.id, answers.keys(), set(answers.values()) - {None})
+    key_questions, key_options = answer_key['questions'], answer_key['options']
+    question_ids = sorted(question_id for question_id in answers if question_id in key_questions)
+
+    # Every selected option must exist and belong to the question it answers
+    invalid = sorted({
+        answers[question_id] for question_id in question_ids
+        if answers[question_id] is not None
+        and key_options.get(answers[question_id], {}).get('question_id') != question_id
+    })
+    if invalid:
+        raise InvalidSubmission(f"Options {invalid} do not belong to the submitted questions.")
+
+    correct_answers = incorrect_answers = unanswered = 0
+    questions_data = []
+    answer_rows = []
+    for question_id in question_ids:
+        question = key_questions[question_id]
+        selected_option_id = answers[question_id]
+        is_correct = selected_option_id is not None and key_options[selected_option_id]['is_correct']
+
+        if selected_option_id is None:
+            unanswered += 1
+        else:
+            if is_correct:
+                correct_answers += 1
+            else:
+                incorrect_answers += 1
+            answer_rows.append(UserAnswer(question_id=question_id, selected_option_id=selected_option_id, is_correct=is_correct))
+
+        questions_data.append({
+            'text': question['text'],
+            'your_answer': key_options[selected_option_id]['text'] if selected_option_id else None,
+            'correct_answer': question['correct_answer'],
+            'is_correct': is_correct
+        })
+
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(
+            user=user,
+            category=category,
+            score=correct_answers,
+            total_questions=len(question_ids),
+            correct_answers=correct_answers,
+            incorrect_answers=incorrect_answers,
+            completed=True,
+            completed_at=timezone.now()
+        )
+        for row in answer_rows:
+            row.attempt = attempt
+        UserAnswer.objects.bulk_create(answer_rows)
+
+    return {
+        'category_id': category.id,
+        'score': correct_answers,
+        'total': len(question_ids),
+        'correct_answers': correct_answers,
+        'incorrect_answers': incorrect_answers,
+        'unanswered': unanswered,
+        'questions': questions_data
+    }
+
@@ -0,0 +1,93 @@
+import random
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from quiz.grading import grade_submission
+from quiz.models import Category, Question, Option, QuizAttempt, UserAnswer
+
+
+class RollbackBenchmark(Exception):
+    """Raised to discard the seeded benchmark data."""
+
+
+class QueryCounter:
+    """
+    Counts executed queries through a connection execute wrapper. Unlike
+    CaptureQueriesContext it doesn't read connection.queries_log, which is
+    capped at 9000 entries and stops growing once a long run has filled it.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def grade_per_question(user, category, answers):
+    """The original SubmitQuizAPIView loop: per-question option lookups and INSERTs."""
+    quiz_attempt = QuizAttempt.objects.create(
+        user=user, category=category, score=0, completed=True, completed_at=timezone.now()
+    )
+    correct_answers = 0
+    for question in Question.objects.filter(id__in=list(answers.keys())):
+        selected_option = Option.objects.get(pk=answers[str(question.id)])
+        if selected_option.is_correct:
+            correct_answers += 1
+        UserAnswer.objects.create(
+            attempt=quiz_attempt, question=question,
+            selected_option=selected_option, is_correct=selected_option.is_correct
+        )
+        question.options.filter(is_correct=True).first()
+    quiz_attempt.score = correct_answers
+    quiz_attempt.save()
+
+
+class Command(BaseCommand):
+    """
+    Compare quiz grading throughput before (per-question queries) and after
+    (batch grading). Seeds a throwaway category inside a transaction that is
+    rolled back, so it is safe to run against a development database.
+    """
+    help = "Report quiz submissions per second for per-question vs batch grading."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=20, help="Questions per submission.")
+        parser.add_argument('--submissions', type=int, default=200, help="Submissions graded per strategy.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['questions'], options['submissions'])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def run(self, question_count, submissions):
+        user = get_user_model().objects.create_user(username='__grading_benchmark__')
+        category = Category.objects.create(name='Grading benchmark', description='Temporary')
+        answers = {}
+        for number in range(question_count):
+            question = Question.objects.create(category=category, text=f"Question {number}")
+            choices = Option.objects.bulk_create(
+                Option(question=question, text=f"Option {i}", is_correct=(i == 0)) for i in range(4)
+            )
+            answers[str(question.id)] = random.choice(choices).id
+
+        strategies = [
+            ('per-question (before)', grade_per_question),
+            ('batch (after)', grade_submission),
+        ]
+        for label, grade in strategies:
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                grade(user, category, answers)
+            started = time.perf_counter()
+            for _ in range(submissions):
+                grade(user, category, answers)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:<24} {submissions / elapsed:>10.1f} submissions/s   {queries.count:>4} queries/submission"
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from quiz import answer_keys
+from quiz.models import Category
+
+
+class Command(BaseCommand):
+    """
+    Pre-load the answer-key cache so the first submissions after a deploy or
+    cache flush don't all miss at once.
+    """
+    help = "Warm the per-category quiz answer-key cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('category_ids', nargs='*', type=int, help="Categories to warm (default: all).")
+
+    def handle(self, *args, **options):
+        if not answer_keys.answer_key_cache_enabled():
+            self.stdout.write("The cache is per-process; answer keys are read from the database, nothing to warm.")
+            return
+        category_ids = options['category_ids'] or Category.objects.order_by('id').values_list('id', flat=True)
+        warmed = 0
+        for category_id in category_ids:
+            answer_keys.get_answer_key(category_id)
+            warmed += 1
+
+        stats = answer_keys.answer_key_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {warmed} answer keys (hits: {stats['hits']}, misses: {stats['misses']})."
+        ))
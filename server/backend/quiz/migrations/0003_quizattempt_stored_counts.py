@@ -0,0 +1,44 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+def backfill_attempt_counts(apps, schema_editor):
+    QuizAttempt = apps.get_model('quiz', 'QuizAttempt')
+    attempts = QuizAttempt.objects.annotate(
+        num_correct=models.Count('answers', filter=models.Q(answers__is_correct=True), distinct=True),
+        num_incorrect=models.Count('answers', filter=models.Q(answers__is_correct=False), distinct=True),
+    )
+    for attempt in attempts.iterator():
+        attempt.correct_answers = attempt.num_correct
+        attempt.incorrect_answers = attempt.num_incorrect
+        # The questions this attempt answered, not the category's current size. Skipped
+        # questions were never stored, so older attempts can't count them.
+        attempt.total_questions = attempt.num_correct + attempt.num_incorrect
+        attempt.save(update_fields=['correct_answers', 'incorrect_answers', 'total_questions'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_quizattempt_attempt_user_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='correct_answers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='incorrect_answers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='total_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_attempt_counts, migrations.RunPython.noop),
+    ]
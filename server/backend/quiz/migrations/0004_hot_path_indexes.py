@@ -0,0 +1,23 @@
+# Generated by Django 5.1.8 on 2026-10-18 18:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_quizattempt_stored_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quizattempt',
+            name='attempt_user_recent_idx',
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['user', '-completed_at'], name='attempt_user_completed_idx'),
+        ),
+    ]
@@ -23,6 +23,13 @@ class Question(models.Model):
     text = models.TextField()   # Question text
     created_at = models.DateTimeField(auto_now_add=True)    # Timestamp when created
 
+    # Remember the stored category so moving a question can invalidate both categories
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
     def __str__(self):
         return self.text[:50]
 
@@ -42,10 +49,19 @@ class QuizAttempt(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)    # User taking the quiz
     category = models.ForeignKey(Category, on_delete=models.CASCADE)    # Category of the quiz
     score = models.IntegerField()   # Score achieved by the user
+    total_questions = models.PositiveIntegerField(default=0)    # Questions graded in this attempt
+    correct_answers = models.PositiveIntegerField(default=0)    # Correctly answered questions
+    incorrect_answers = models.PositiveIntegerField(default=0)  # Answered but incorrect questions
     completed = models.BooleanField(default=False)  # Whether the quiz was completed
     started_at = models.DateTimeField(auto_now_add=True)    # Time when quiz started
     completed_at = models.DateTimeField(null=True, blank=True)  # Time when quiz was completed
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's completed quiz history
+            models.Index(fields=['user', '-completed_at'], condition=models.Q(completed=True), name='attempt_user_completed_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.category.name} - {self.score}/{self.category.question_count}"
 
@@ -0,0 +1,71 @@
+"""
+Random question sampling for quizzes without ORDER BY RANDOM().
+
+The ids of every question in a category are cached as a plain list (see
+quiz.signals for invalidation). A quiz start draws a uniform sample of ids in
+Python and fetches only those rows, with their options prefetched, so the
+cost no longer grows with the size of the question bank.
+
+As with answer keys, the list is only cached on a cache backend every worker
+shares: invalidation on a per-process cache would reach only the worker that
+handled the write. Otherwise the ids are read with a single index-only query.
+"""
+import random
+from django.conf import settings
+from django.core.cache import cache
+from .answer_keys import answer_key_cache_enabled
+from .models import Question
+
+QUIZ_LENGTH = 20    # Questions per quiz
+
+# Safety net in case an invalidation is ever missed (e.g. raw SQL edits)
+QUESTION_IDS_TIMEOUT = 60 * 60
+
+
+def question_ids_cache_key(category_id):
+    return f"quiz:question_ids:{category_id}"
+
+
+def question_ids_cache_enabled():
+    return answer_key_cache_enabled()
+
+
+def load_question_ids(category_id):
+    return list(Question.objects.filter(category_id=category_id).order_by('id').values_list('id', flat=True))
+
+
+def get_question_ids(category_id):
+    """Return the list of question ids for a category, cached on a shared backend."""
+    if not question_ids_cache_enabled():
+        return load_question_ids(category_id)
+    key = question_ids_cache_key(category_id)
+    question_ids = cache.get(key)
+    if question_ids is None:
+        question_ids = load_question_ids(category_id)
+        cache.set(key, question_ids, QUESTION_IDS_TIMEOUT)
+    return question_ids
+
+
+def invalidate_question_ids(*category_ids):
+    cache.delete_many([question_ids_cache_key(category_id) for category_id in category_ids if category_id is not None])
+
+
+def get_rng(seed=None):
+    """
+    Random source for sampling. Pass a seed (or set QUIZ_SAMPLING_SEED) for a
+    reproducible draw, e.g. in tests; otherwise every quiz start is independent.
+    """
+    if seed is None:
+        seed = getattr(settings, 'QUIZ_SAMPLING_SEED', None)
+    return random.Random(seed) if seed is not None else random.SystemRandom()
+
+
+def sample_questions(category_id, count=QUIZ_LENGTH, rng=None):
+    """Uniformly sample up to `count` questions of a category, options prefetched, in draw order."""
+    question_ids = get_question_ids(category_id)
+    rng = rng or get_rng()
+    chosen = rng.sample(question_ids, min(count, len(question_ids)))
+
+    questions = Question.objects.filter(id__in=chosen).prefetch_related('options').in_bulk()
+    # Ids deleted since the cache was filled are simply skipped
+    return [questions[question_id] for question_id in chosen if question_id in questions]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Category, Question, Option, QuizAttempt, UserAnswer
 from drf_writable_nested import WritableNestedModelSerializer
+from .answer_keys import get_answer_key, get_answer_keys, bump_answer_key_version
 
 # ------------------- OPTION SERIALIZER -------------------
 class OptionSerializer(serializers.ModelSerializer):
@@ -29,6 +30,7 @@ class QuestionSerializer(WritableNestedModelSerializer):
         - Delete removed options
         """
         options_data = validated_data.pop('options', [])
+        previous_category_id = instance.category_id
         
         # Update the question fields
         instance = super().update(instance, validated_data)
@@ -57,7 +59,9 @@ class QuestionSerializer(WritableNestedModelSerializer):
         for option_id, option in existing_options.items():
             if option not in updated_options:
                 option.delete()
-        
+
+        # Cached answer keys of both categories are now stale
+        bump_answer_key_version(previous_category_id, instance.category_id)
         return instance
 
 # ------------------- CATEGORY SERIALIZER ------------------
@@ -81,18 +85,33 @@ class UserAnswerSerializer(serializers.ModelSerializer):
 
     def get_correct_answer(self, obj):
         """
-        Return the text of the correct option for this question.
+        Return the text of the correct option for this question,
+        looked up in the category's cached answer key.
         """
-        correct_option = obj.question.options.filter(is_correct=True).first()
-        return correct_option.text if correct_option else None
+        # Answer keys are memoized in the (shared) serializer context per category
+        answer_keys = self.context.setdefault('answer_keys', {})
+        category_id = obj.attempt.category_id
+        if category_id not in answer_keys:
+            answer_keys[category_id] = get_answer_key(category_id)
+        question = answer_keys[category_id]['questions'].get(obj.question_id)
+        return question['correct_answer'] if question else None
 
-# ------------------- QUIZ ATTEMPT SERIALIZER -------------------
-class QuizAttemptSerializer(serializers.ModelSerializer):
-    answers = UserAnswerSerializer(many=True, read_only=True)   # Nested answers
+# ------------------- QUIZ ATTEMPT SERIALIZERS -------------------
+class QuizAttemptListSerializer(serializers.ListSerializer):
+    """Loads the answer keys of every category on the page in one batch before rendering."""
+
+    def to_representation(self, data):
+        attempts = data.all() if hasattr(data, 'all') else data
+        if self.child.fields.get('answers') is not None:
+            category_ids = {attempt.category_id for attempt in attempts}
+            question_ids = {answer.question_id for attempt in attempts for answer in attempt.answers.all()}
+            self.context.setdefault('answer_keys', {}).update(get_answer_keys(category_ids, question_ids))
+        return super().to_representation(attempts)
+
+
+class QuizAttemptSummarySerializer(serializers.ModelSerializer):
+    """Attempt totals only; reads stored counts, no per-answer detail."""
     category_name = serializers.CharField(source='category.name', read_only=True)   # Category name
-    total_questions = serializers.SerializerMethodField()   # Total number of questions in quiz
-    correct_answers = serializers.SerializerMethodField()    # Number of correct answers
-    incorrect_answers = serializers.SerializerMethodField()  # Number of incorrect answers
 
     class Meta:
         model = QuizAttempt
@@ -108,23 +127,13 @@ class QuizAttemptSerializer(serializers.ModelSerializer):
             'total_questions',
             'correct_answers',
             'incorrect_answers',
-            'answers'
         ]
+        read_only_fields = ['total_questions', 'correct_answers', 'incorrect_answers']
+        list_serializer_class = QuizAttemptListSerializer
 
-    def get_total_questions(self, obj):
-        """
-        Return total number of questions in the quiz category.
-        """
-        return obj.category.question_count
 
-    def get_correct_answers(self, obj):
-        """
-        Count number of correctly answered questions.
-        """
-        return obj.answers.filter(is_correct=True).count()
+class QuizAttemptSerializer(QuizAttemptSummarySerializer):
+    answers = UserAnswerSerializer(many=True, read_only=True)   # Nested answers
 
-    def get_incorrect_answers(self, obj):
-        """
-        Count number of incorrectly answered questions.
-        """
-        return obj.answers.filter(is_correct=False).count()
\ No newline at end of file
+    class Meta(QuizAttemptSummarySerializer.Meta):
+        fields = QuizAttemptSummarySerializer.Meta.fields + ['answers']
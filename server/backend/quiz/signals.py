@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from backend.signals import deleted_with
+from .models import Category, Question, Option
+from .sampling import invalidate_question_ids
+from .answer_keys import bump_answer_key_version
+
+
+# Signal receiver function to run after a Question instance is saved
+@receiver(post_save, sender=Question)
+def invalidate_question_caches_on_save(sender, instance, created, **kwargs):
+    """
+    Drop the cached question-id list of the question's category when a
+    question is added or moved to another category, and invalidate the
+    category's answer key on any change (also covers ORM/admin edits).
+    """
+    previous_category_id = getattr(instance, '_loaded_category_id', None)
+    if created or previous_category_id != instance.category_id:
+        invalidate_question_ids(instance.category_id, previous_category_id)
+    bump_answer_key_version(instance.category_id, previous_category_id)
+    instance._loaded_category_id = instance.category_id
+
+
+# Signal receiver function to run after a Question instance is deleted
+@receiver(post_delete, sender=Question)
+def invalidate_question_caches_on_delete(sender, instance, **kwargs):
+    invalidate_question_ids(instance.category_id)
+    bump_answer_key_version(instance.category_id)
+
+
+# Option edits change the answer key too, whether they come through
+# QuestionSerializer or not (admin, shell)
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def invalidate_answer_key_on_option_change(sender, instance, origin=None, **kwargs):
+    if deleted_with(origin, Question) or deleted_with(origin, Category):
+        return  # The question's/category's own delete bumps the version
+    category_id = Question.objects.filter(id=instance.question_id).values_list('category_id', flat=True).first()
+    bump_answer_key_version(category_id)
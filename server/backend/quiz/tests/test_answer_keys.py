@@ -0,0 +1,132 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users.models import User
+from quiz.models import Category, Question, Option
+from quiz import answer_keys
+from quiz.answer_keys import get_answer_key, answer_key_stats, reset_answer_key_stats
+from decouple import config
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    # The test cache is per-process; treat it as shared to exercise caching
+    monkeypatch.setattr(answer_keys, 'answer_key_cache_enabled', lambda: True)
+
+
+@pytest.fixture
+def quiz(db, shared_cache):
+    cache.clear()
+    reset_answer_key_stats()
+    category = Category.objects.create(name="Math", description="Math questions")
+    question = Question.objects.create(category=category, text="2+2?")
+    correct = Option.objects.create(question=question, text="4", is_correct=True)
+    wrong = Option.objects.create(question=question, text="5", is_correct=False)
+    return category, question, correct, wrong
+
+
+@pytest.fixture
+def admin_client(db):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_superuser(username="admin", password=config("TEST_PASSWORD")))
+    return client
+
+
+@pytest.mark.django_db
+class TestAnswerKeyCache:
+
+    def test_key_maps_questions_to_correct_option(self, quiz):
+        category, question, correct, wrong = quiz
+        answer_key = get_answer_key(category.id)
+        assert answer_key['questions'][question.id] == {'text': "2+2?", 'correct_option_id': correct.id, 'correct_answer': "4"}
+        assert answer_key['options'][wrong.id] == {'question_id': question.id, 'text': "5", 'is_correct': False}
+
+    def test_second_lookup_is_a_cache_hit(self, quiz):
+        category = quiz[0]
+        get_answer_key(category.id)
+        with CaptureQueriesContext(connection) as queries:
+            get_answer_key(category.id)
+        assert len(queries) == 0
+        assert answer_key_stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+    def test_question_update_bumps_version(self, quiz, admin_client):
+        category, question, correct, wrong = quiz
+        get_answer_key(category.id)
+
+        response = admin_client.put(f'/quiz/update-questions/{question.id}/', {
+            'options': [
+                {'id': correct.id, 'text': "4", 'is_correct': False},
+                {'id': wrong.id, 'text': "5", 'is_correct': True},
+            ]
+        }, format='json')
+        assert response.status_code == 200
+        assert get_answer_key(category.id)['questions'][question.id]['correct_answer'] == "5"
+
+    def test_add_and_delete_question_bump_version(self, quiz, admin_client):
+        category = quiz[0]
+        get_answer_key(category.id)
+
+        response = admin_client.post('/quiz/add-question/', {
+            'category': category.id,
+            'text': "3+3?",
+            'options': [{'text': "6", 'is_correct': True}, {'text': "7", 'is_correct': False}],
+        }, format='json')
+        new_id = response.data['id']
+        assert get_answer_key(category.id)['questions'][new_id]['correct_answer'] == "6"
+
+        admin_client.delete(f'/quiz/delete-question/{new_id}/')
+        assert new_id not in get_answer_key(category.id)['questions']
+
+    def test_warm_command_fills_cache(self, quiz):
+        call_command('warm_answer_keys')
+        assert answer_key_stats()['misses'] == 1
+        get_answer_key(quiz[0].id)
+        assert answer_key_stats()['hits'] == 1
+
+    def test_orm_option_edit_bumps_version(self, quiz):
+        category, question, correct, wrong = quiz
+        get_answer_key(category.id)
+
+        correct.is_correct = False
+        correct.save()
+        wrong.is_correct = True
+        wrong.save()
+        assert get_answer_key(category.id)['questions'][question.id]['correct_answer'] == "5"
+
+        wrong.delete()
+        assert wrong.id not in get_answer_key(category.id)['options']
+
+
+@pytest.mark.django_db
+def test_process_local_cache_reads_the_database():
+    cache.clear()
+    reset_answer_key_stats()
+    category = Category.objects.create(name="Math", description="Math questions")
+    question = Question.objects.create(category=category, text="2+2?")
+    Option.objects.create(question=question, text="4", is_correct=True)
+
+    assert answer_keys.answer_key_cache_enabled() is False
+    get_answer_key(category.id)
+    # A bump made on another worker would not be visible here: every lookup is fresh
+    Option.objects.filter(question=question).update(text="four")
+    with CaptureQueriesContext(connection) as queries:
+        assert get_answer_key(category.id)['questions'][question.id]['correct_answer'] == "four"
+    assert len(queries) == 2
+    assert answer_key_stats()['hits'] == 0
+
+
+@pytest.mark.django_db
+def test_process_local_lookup_reads_only_the_named_questions():
+    category = Category.objects.create(name="Math", description="Math questions")
+    questions = [Question.objects.create(category=category, text=f"{n}+{n}?") for n in range(5)]
+    options = [Option.objects.create(question=question, text=str(2 * n), is_correct=True) for n, question in enumerate(questions)]
+    wrong = Option.objects.create(question=questions[0], text="1", is_correct=False)
+    Option.objects.create(question=questions[1], text="3", is_correct=False)
+
+    answer_key = get_answer_key(category.id, [questions[0].id, questions[1].id], {wrong.id})
+    assert set(answer_key['questions']) == {questions[0].id, questions[1].id}
+    assert set(answer_key['options']) == {options[0].id, options[1].id, wrong.id}
+    assert answer_key['questions'][questions[1].id]['correct_answer'] == "2"
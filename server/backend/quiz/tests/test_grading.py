@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.models import User
+from quiz.models import Category, Question, Option, QuizAttempt, UserAnswer
+from quiz.grading import grade_submission, InvalidSubmission
+from decouple import config
+
+
+def make_quiz(category, count):
+    answers = {}
+    for number in range(count):
+        question = Question.objects.create(category=category, text=f"Question {number}")
+        Option.objects.create(question=question, text="right", is_correct=True)
+        wrong = Option.objects.create(question=question, text="wrong", is_correct=False)
+        answers[str(question.id)] = wrong.id
+    return answers
+
+
+@pytest.mark.django_db
+class TestGradeSubmission:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username="student", password=config("TEST_PASSWORD"))
+        self.category = Category.objects.create(name="Math", description="Math questions")
+
+    def test_grades_and_stores_attempt_in_bulk(self):
+        question = Question.objects.create(category=self.category, text="2+2?")
+        right = Option.objects.create(question=question, text="4", is_correct=True)
+        Option.objects.create(question=question, text="5", is_correct=False)
+        skipped = Question.objects.create(category=self.category, text="3+3?")
+        Option.objects.create(question=skipped, text="6", is_correct=True)
+
+        result = grade_submission(self.user, self.category, {str(question.id): right.id, str(skipped.id): None})
+
+        assert (result['score'], result['total'], result['unanswered']) == (1, 2, 1)
+        assert result['questions'][1] == {'text': "3+3?", 'your_answer': None, 'correct_answer': "6", 'is_correct': False}
+        attempt = QuizAttempt.objects.get()
+        assert attempt.score == 1 and attempt.completed
+        assert (attempt.total_questions, attempt.correct_answers, attempt.incorrect_answers) == (2, 1, 0)
+        assert UserAnswer.objects.filter(attempt=attempt, is_correct=True).count() == 1
+
+    def test_query_count_does_not_grow_with_quiz_length(self):
+        short = make_quiz(self.category, 2)
+        with CaptureQueriesContext(connection) as few:
+            grade_submission(self.user, self.category, short)
+        long_category = Category.objects.create(name="Long", description="Long")
+        long = make_quiz(long_category, 25)
+        with CaptureQueriesContext(connection) as many:
+            grade_submission(self.user, long_category, long)
+        assert len(many) == len(few)
+
+    def test_rejects_option_from_another_question(self):
+        answers = make_quiz(self.category, 2)
+        first, second = answers.keys()
+        answers[first], answers[second] = answers[second], answers[first]
+
+        with pytest.raises(InvalidSubmission):
+            grade_submission(self.user, self.category, answers)
+        assert not QuizAttempt.objects.exists()
+
+    def test_rejects_malformed_ids(self):
+        with pytest.raises(InvalidSubmission):
+            grade_submission(self.user, self.category, {"abc": 1})
+
+
+@pytest.mark.django_db
+def test_benchmark_command_leaves_no_data(capsys):
+    call_command('benchmark_quiz_grading', questions=3, submissions=2)
+    assert "submissions/s" in capsys.readouterr().out
+    assert not Category.objects.exists()
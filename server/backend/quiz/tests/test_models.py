@@ -1,4 +1,6 @@
+import importlib
 import pytest
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from quiz.models import Category, Question, Option, QuizAttempt, UserAnswer
 from decouple import config
@@ -102,4 +104,19 @@ class TestQuizModels:
         assert user_answer.selected_option == option
         assert user_answer.is_correct is True
         expected_str= "What is 2+2?"[:30] + " - Correct"
-        assert str(user_answer) == expected_str
\ No newline at end of file
+        assert str(user_answer) == expected_str
+
+    def test_count_backfill_uses_each_attempts_own_answers(self):
+        migration = importlib.import_module('quiz.migrations.0003_quizattempt_stored_counts')
+        user = get_user_model().objects.create_user(username="backfill", password=config('TEST_PASSWORD'))
+        category = Category.objects.create(name="Math", description="Math related questions")
+        questions = [Question.objects.create(category=category, text=f"Q{n}") for n in range(5)]
+        right, wrong = (Option.objects.create(question=questions[0], text=text, is_correct=correct) for text, correct in (("4", True), ("5", False)))
+        attempt = QuizAttempt.objects.create(user=user, category=category, score=1, completed=True)
+        UserAnswer.objects.create(attempt=attempt, question=questions[0], selected_option=right, is_correct=True)
+        UserAnswer.objects.create(attempt=attempt, question=questions[1], selected_option=wrong, is_correct=False)
+
+        migration.backfill_attempt_counts(apps, None)
+
+        attempt.refresh_from_db()
+        assert (attempt.total_questions, attempt.correct_answers, attempt.incorrect_answers) == (2, 1, 1)
@@ -0,0 +1,82 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from quiz.models import Category, Question, Option
+from quiz import sampling
+from quiz.sampling import sample_questions, get_question_ids, get_rng
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    # The test cache is per-process; treat it as shared to exercise caching
+    monkeypatch.setattr(sampling, 'question_ids_cache_enabled', lambda: True)
+
+
+@pytest.fixture
+def category(db, shared_cache):
+    cache.clear()
+    category = Category.objects.create(name="Science", description="Science questions")
+    for number in range(30):
+        question = Question.objects.create(category=category, text=f"Question {number}")
+        Option.objects.create(question=question, text="Answer", is_correct=True)
+    return category
+
+
+@pytest.mark.django_db
+class TestSampleQuestions:
+
+    def test_samples_distinct_questions_capped_at_quiz_length(self, category):
+        questions = sample_questions(category.id)
+        assert len(questions) == 20
+        assert len({question.id for question in questions}) == 20
+        assert all(question.category_id == category.id for question in questions)
+
+    def test_seeded_draws_are_reproducible(self, category):
+        first = [q.id for q in sample_questions(category.id, rng=get_rng(seed=7))]
+        second = [q.id for q in sample_questions(category.id, rng=get_rng(seed=7))]
+        assert first == second
+
+    def test_warm_cache_costs_two_queries(self, category):
+        get_question_ids(category.id)
+        with CaptureQueriesContext(connection) as queries:
+            questions = sample_questions(category.id)
+            for question in questions:
+                list(question.options.all())
+        assert len(queries) == 2    # Questions by id + prefetched options
+
+    def test_cache_follows_added_moved_and_deleted_questions(self, category):
+        assert len(get_question_ids(category.id)) == 30
+
+        added = Question.objects.create(category=category, text="New question")
+        assert added.id in get_question_ids(category.id)
+
+        other = Category.objects.create(name="Other", description="Other")
+        assert get_question_ids(other.id) == []
+        moved = Question.objects.get(id=added.id)
+        moved.category = other
+        moved.save()
+        assert added.id not in get_question_ids(category.id)
+        assert get_question_ids(other.id) == [added.id]
+
+        moved.delete()
+        assert get_question_ids(other.id) == []
+
+    def test_small_category_returns_every_question(self, category):
+        small = Category.objects.create(name="Small", description="Small")
+        Question.objects.create(category=small, text="Only question")
+        assert len(sample_questions(small.id)) == 1
+
+
+@pytest.mark.django_db
+def test_process_local_cache_reads_ids_every_time():
+    cache.clear()
+    category = Category.objects.create(name="Science", description="Science questions")
+    first = Question.objects.create(category=category, text="Question")
+    assert get_question_ids(category.id) == [first.id]
+
+    # A write handled by another worker: nothing here was invalidated
+    Question.objects.filter(id=first.id).delete()
+    with CaptureQueriesContext(connection) as queries:
+        assert get_question_ids(category.id) == []
+    assert len(queries) == 1
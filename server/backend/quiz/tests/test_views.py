@@ -5,6 +5,9 @@ from users.models import User
 from quiz.models import Category, Question, Option, QuizAttempt, UserAnswer
 from decouple import config
 from django.utils import timezone
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 @pytest.mark.django_db
 class TestQuizViews:
@@ -182,6 +185,74 @@ class TestQuizViews:
         assert response.data[0]['score'] == 1
         assert response.data[0]['category'] == category.id
 
+    def test_quiz_attempts_query_count_is_constant(self):
+        user = User.objects.create_user(username="testuser", password=config("TEST_PASSWORD"))
+        self.client.force_authenticate(user=user)
+
+        def submit_quizzes(count):
+            for number in range(count):
+                category = Category.objects.create(name=f"Quiz {number}", description="Questions")
+                answers = {}
+                for q in range(3):
+                    question = Question.objects.create(category=category, text=f"Question {q}")
+                    Option.objects.create(question=question, text="wrong", is_correct=False)
+                    right = Option.objects.create(question=question, text="right", is_correct=True)
+                    answers[str(question.id)] = right.id
+                self.client.post('/quiz/submit-quiz/', {'category_id': category.id, 'answers': answers}, format='json')
+
+        submit_quizzes(1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/quiz/attempts/')
+        submit_quizzes(5)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/quiz/attempts/')
+
+        assert len(response.data) == 6
+        assert len(many) == len(few)
+        latest = response.data[0]
+        assert (latest['total_questions'], latest['correct_answers'], latest['incorrect_answers']) == (3, 3, 0)
+        assert latest['answers'][0]['correct_answer'] == "right"
+
+        summary = self.client.get('/quiz/attempts/?summary=true')
+        assert 'answers' not in summary.data[0]
+        assert summary.data[0]['correct_answers'] == 3
+
+    def test_quiz_attempts_cursor_pages_most_recent_first(self):
+        user = User.objects.create_user(username="testuser", password=config("TEST_PASSWORD"))
+        self.client.force_authenticate(user=user)
+        category = Category.objects.create(name="Math", description="Math questions")
+        now = timezone.now()
+        for minutes in range(3):
+            QuizAttempt.objects.create(
+                user=user,
+                category=category,
+                score=minutes,
+                completed=True,
+                completed_at=now - timedelta(minutes=minutes)
+            )
+
+        first = self.client.get('/quiz/attempts/?envelope=true&page_size=2')
+        assert [a['score'] for a in first.data['results']] == [0, 1]
+        second = self.client.get(first.data['next'])
+        assert [a['score'] for a in second.data['results']] == [2]
+        assert second.data['next'] is None
+
+    def test_quiz_attempts_cursor_pages_through_ties(self):
+        user = User.objects.create_user(username="testuser", password=config("TEST_PASSWORD"))
+        self.client.force_authenticate(user=user)
+        category = Category.objects.create(name="Math", description="Math questions")
+        completed_at = timezone.now()
+        for score in range(5):
+            QuizAttempt.objects.create(user=user, category=category, score=score, completed=True, completed_at=completed_at)
+
+        scores = []
+        url = '/quiz/attempts/?envelope=true&page_size=2&summary=true'
+        while url:
+            response = self.client.get(url)
+            scores.extend(a['score'] for a in response.data['results'])
+            url = response.data['next']
+        assert scores == [4, 3, 2, 1, 0]     # Same timestamp: newest attempt first
+
     def test_update_question_view(self):
         """Test updating question details"""
         # Create admin user and authenticate
@@ -281,3 +352,11 @@ class TestQuizViews:
         }, format='json')
         assert response.status_code == status.HTTP_200_OK
         assert response.data['score'] == 0
+
+        # Test with an option that doesn't exist
+        response = self.client.post('/quiz/submit-quiz/', {
+            'category_id': category.id,
+            'answers': {str(question.id): 999999}
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
@@ -1,24 +1,33 @@
-from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets, status
+from django.db.models import Prefetch
+from rest_framework import viewsets, status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.request import Request
 from typing import ClassVar
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from .models import Category, Question, Option, QuizAttempt, UserAnswer
-from .serializers import CategorySerializer, QuestionSerializer, QuizAttemptSerializer
+from .serializers import CategorySerializer, QuestionSerializer, QuizAttemptSerializer, QuizAttemptSummarySerializer
+from .grading import grade_submission, InvalidSubmission
+from .sampling import sample_questions
+from .answer_keys import bump_answer_key_version
 from rest_framework.request import Request
+from backend.pagination import KeysetCursorPagination
+from users.authentication import CLAIMS_AUTHENTICATION_CLASSES
 
 # ---------------------- CATEGORY VIEWSET ----------------------
 # Allows anyone to list or retrieve categories
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
     permission_classes=[AllowAny]
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = 'id'
 
 # ---------------------- GET RANDOM QUIZ ----------------------
 class QuizAPIView(APIView):
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
     permission_classes = [AllowAny]
     def get(self, request, category_id):
         # Validate category_id
@@ -30,8 +39,8 @@ class QuizAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         category = get_object_or_404(Category, pk=category_id)
-        # Get 20 random questions for the category
-        questions = Question.objects.filter(category=category).order_by('?')[:20]
+        # Get 20 random questions for the category (sampled from cached ids)
+        questions = sample_questions(category.id)
         # Serialize the questions
         serializer = QuestionSerializer(questions, many=True)
         
@@ -64,7 +73,8 @@ class AddQuestionView(APIView):
     def post(self, request):
         serializer =QuestionSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            question = serializer.save()
+            bump_answer_key_version(question.category_id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -127,6 +137,7 @@ class DeleteQuizView(APIView):
                 
         # Delete the categories
         deleted_count = Category.objects.filter(id__in=category_ids).delete()[0]
+        bump_answer_key_version(*category_ids)
         return Response({"message": f"{deleted_count} categories and their associated data deleted."}, status=status.HTTP_200_OK)
     
 
@@ -138,6 +149,7 @@ class DeleteQuestionView(APIView):
         #Get question IDs to delete
         question= get_object_or_404(Question, id=question_id)
         question.delete()
+        bump_answer_key_version(question.category_id)
         return Response({"message": "Question deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -153,90 +165,42 @@ class SubmitQuizAPIView(APIView):
             return Response({'error': 'Category ID is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         category = get_object_or_404(Category, pk=category_id)
-        
-        # Create quiz attempt
-        quiz_attempt = QuizAttempt.objects.create(
-            user=request.user,
-            category=category,
-            score=0,
-            completed=True,
-            completed_at=timezone.now()
-        )
-        
-        # Get all questions from the category that were in the quiz
-        question_ids = list(answers.keys())
-        questions = Question.objects.filter(id__in=question_ids)
-        total_questions = len(questions)
-        
-        correct_answers = 0
-        incorrect_answers = 0
-        unanswered = total_questions - len(answers)
-        
-        # Process user answers
-        questions_data = []
-        
-        for question in questions:
-            question_id = str(question.id)
-            selected_option_id = answers.get(question_id)
-            
-            if selected_option_id:
-                selected_option = get_object_or_404(Option, pk=selected_option_id)
-                is_correct = selected_option.is_correct
-                
-                if is_correct:
-                    correct_answers += 1
-                else:
-                    incorrect_answers += 1
-                
-                # Save user answer
-                UserAnswer.objects.create(
-                    attempt=quiz_attempt,
-                    question=question,
-                    selected_option=selected_option,
-                    is_correct=is_correct
-                )
-                
-                # Prepare question data for results
-                questions_data.append({
-                    'text': question.text,
-                    'your_answer': selected_option.text,
-                    'correct_answer': question.options.filter(is_correct=True).first().text,
-                    'is_correct': is_correct
-                })
-            else:
-                # No answer provided
-                questions_data.append({
-                    'text': question.text,
-                    'your_answer': None,
-                    'correct_answer': question.options.filter(is_correct=True).first().text,
-                    'is_correct': False
-                })
-        
-        # Update quiz attempt score
-        quiz_attempt.score = correct_answers
-        quiz_attempt.save()
-        
-        return Response({
-            'category_id': category.id,
-            'score': correct_answers,
-            'total': total_questions,
-            'correct_answers': correct_answers,
-            'incorrect_answers': incorrect_answers,
-            'unanswered': unanswered,
-            'questions': questions_data
-        }, status=status.HTTP_200_OK)
+
+        # Grade every answer in one batch and store the attempt
+        try:
+            result = grade_submission(request.user, category, answers)
+        except InvalidSubmission as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
 
 
 # ---------------------- USER: QUIZ HISTORY ----------------------
-class QuizAttemptsView(APIView):
+class QuizAttemptsView(generics.ListAPIView):
+    """
+    Quiz history of the current user. Totals come from the stored attempt
+    counts and answers are prefetched with their question and selected option,
+    so a page costs a fixed number of queries; `?summary=true` skips answers.
+    """
+    authentication_classes = CLAIMS_AUTHENTICATION_CLASSES
     permission_classes=[IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-completed_at', '-id')   # sorted by most recent, id breaks ties
+
+    def is_summary(self):
+        return self.request.query_params.get('summary', '').lower() in ('1', 'true', 'yes')
+
+    def get_serializer_class(self):
+        return QuizAttemptSummarySerializer if self.is_summary() else QuizAttemptSerializer
 
-    def get(self, request):
+    def get_queryset(self):
         #Get all attempts for current user
-        attempts=QuizAttempt.objects.filter(
-            user=request.user,
+        attempts = QuizAttempt.objects.filter(
+            user=self.request.user,
             completed=True
-        ).order_by('-completed_at') #sorted by most recent
-
-        serializer=QuizAttemptSerializer(attempts, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        ).select_related('category')
+        if not self.is_summary():
+            attempts = attempts.prefetch_related(
+                Prefetch('answers', queryset=UserAnswer.objects.select_related('question', 'selected_option'))
+            )
+        return attempts
\ No newline at end of file
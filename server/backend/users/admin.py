@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Instructor, Student
+from .models import User, Instructor, Student, OutboundEmail
 
 class UserAdmin(UserAdmin):
     model = User
@@ -20,4 +20,10 @@ class InstructorAdmin(admin.ModelAdmin):
 
 admin.site.register(Student)
 class StudentAdmin(admin.ModelAdmin):
-    list_display = ['user', 'course_completed', 'course_enrolled']
\ No newline at end of file
+    list_display = ['user', 'course_completed', 'course_enrolled']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
@@ -0,0 +1,125 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's JWTAuthentication (the project default) loads the User row on every
+authenticated request. ClaimsJWTAuthentication builds the User from the access
+token's claims instead (id, role, is_staff, is_superuser, is_active, added at
+login and refresh by users.serializers), so requests that only check who the
+user is and what they may do cost no query. Views opt in with
+`authentication_classes = CLAIMS_AUTHENTICATION_CLASSES`; keep it to read
+endpoints that need nothing more than those claims.
+
+Every other field is deferred: the first access to one (email, username, ...)
+loads the whole rest of the row in one query, or from a short-lived
+per-worker cache (JWT_USER_CACHE_SECONDS), and the object then behaves like
+any User.
+
+Tokens issued before these claims existed fall back to the database lookup.
+Tokens minted for an inactive user are rejected like simplejwt does, but on
+claims-authenticated views deactivating (or deleting) a user only takes effect
+once their current access token expires (SIMPLE_JWT ACCESS_TOKEN_LIFETIME);
+every other view checks the row.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import User
+
+# Token claim -> User field, for the fields a claims-built user carries without a query
+CLAIM_FIELDS = {'role': 'role', 'is_staff': 'is_staff', 'is_superuser': 'is_superuser', 'is_active': 'is_active'}
+
+
+def add_user_claims(token, user):
+    for claim, field in CLAIM_FIELDS.items():
+        token[claim] = getattr(user, field)
+    return token
+
+
+class UserRowCache:
+    """Thread-safe LRU of user id -> (expires_at, {field: value}) for the deferred fields."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user_id, row):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, row)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_rows = UserRowCache(
+    getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+    getattr(settings, 'JWT_USER_CACHE_SECONDS', 60),
+)
+
+
+def claims_user(user_id, claims):
+    """A User holding only `user_id` and the claim fields; the rest loads on first use."""
+    known = {'id': user_id, **{field: claims[claim] for claim, field in CLAIM_FIELDS.items()}}
+    # from_db takes the values in model field order
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in known]
+    user = User.from_db('default', fields, [known[field] for field in fields])
+    user._claims_only = True
+    return user
+
+
+def load_deferred_fields(user):
+    """Fill in every deferred field of a claims-built user (called by User.refresh_from_db)."""
+    row = user_rows.get(user.pk)
+    if row is None:
+        fields = [field.attname for field in User._meta.concrete_fields if field.attname not in ('id', *CLAIM_FIELDS.values())]
+        row = User.objects.filter(pk=user.pk).values(*fields).first()
+        if row is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        user_rows.put(user.pk, row)
+    for attname in user.get_deferred_fields():
+        user.__dict__[attname] = row[attname]
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the token's user claims instead of querying the User row."""
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in CLAIM_FIELDS):
+            return super().get_user(validated_token)
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if not validated_token['is_active']:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return claims_user(user_id, validated_token)
+
+
+# For read endpoints that only need the user's id, role and staff flags
+CLAIMS_AUTHENTICATION_CLASSES = [ClaimsJWTAuthentication, TokenAuthentication]
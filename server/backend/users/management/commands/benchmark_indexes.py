@@ -0,0 +1,136 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from courses.models import Course, Enrollment
+from forum.models import Post, Tag, Vote
+from quiz.models import Category, QuizAttempt
+from users.models import User, Instructor, Student
+
+# The indexes added for the hot query paths
+HOT_PATH_INDEXES = [
+    'post_recent_idx', 'vote_post_value_idx', 'tag_name_lower_idx', 'attempt_user_completed_idx', 'user_role_idx',
+]
+
+
+class RollbackBenchmark(Exception):
+    """Raised to discard the seeded benchmark data."""
+
+
+class Command(BaseCommand):
+    """
+    Time the hot query paths with and without their indexes and print the
+    EXPLAIN plans. Seeds a throwaway dataset and drops the indexes inside a
+    transaction that is rolled back, so nothing is kept. Dropping an index
+    locks its table until the rollback: run this against a development
+    database, not production.
+    """
+    help = "Report EXPLAIN plans and timings of the hot query paths before and after their indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000, help="Seeded users (one in ten is an instructor).")
+        parser.add_argument('--posts', type=int, default=20000, help="Seeded forum posts.")
+        parser.add_argument('--repeat', type=int, default=50, help="Runs per query; the median is reported.")
+        parser.add_argument('--plans', action='store_true', help="Print the full EXPLAIN output.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def run(self, options):
+        queries = self.seed(options['users'], options['posts'])
+        self.analyze()
+        after = self.measure(queries, options['repeat'])
+
+        with connection.cursor() as cursor:
+            for name in HOT_PATH_INDEXES:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+        self.analyze()
+        before = self.measure(queries, options['repeat'])
+
+        self.stdout.write(f"{'query':<28} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>9}")
+        for label in queries:
+            (before_ms, before_plan), (after_ms, after_plan) = before[label], after[label]
+            speedup = before_ms / after_ms if after_ms else float('inf')
+            self.stdout.write(f"{label:<28} {before_ms:>12.3f} {after_ms:>12.3f} {speedup:>8.1f}x")
+            if options['plans']:
+                self.stdout.write(f"  before:\n    {before_plan.replace(chr(10), chr(10) + '    ')}")
+                self.stdout.write(f"  after:\n    {after_plan.replace(chr(10), chr(10) + '    ')}")
+
+    def seed(self, user_count, post_count):
+        rng = random.Random(7)
+        now = timezone.now()
+        users = User.objects.bulk_create(
+            User(username=f'__index_benchmark_{i}', role='instructor' if i % 10 == 0 else 'student')
+            for i in range(user_count)
+        )
+        instructor = Instructor.objects.create(user=users[0], designation='Benchmark', university='Benchmark')
+        students = Student.objects.bulk_create(Student(user=user) for user in users if user.role == 'student')
+
+        courses = Course.objects.bulk_create(
+            Course(title=f'Benchmark {i}', description='', created_by=instructor, duration=1,
+                   difficulty='beginner', subject='Benchmark')
+            for i in range(50)
+        )
+        Enrollment.objects.bulk_create(
+            (Enrollment(course=course, student=student)
+             for student in students for course in rng.sample(courses, 3)),
+            batch_size=2000,
+        )
+
+        category = Category.objects.create(name='Index benchmark', description='Temporary')
+        QuizAttempt.objects.bulk_create(
+            (QuizAttempt(user=user, category=category, score=5, completed=i % 3 != 0,
+                         completed_at=now - timedelta(minutes=i) if i % 3 != 0 else None)
+             for user in users[:500] for i in range(20)),
+            batch_size=2000,
+        )
+
+        Tag.objects.bulk_create(Tag(name=f'Benchmark-Tag-{i}') for i in range(2000))
+        posts = Post.objects.bulk_create(
+            (Post(author=rng.choice(users), title=f'Post {i}', content='Benchmark') for i in range(post_count)),
+            batch_size=2000,
+        )
+        # auto_now_add stamps every post with the same time; spread them out
+        for post in posts:
+            post.created_at = now - timedelta(minutes=rng.randrange(post_count * 10))
+        Post.objects.bulk_update(posts, ['created_at'], batch_size=2000)
+        Vote.objects.bulk_create(
+            (Vote(user=user, post=post, value=rng.choice((1, -1)))
+             for post in posts[:2000] for user in rng.sample(users, 10)),
+            batch_size=2000,
+        )
+
+        post, history_user, student, course = posts[0], users[1], students[0], courses[0]
+        return {
+            'recent posts': lambda: Post.objects.order_by('-created_at')[:50],
+            'upvotes on a post': lambda: Vote.objects.filter(post=post, value=1),
+            'quiz history': lambda: QuizAttempt.objects.filter(user=history_user, completed=True).order_by('-completed_at')[:50],
+            'tag by name (any case)': lambda: Tag.objects.named('benchmark-tag-1234'),
+            'enrollment check': lambda: Enrollment.objects.filter(course=course, student=student),
+            'instructors by role': lambda: User.objects.filter(role='instructor'),
+        }
+
+    def measure(self, queries, repeat):
+        """{label: (median ms, EXPLAIN output)}; each query is fully evaluated `repeat` times."""
+        results = {}
+        for label, build in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(build())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = (statistics.median(timings), build().explain())
+        return results
+
+    def analyze(self):
+        # Refresh planner statistics so plans reflect the seeded data
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    """
+    Outbound email worker (needed when EMAIL_OUTBOX_ASYNC is on, the default).
+
+    Polls the OutboundEmail queue and sends due messages in batches, one
+    mail server connection per batch, retrying failures with backoff. Needs
+    no broker: run it under a process supervisor, or with --once from cron.
+    """
+    help = "Send queued outbound email in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Messages sent per connection.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when nothing is due.")
+        parser.add_argument('--once', action='store_true', help="Send everything due once and exit.")
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+        while True:
+            counts = deliver_pending(batch_size=options['batch_size'])
+            for key, value in counts.items():
+                totals[key] += value
+
+            if not counts['sent']:
+                if options['once']:
+                    break
+                # Nothing due, or the mail server is down and everything was rescheduled
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']}, rescheduled {totals['retrying']}, gave up on {totals['failed']} messages."
+        ))
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class User(AbstractUser):
     """
@@ -16,6 +17,24 @@ class User(AbstractUser):
     # Optional biography or profile description
     bio = models.TextField(null=True, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),    # Dashboard student/instructor counts
+        ]
+
+    _claims_only = False    # Built from JWT claims by users.authentication; other fields not loaded yet
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Accessing a deferred field of a claims-built user loads all of them at once (cached per worker)
+        if fields is not None and self._claims_only:
+            from .authentication import load_deferred_fields
+            self._claims_only = False
+            load_deferred_fields(self)
+            fields = [field for field in fields if field in self.get_deferred_fields()]
+            if not fields:
+                return
+        super().refresh_from_db(using, fields, from_queryset)
+
     def __str__(self):
         return self.username
 
@@ -43,3 +62,32 @@ class Student(models.Model):
 
     def __str__(self): 
         return self.user.username
+
+
+class OutboundEmail(models.Model):
+    """
+    An email queued by a request and delivered by the `send_queued_email`
+    worker (see users.outbox), so no request waits on SMTP.
+    """
+    PENDING, SENDING, SENT, FAILED = 'pending', 'sending', 'sent', 'failed'
+    STATUS_CHOICES = ((PENDING, 'Pending'), (SENDING, 'Sending'), (SENT, 'Sent'), (FAILED, 'Failed'))
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()   # Plain-text body (cleared once sent or failed)
+    html_body = models.TextField(blank=True)    # Optional HTML alternative
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)     # List of "to" addresses
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)  # Delivery attempts so far
+    next_attempt_at = models.DateTimeField(default=timezone.now)    # Not retried before this time
+    last_error = models.TextField(blank=True)   # Error of the most recent failed attempt
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),   # Worker's due-message scan
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
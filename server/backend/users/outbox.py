@@ -0,0 +1,138 @@
+"""
+Database-backed outbound email queue.
+
+Requests call `queue_email`, which only INSERTs an OutboundEmail row. The
+`send_queued_email` command drains the queue with `deliver_pending`: each
+batch goes out over one connection of the configured EMAIL_BACKEND, and each
+message is marked sent, or rescheduled with exponential backoff
+(EMAIL_OUTBOX_RETRY_SECONDS, doubling per attempt) until it has failed
+EMAIL_OUTBOX_MAX_ATTEMPTS times.
+
+EMAIL_OUTBOX_ASYNC is on by default. With it off (tests, dev setups)
+`queue_email` also tries the message right away. It first claims the row with
+a conditional UPDATE (pending -> sending), so a running worker can't send
+the same row too. A failure still leaves the row queued for the worker
+instead of failing the request.
+
+Bodies often carry verification and password-reset links, so they are
+cleared once a message is sent or given up on.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboundEmail
+
+# How long a synchronous send keeps its claim on a row before the worker may retry it
+SEND_LEASE = timedelta(minutes=5)
+
+
+def queue_email(subject, body, recipients, html_body='', from_email=None):
+    """Queue a message for delivery and return its OutboundEmail row."""
+    email = OutboundEmail.objects.create(
+        subject=subject, body=body, html_body=html_body or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL, recipients=list(recipients),
+    )
+    if not getattr(settings, 'EMAIL_OUTBOX_ASYNC', True) and claim(email):
+        deliver([email])
+    return email
+
+
+def claim(email):
+    """
+    Mark a pending row as being sent by this process; False if a worker got it first.
+    The claim expires after SEND_LEASE, so a crash mid-send leaves it to the worker.
+    """
+    claimed = OutboundEmail.objects.filter(pk=email.pk, status=OutboundEmail.PENDING).update(
+        status=OutboundEmail.SENDING, next_attempt_at=timezone.now() + SEND_LEASE,
+    )
+    if claimed:
+        email.status = OutboundEmail.SENDING
+    return bool(claimed)
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.recipients, connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_SECONDS', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 3600))
+
+
+def record_failure(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = OutboundEmail.FAILED
+        email.body = email.html_body = ''
+    else:
+        email.status = OutboundEmail.PENDING
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def deliver(emails, connection=None):
+    """
+    Send `emails` over one backend connection and save each one's new state.
+    Returns {'sent', 'retrying', 'failed'} counts.
+    """
+    counts = {'sent': 0, 'retrying': 0, 'failed': 0}
+    if not emails:
+        return counts
+
+    connection = connection or get_connection(fail_silently=False)
+    now = timezone.now()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Can't reach the mail server: every message waits for its next attempt
+        for email in emails:
+            record_failure(email, exc, now)
+    else:
+        try:
+            for email in emails:
+                try:
+                    # The connection is already open, so send_messages reuses it
+                    connection.send_messages([build_message(email, connection)])
+                except Exception as exc:
+                    record_failure(email, exc, now)
+                else:
+                    email.attempts += 1
+                    email.status, email.sent_at, email.last_error = OutboundEmail.SENT, now, ''
+                    email.body = email.html_body = ''
+        finally:
+            connection.close()
+
+    for email in emails:
+        if email.status == OutboundEmail.SENT:
+            counts['sent'] += 1
+        elif email.status == OutboundEmail.FAILED:
+            counts['failed'] += 1
+        else:
+            counts['retrying'] += 1
+    OutboundEmail.objects.bulk_update(
+        emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body', 'html_body'],
+    )
+    return counts
+
+
+def deliver_pending(batch_size=50, connection=None):
+    """
+    Deliver one batch of due messages. The batch's rows stay locked (SKIP
+    LOCKED where supported) while it is sent, so several workers never send
+    the same message. Rows claimed by a synchronous send whose lease ran out
+    are due again. Returns deliver()'s counts; all zero when nothing is due.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING], next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        return deliver(emails, connection)
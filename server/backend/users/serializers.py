@@ -5,6 +5,7 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, Toke
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.validators import UniqueValidator
 from .models import Instructor, Student
+from .authentication import add_user_claims
 
 # Get the custom User model
 User = get_user_model()
@@ -83,9 +84,7 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Incorrect password. Please try again.")
 
         refresh = RefreshToken.for_user(user)
-        access_token = refresh.access_token
-        access_token['role'] = user.role
-        access_token['is_superuser'] = user.is_superuser
+        access_token = add_user_claims(refresh.access_token, user)
 
         return {
             'refresh': str(refresh),
@@ -117,9 +116,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     
     def get_token(self, user):
         token = super().get_token(user)
-        token['role'] = user.role  # Add role to the token
-        token['is_superuser'] = user.is_superuser  # Add admin status
-        return token
+        # Role and admin status, read by ClaimsJWTAuthentication without a user query
+        return add_user_claims(token, user)
     
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
     """
@@ -133,9 +131,7 @@ class CustomTokenRefreshSerializer(TokenRefreshSerializer):
         user = User.objects.get(id=refresh.payload['user_id'])
 
         # Add custom claims to the new access token
-        access_token = refresh.access_token
-        access_token['role'] = user.role
-        access_token['is_superuser'] = user.is_superuser
+        access_token = add_user_claims(refresh.access_token, user)
 
         # Return modified token data
         data['access'] = str(access_token)
@@ -154,6 +150,9 @@ class DashboardStatsSerializer(serializers.Serializer):
     total_courses = serializers.IntegerField()
     total_contents = serializers.IntegerField()
     total_quizzes = serializers.IntegerField()
+    new_users_last_7_days_count = serializers.IntegerField(read_only=True)
+    active_users_last_24_hours_count = serializers.IntegerField(read_only=True)
+    # Most recent users only (settings.DASHBOARD_USER_LIST_LIMIT); the full lists are paginated at /dashboard/users/
     new_users_last_7_days = UserSerializer(many=True, read_only=True)
     active_users_last_24_hours = UserSerializer(many=True, read_only=True)
 
@@ -1,35 +1,123 @@
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
 from django.utils.timezone import now
 from datetime import timedelta
 from users.models import User
 from courses.models import Course, CourseContents
 from quiz.models import Category
 
+# Windows of the dashboard's "new users" and "active users" lists
+NEW_USER_WINDOW = timedelta(days=7)
+ACTIVE_USER_WINDOW = timedelta(days=1)
+DASHBOARD_STATS_CACHE_KEY = 'users:dashboard_stats'
+
+
 class DashboardStatsService:
+    @staticmethod
+    def user_segment(segment):
+        """Users who joined in the last 7 days ('new') or logged in in the last 24 hours ('active'), newest first, profiles joined."""
+        users = User.objects.select_related('instructor', 'student')
+        if segment == 'new':
+            return users.filter(date_joined__gte=now() - NEW_USER_WINDOW).order_by('-date_joined')
+        if segment == 'active':
+            return users.filter(last_login__gte=now() - ACTIVE_USER_WINDOW).order_by('-last_login')
+        raise ValueError(f"Unknown user segment: {segment}")
+
+    @staticmethod
+    def get_counts():
+        """All dashboard counts: one conditional aggregate over users plus one COUNT per other table, cached briefly."""
+        counts = cache.get(DASHBOARD_STATS_CACHE_KEY)
+        if counts is None:
+            counts = User.objects.aggregate(
+                total_users=Count('id'),
+                total_students=Count('id', filter=Q(role='student')),
+                total_instructors=Count('id', filter=Q(role='instructor')),
+                new_users_last_7_days_count=Count('id', filter=Q(date_joined__gte=now() - NEW_USER_WINDOW)),
+                active_users_last_24_hours_count=Count('id', filter=Q(last_login__gte=now() - ACTIVE_USER_WINDOW)),
+            )
+            counts.update(
+                total_courses=Course.objects.count(),
+                total_contents=CourseContents.objects.count(),
+                total_quizzes=Category.objects.count(),
+            )
+            cache.set(DASHBOARD_STATS_CACHE_KEY, counts, getattr(settings, 'DASHBOARD_STATS_CACHE_SECONDS', 60))
+        return counts
+
     @staticmethod
     def get_dashboard_stats():
-        new_users_last_7_days = User.objects.filter(date_joined__gte=now() - timedelta(days=7))
-        active_users_last_24_hours = User.objects.filter(last_login__gte=now() - timedelta(days=1))
-
-        stats = {
-            "total_users": User.objects.count(),
-            "total_students": User.objects.filter(role='student').count(),
-            "total_instructors": User.objects.filter(role='instructor').count(),
-            "total_courses": Course.objects.count(),
-            "total_contents": CourseContents.objects.count(),
-            "total_quizzes": Category.objects.count(),
-            "new_users_last_7_days": new_users_last_7_days,
-            "active_users_last_24_hours": active_users_last_24_hours,
+        # The lists are capped; the full lists page through /dashboard/users/?segment=new|active
+        limit = getattr(settings, 'DASHBOARD_USER_LIST_LIMIT', 20)
+        return {
+            **DashboardStatsService.get_counts(),
+            "new_users_last_7_days": DashboardStatsService.user_segment('new')[:limit],
+            "active_users_last_24_hours": DashboardStatsService.user_segment('active')[:limit],
         }
 
-        return stats
-    
+LANDING_STATS_CACHE_KEY = 'users:landing_stats'
+LANDING_STATS_LOCK_KEY = 'users:landing_stats:refreshing'
+
+
+def start_background_refresh(refresh):
+    def run():
+        try:
+            refresh()
+        finally:
+            connection.close()  # The thread's own database connection
+
+    threading.Thread(target=run, name='landing-stats-refresh', daemon=True).start()
+
+
 class LandingPageStatsService:
     @staticmethod
     def get_landingpage_stats():
+        users = User.objects.aggregate(
+            total_students=Count('id', filter=Q(role='student')),
+            total_instructors=Count('id', filter=Q(role='instructor')),
+        )
         stats={
-            "total_students":User.objects.filter(role='student').count(),
-            "total_instructors":User.objects.filter(role='instructor').count(),
+            **users,
             "total_courses":Course.objects.count(),
             "total_quizzes":Category.objects.count(),
         }
         return stats
+
+    @staticmethod
+    def refresh_cached_stats():
+        """Recompute the stats into the cache; returns them."""
+        stats = LandingPageStatsService.get_landingpage_stats()
+        hard_ttl = getattr(settings, 'LANDING_STATS_HARD_TTL', 3600)
+        cache.set(LANDING_STATS_CACHE_KEY, {'stats': stats, 'refreshed_at': time.time()}, hard_ttl)
+        return stats
+
+    @staticmethod
+    def refresh_in_background():
+        # Only the worker that takes the lock refreshes; the lock expires on its own if that worker dies
+        if not cache.add(LANDING_STATS_LOCK_KEY, True, getattr(settings, 'LANDING_STATS_LOCK_SECONDS', 30)):
+            return
+
+        def refresh():
+            try:
+                LandingPageStatsService.refresh_cached_stats()
+            finally:
+                cache.delete(LANDING_STATS_LOCK_KEY)
+
+        start_background_refresh(refresh)
+
+    @staticmethod
+    def get_cached_landingpage_stats():
+        """
+        Stale-while-revalidate: serve the cached stats immediately and, once
+        they are older than LANDING_STATS_SOFT_TTL, refresh them in a background
+        thread. Only a cold cache (first request, or past LANDING_STATS_HARD_TTL)
+        computes them inline.
+        """
+        entry = cache.get(LANDING_STATS_CACHE_KEY)
+        if entry is None:
+            return LandingPageStatsService.refresh_cached_stats()
+        if time.time() - entry['refreshed_at'] > getattr(settings, 'LANDING_STATS_SOFT_TTL', 60):
+            LandingPageStatsService.refresh_in_background()
+        return entry['stats']
@@ -2,6 +2,7 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import User, Student, Instructor
+from .authentication import user_rows
 
 @receiver(post_save, sender=User)
 def create_student_or_instructor(sender, instance, created, **kwargs):
@@ -20,3 +21,9 @@ def create_student_or_instructor(sender, instance, created, **kwargs):
     model = role_model_map.get(instance.role)
     if model:
         model.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def forget_cached_user_row(sender, instance, **kwargs):
+    # Claims-built users on this worker see the change on their next load
+    user_rows.discard(instance.pk)
@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from decouple import config
+from users.authentication import ClaimsJWTAuthentication, add_user_claims, user_rows
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def empty_user_row_cache():
+    user_rows.clear()
+    yield
+    user_rows.clear()
+
+
+@pytest.fixture
+def instructor(db):
+    return User.objects.create_user(
+        username="claims_instructor", email="claims@example.com", password=config('TEST_PASSWORD'),
+        role="instructor", bio="Teaches things", is_staff=True,
+    )
+
+
+def authenticate(access_token):
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    return ClaimsJWTAuthentication().authenticate(request)[0]
+
+
+@pytest.mark.django_db
+class TestClaimsJWTAuthentication:
+    def test_builds_user_from_claims_without_a_query(self, instructor):
+        access = add_user_claims(RefreshToken.for_user(instructor).access_token, instructor)
+
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate(access)
+            assert (user.pk, user.role, user.is_staff, user.is_superuser) == (instructor.pk, "instructor", True, False)
+            assert user.is_authenticated
+        assert len(queries) == 0
+        assert isinstance(user, User) and user == instructor
+
+    def test_other_fields_load_once_and_are_cached_per_worker(self, instructor):
+        access = add_user_claims(RefreshToken.for_user(instructor).access_token, instructor)
+
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate(access)
+            assert (user.email, user.username, user.bio) == ("claims@example.com", "claims_instructor", "Teaches things")
+        assert len(queries) == 1
+
+        with CaptureQueriesContext(connection) as queries:
+            assert authenticate(access).username == "claims_instructor"
+        assert len(queries) == 0
+
+        instructor.bio = "Edited"
+        instructor.save()
+        assert authenticate(access).bio == "Edited"
+
+    def test_tokens_without_claims_fall_back_to_the_database(self, instructor):
+        access = RefreshToken.for_user(instructor).access_token
+
+        with CaptureQueriesContext(connection) as queries:
+            user = authenticate(access)
+        assert len(queries) == 1
+        assert user.username == "claims_instructor"
+
+    def test_tokens_of_inactive_users_are_rejected(self, instructor):
+        instructor.is_active = False
+        access = add_user_claims(RefreshToken.for_user(instructor).access_token, instructor)
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_default_authentication_still_reads_the_row(self, instructor):
+        client = APIClient()
+        tokens = client.post(reverse('get_token'), {"username": "claims_instructor", "password": config('TEST_PASSWORD')}).data
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        User.objects.filter(pk=instructor.pk).update(is_active=False)
+
+        # Views without the claims classes see the deactivation at once
+        assert client.get(reverse('profile')).status_code == 401
+
+    def test_login_token_drives_a_profile_update(self, instructor):
+        client = APIClient()
+        tokens = client.post(reverse('get_token'), {"username": "claims_instructor", "password": config('TEST_PASSWORD')}).data
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        response = client.put(reverse('profile'), {"bio": "Updated bio"}, format='json')
+
+        assert response.status_code == 200
+        assert response.data["username"] == "claims_instructor"
+        instructor.refresh_from_db()
+        assert (instructor.bio, instructor.email, instructor.role) == ("Updated bio", "claims@example.com", "instructor")
@@ -0,0 +1,21 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from users.models import User
+from users.management.commands.benchmark_indexes import HOT_PATH_INDEXES
+
+
+@pytest.mark.django_db
+def test_benchmark_indexes_reports_plans_and_leaves_indexes_and_data(capsys):
+    call_command('benchmark_indexes', users=40, posts=60, repeat=1, plans=True)
+
+    output = capsys.readouterr().out
+    assert "recent posts" in output and "before:" in output
+    assert not User.objects.filter(username__startswith='__index_benchmark_').exists()
+    with connection.cursor() as cursor:
+        existing = {
+            name
+            for table in ('forum_post', 'forum_vote', 'forum_tag', 'quiz_quizattempt', 'users_user')
+            for name in connection.introspection.get_constraints(cursor, table)
+        }
+    assert set(HOT_PATH_INDEXES) <= existing
@@ -0,0 +1,141 @@
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from decouple import config
+from users.models import OutboundEmail, User
+from users.outbox import claim, deliver_pending, queue_email, SEND_LEASE
+
+
+class CountingBackend(LocmemBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class DownBackend(LocmemBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError("SMTP server unreachable")
+
+
+@pytest.fixture
+def async_outbox(settings):
+    settings.EMAIL_OUTBOX_ASYNC = True
+    return settings
+
+
+@pytest.mark.django_db
+def test_registration_queues_mail_for_the_worker(client, async_outbox):
+    response = client.post(reverse('register'), {
+        "username": "queued", "password": config('TEST_PASSWORD'), "email": "queued@example.com", "role": "student",
+    })
+
+    assert response.status_code == 201
+    assert len(mail.outbox) == 0
+    queued = OutboundEmail.objects.get()
+    assert (queued.status, queued.recipients) == (OutboundEmail.PENDING, ["queued@example.com"])
+
+    call_command('send_queued_email', once=True)
+
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].subject == "Confirm Your Email to Get Started with KUETx"
+    assert mail.outbox[0].alternatives[0][1] == "text/html"
+    queued.refresh_from_db()
+    assert (queued.status, queued.attempts) == (OutboundEmail.SENT, 1)
+    assert queued.sent_at is not None
+
+
+@pytest.mark.django_db
+def test_batch_shares_one_connection(async_outbox):
+    async_outbox.EMAIL_BACKEND = 'users.tests.test_outbox.CountingBackend'
+    CountingBackend.opened = 0
+    for number in range(5):
+        queue_email(f"Message {number}", "Body", [f"user{number}@example.com"])
+
+    counts = deliver_pending(batch_size=10)
+
+    assert counts == {'sent': 5, 'retrying': 0, 'failed': 0}
+    assert CountingBackend.opened == 1
+    assert len(mail.outbox) == 5
+
+
+@pytest.mark.django_db
+def test_failed_sends_back_off_then_give_up(async_outbox):
+    async_outbox.EMAIL_BACKEND = 'users.tests.test_outbox.DownBackend'
+    async_outbox.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    email = queue_email("Hello", "Body", ["user@example.com"])
+
+    assert deliver_pending() == {'sent': 0, 'retrying': 1, 'failed': 0}
+    email.refresh_from_db()
+    assert email.status == OutboundEmail.PENDING
+    assert "unreachable" in email.last_error
+    assert email.next_attempt_at > timezone.now()
+    assert deliver_pending() == {'sent': 0, 'retrying': 0, 'failed': 0}     # Not due yet
+
+    OutboundEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+    assert deliver_pending() == {'sent': 0, 'retrying': 0, 'failed': 1}
+    email.refresh_from_db()
+    assert (email.status, email.attempts) == (OutboundEmail.FAILED, 2)
+
+
+@pytest.mark.django_db
+def test_mail_outage_does_not_fail_password_reset(client, settings):
+    settings.EMAIL_BACKEND = 'users.tests.test_outbox.DownBackend'
+    User.objects.create_user(username="resetter", email="reset@example.com", password=config('TEST_PASSWORD'))
+
+    response = client.post(reverse("request-reset-password"), {"email": "reset@example.com"})
+
+    assert response.status_code == 200
+    queued = OutboundEmail.objects.get()
+    assert queued.status == OutboundEmail.PENDING and queued.attempts == 1
+
+
+@pytest.mark.django_db
+def test_file_backend_delivery(async_outbox, tmp_path):
+    async_outbox.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+    async_outbox.EMAIL_FILE_PATH = str(tmp_path)
+    queue_email("Filed", "Written to disk", ["user@example.com"])
+
+    deliver_pending()
+
+    written = list(tmp_path.iterdir())
+    assert len(written) == 1
+    assert "Written to disk" in written[0].read_text()
+
+
+@pytest.mark.django_db
+def test_sync_send_claims_the_row_and_clears_the_body():
+    email = queue_email("Reset", "https://example.com/reset/secret-token", ["user@example.com"])
+
+    assert len(mail.outbox) == 1
+    email.refresh_from_db()
+    assert email.status == OutboundEmail.SENT
+    assert (email.body, email.html_body) == ('', '')
+
+
+@pytest.mark.django_db
+def test_claim_fails_once_a_worker_took_the_row(async_outbox):
+    email = queue_email("Hello", "Body", ["user@example.com"])
+    deliver_pending()   # The worker sends it before the request's claim
+
+    assert claim(email) is False
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+def test_expired_claim_is_picked_up_by_the_worker():
+    email = OutboundEmail.objects.create(
+        subject="Hello", body="Body", from_email="noreply@example.com", recipients=["user@example.com"],
+        status=OutboundEmail.SENDING, next_attempt_at=timezone.now() + SEND_LEASE,
+    )
+    assert deliver_pending()['sent'] == 0     # Still claimed by the request sending it
+
+    OutboundEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+    assert deliver_pending()['sent'] == 1
+    email.refresh_from_db()
+    assert email.status == OutboundEmail.SENT
@@ -1,5 +1,12 @@
 import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
 from users.models import User, Instructor
+from users.services import DashboardStatsService, LANDING_STATS_CACHE_KEY, LANDING_STATS_LOCK_KEY
 from courses.models import Course
 from quiz.models import Category
 from users.views import LandingPageStatsService
@@ -27,3 +34,81 @@ def test_landing_page_stats_service():
     assert stats["total_students"] == 2
     assert stats["total_courses"] == 2
     assert stats["total_quizzes"] == 3
+
+
+@pytest.fixture
+def dashboard_users(db):
+    cache.clear()
+    long_ago = timezone.now() - timedelta(days=30)
+    for number in range(4):
+        User.objects.create_user(username=f"new_student{number}", password=config("TEST_PASSWORD"), role="student")
+    old = User.objects.create_user(username="old_instructor", password=config("TEST_PASSWORD"), role="instructor")
+    User.objects.filter(pk=old.pk).update(date_joined=long_ago, last_login=timezone.now())
+    yield
+    cache.clear()
+
+@pytest.mark.django_db
+def test_dashboard_counts_use_one_query_per_table_and_are_cached(dashboard_users):
+    with CaptureQueriesContext(connection) as queries:
+        counts = DashboardStatsService.get_counts()
+    assert len(queries) == 4
+    assert (counts["total_users"], counts["total_students"], counts["total_instructors"]) == (5, 4, 1)
+    assert (counts["new_users_last_7_days_count"], counts["active_users_last_24_hours_count"]) == (4, 1)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert DashboardStatsService.get_counts() == counts
+    assert len(queries) == 0
+
+@pytest.mark.django_db
+def test_dashboard_lists_are_capped_with_profiles_joined(dashboard_users, settings):
+    settings.DASHBOARD_USER_LIST_LIMIT = 2
+    admin = User.objects.create_superuser(username="admin", password=config("TEST_PASSWORD"), email="admin@example.com")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    client.get('/dashboard/stats/')     # Warm the counts cache
+
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get('/dashboard/stats/').data['data']
+    assert len(queries) == 2    # One per list, profiles included
+    assert len(data['new_users_last_7_days']) == 2
+    assert data['active_users_last_24_hours'][0]['instructor']['name'] == "old_instructor"
+
+@pytest.mark.django_db
+def test_dashboard_users_pages_through_a_segment(dashboard_users):
+    admin = User.objects.create_superuser(username="admin", password=config("TEST_PASSWORD"), email="admin@example.com")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    first = client.get('/dashboard/users/?segment=new&page_size=3&envelope=true').data
+    second = client.get(first['next']).data
+
+    names = [user['username'] for user in first['results'] + second['results']]
+    assert len(names) == 5 and "old_instructor" not in names     # 4 new students + the admin
+    assert client.get('/dashboard/users/?segment=everyone').status_code == 400
+
+
+@pytest.mark.django_db
+def test_landing_stats_are_served_stale_while_one_refresh_runs(monkeypatch, settings):
+    cache.clear()
+    started = []
+    monkeypatch.setattr('users.services.start_background_refresh', started.append)
+    User.objects.create_user(username="student1", password=config("TEST_PASSWORD"), role="student")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert LandingPageStatsService.get_cached_landingpage_stats()["total_students"] == 1   # Cold: computed inline
+    assert len(queries) == 3
+
+    User.objects.create_user(username="student2", password=config("TEST_PASSWORD"), role="student")
+    with CaptureQueriesContext(connection) as queries:
+        assert LandingPageStatsService.get_cached_landingpage_stats()["total_students"] == 1   # Fresh: cached
+    assert len(queries) == 0 and not started
+
+    settings.LANDING_STATS_SOFT_TTL = -1    # Everything is stale now
+    assert LandingPageStatsService.get_cached_landingpage_stats()["total_students"] == 1   # Stale value served at once
+    assert LandingPageStatsService.get_cached_landingpage_stats()["total_students"] == 1
+    assert len(started) == 1    # The second request saw the refresh lock held
+
+    started[0]()
+    assert cache.get(LANDING_STATS_LOCK_KEY) is None
+    assert cache.get(LANDING_STATS_CACHE_KEY)['stats']["total_students"] == 2
+    cache.clear()
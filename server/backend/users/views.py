@@ -10,7 +10,6 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator, PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.html import strip_tags
-from django.core.mail import send_mail
 from django.utils.encoding import force_str, DjangoUnicodeDecodeError, force_bytes
 from django.template.loader import render_to_string
 from django.contrib.auth.tokens import default_token_generator
@@ -18,8 +17,10 @@ from django.contrib.auth.hashers import make_password
 from django.utils import timezone
 from datetime import timedelta
 from .models import Instructor
+from .outbox import queue_email
 from .serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer, DashboardStatsSerializer, LandingPageStatsSerializer, RegisterSerializer, LoginSerializer, InstructorSerializer, UserSerializer
 from .services import DashboardStatsService, LandingPageStatsService
+from backend.pagination import KeysetCursorPagination
 
 User = get_user_model()
 
@@ -61,12 +62,13 @@ class RegisterView(generics.CreateAPIView):
 
         plain_message = strip_tags(html_message)
 
-        send_mail(
+        # Queued: the outbox worker talks to SMTP, not this request
+        queue_email(
             subject="Confirm Your Email to Get Started with KUETx",
-            message=plain_message,
+            body=plain_message,
             from_email=config('EMAIL_HOST_USER'),
-            recipient_list=[user.email],
-            html_message=html_message
+            recipients=[user.email],
+            html_body=html_message
         )
 
 # -------------- VERIFY EMAIL ----------------------------
@@ -165,12 +167,11 @@ class RequestPasswordResetView(APIView):
         token = PasswordResetTokenGenerator().make_token(user)
         reset_link = f"{config('FRONTEND_DOMAIN')}/reset-password/{uidb64}/{token}/"
 
-        send_mail(
+        queue_email(
             subject="Reset Your Password",
-            message=f"Click the link to reset your password: {reset_link}",
+            body=f"Click the link to reset your password: {reset_link}",
             from_email=config('EMAIL_HOST_USER'),
-            recipient_list=[email],
-            fail_silently=False,
+            recipients=[email],
         )
 
 
@@ -245,13 +246,38 @@ class DashboardStatsView(APIView):
             )
 
 # -------------------- LANDING PAGE STATS ---------------------------------
+class DashboardUsersView(generics.ListAPIView):
+    """
+    Page through the dashboard's new (?segment=new) or active (?segment=active) users.
+
+    Both segments page newest account first: last_login changes on every login,
+    so keyed on it a user who logs in mid-walk would jump ahead of the cursor
+    and be skipped.
+    """
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+    serializer_class = UserSerializer
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-date_joined', '-id')
+
+    def get_segment(self):
+        return self.request.query_params.get('segment', 'new')
+
+    def get_queryset(self):
+        return DashboardStatsService.user_segment(self.get_segment())
+
+    def list(self, request, *args, **kwargs):
+        if self.get_segment() not in ('new', 'active'):
+            return Response({"error": "segment must be 'new' or 'active'."}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+
 class LandingPageStatsView(APIView):
     """Provide stats for the landing page."""
     permission_classes=[AllowAny]
 
     def get(self, _request, *_args, **_kwargs):
         try:
-            stats_data=LandingPageStatsService.get_landingpage_stats()
+            stats_data=LandingPageStatsService.get_cached_landingpage_stats()
             serializer=LandingPageStatsSerializer(stats_data)
             return Response(
                 {
@@ -275,8 +301,10 @@ class LandingPageStatsView(APIView):
 class InstructorViewSet(viewsets.ReadOnlyModelViewSet):
     """Provides a list/detail of instructors."""
     permission_classes = [AllowAny]
-    queryset = Instructor.objects.all()
+    queryset = Instructor.objects.select_related('user')
     serializer_class = InstructorSerializer
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = 'id'
 
 class InstructorDetailView(RetrieveAPIView):
     permission_classes = [AllowAny]